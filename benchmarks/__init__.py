@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for probkit.
+
+    python -m benchmarks run -o results.json             # measure every case
+    python -m benchmarks run --filter ntsig              # only cases whose name contains "ntsig"
+    python -m benchmarks compare baseline.json results.json --threshold 0.15
+
+Cases live in benchmarks/cases.py; the timing, JSON and comparison logic in benchmarks/harness.py.
+"""
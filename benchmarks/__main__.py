@@ -0,0 +1,62 @@
+"""
+Command line entry point: python -m benchmarks {run,compare}.
+"""
+
+import argparse
+import sys
+
+from . import cases  # noqa: F401 (registers the cases)
+from .harness import CASES, compare, dump, load, run
+
+def _print_comparison(baseline:dict, current:dict, threshold:float) -> int:
+    rows, regressions = compare(baseline, current, threshold)
+    for name, b, c, ratio in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<55} {b:12.1f} -> {c:12.1f} ns/op  x{ratio:5.2f}{flag}")
+    missing = sorted(baseline["results"].keys() - current["results"].keys())
+    if missing:
+        print(f"Not measured this run: {', '.join(missing)}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slowed down by more than {threshold:.0%}.")
+        return 1
+    print(f"No case slowed down by more than {threshold:.0%}.")
+    return 0
+
+def main(argv:list[str]|None=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="probkit performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="measure benchmark cases")
+    p.add_argument("-o", "--output", help="write results JSON here")
+    p.add_argument("-f", "--filter", action="append", help="only run cases whose name contains this (repeatable)")
+    p.add_argument("--repeat", type=int, default=5, help="timing repeats; the best is kept (default 5)")
+    p.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per timing repeat (default 0.05)")
+    p.add_argument("--compare", metavar="BASELINE", help="compare against a baseline JSON and fail on regressions")
+    p.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before failing, as a fraction (default 0.1)")
+    p.add_argument("--list", action="store_true", help="list case names and exit")
+
+    p = sub.add_parser("compare", help="compare two results files")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before failing, as a fraction (default 0.1)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _print_comparison(load(args.baseline), load(args.current), args.threshold)
+
+    names = sorted(CASES)
+    if args.filter:
+        names = [n for n in names if any(f in n for f in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    doc = run(names, args.repeat, args.min_time, log=print)
+    if args.output:
+        dump(doc, args.output)
+    if args.compare:
+        return _print_comparison(load(args.compare), doc, args.threshold)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+Benchmark cases for every public probkit function and its batch path.
+
+Scalar cases loop over SCALAR_N inputs so their ns/op is directly comparable with the per-element ns/op of the batch cases.
+"""
+
+import io
+import pickle
+import statistics
+import struct
+from random import Random
+
+from probkit import accumulators, curves, derivatives, export, fit, probability, stats, utils
+from probkit.lut import CurveLUT
+from probkit.pipeline import Pipeline
+from probkit.qmc import AntitheticRNG, HaltonRNG, SobolRNG, StratifiedRNG
+from probkit.sampling import CounterRNG, ProbkitRNG, ThreadLocalRNG
+from probkit.weighted import WeightedTable
+
+from .harness import case
+
+SCALAR_N = 1000
+BATCH_SIZES = [100, 10_000]
+K_REGIMES = {"0": 0, "1": 1, "-1": -1, "interior": 0.5, "near1": 0.999}
+
+_random = Random(1234)
+XS = [_random.random() for _ in range(max(BATCH_SIZES))]
+RATIOS = [_random.random() * 3 for _ in range(max(BATCH_SIZES))]
+BASES = [_random.random() for _ in range(max(BATCH_SIZES))]
+
+
+# --- curves ---
+def _loop(f, xs, *args):
+    """Factory timing f(*args, x) for every x in xs."""
+    return lambda: lambda: [f(*args, x) for x in xs]
+
+def _batch(f, *args):
+    """Factory timing one call of f(*args)."""
+    return lambda: lambda: f(*args)
+
+for _label, _k in K_REGIMES.items():
+    _xs = XS[:SCALAR_N]
+    case(f"curves.ntsig[k={_label}]", SCALAR_N)(_loop(curves.ntsig, _xs, _k))
+    case(f"curves.nthsig[k={_label}]", SCALAR_N)(_loop(curves.nthsig, _xs, _k))
+    case(f"curves.biased_curve[k={_label}]", SCALAR_N)(_loop(curves.biased_curve, _xs, _k, 2, 7))
+    case(f"curves._dd_ntsig[k={_label}]", SCALAR_N)(_loop(curves._dd_ntsig, [2 * x - 1 for x in _xs], _k))
+    for _n in BATCH_SIZES:
+        case(f"curves.ntsig_many[k={_label},n={_n}]", _n)(_batch(curves.ntsig_many, _k, XS[:_n]))
+        case(f"curves.nthsig_many[k={_label},n={_n}]", _n)(_batch(curves.nthsig_many, _k, XS[:_n]))
+        case(f"curves.biased_curve_many[k={_label},n={_n}]", _n)(_batch(curves.biased_curve_many, _k, 2, 7, XS[:_n]))
+
+for _label in ["interior", "near1"]:
+    _k = K_REGIMES[_label]
+    case(f"curves.ntsig_inv[k={_label}]", SCALAR_N)(_loop(curves.ntsig_inv, XS[:SCALAR_N], _k))
+    case(f"curves.Curve[k={_label}]", SCALAR_N)(lambda k=_k: _loop(curves.Curve(k), XS[:SCALAR_N])())
+    case(f"curves.Curve.unchecked[k={_label}]", SCALAR_N)(lambda k=_k: _loop(curves.Curve(k).unchecked, XS[:SCALAR_N])())
+
+# LUT construction near k=±1 needs millions of points, so only time lookups at interior k.
+for _method in ["linear", "cubic"]:
+    case(f"lut.CurveLUT[{_method},k=interior]", SCALAR_N)(lambda m=_method: _loop(CurveLUT.from_ntsig(0.5, 1e-6, m), XS[:SCALAR_N])())
+
+
+# --- probability ---
+@case("probability.modified_probability", SCALAR_N)
+def _():
+    pairs = list(zip(BASES[:SCALAR_N], RATIOS[:SCALAR_N]))
+    return lambda: [probability.modified_probability(k, x) for k, x in pairs]
+
+@case("probability.modified_probability[a/b]", SCALAR_N)
+def _():
+    triples = list(zip(BASES[:SCALAR_N], RATIOS[:SCALAR_N], XS[:SCALAR_N]))
+    return lambda: [probability.modified_probability(k, a, b) for k, a, b in triples]
+
+for _n in BATCH_SIZES:
+    case(f"probability.modified_probability_many[n={_n}]", _n)(_batch(probability.modified_probability_many, BASES[:_n], RATIOS[:_n]))
+    case(f"probability.modified_probability_many[scalar k,n={_n}]", _n)(_batch(probability.modified_probability_many, 0.3, RATIOS[:_n]))
+
+
+# --- pipeline ---
+_CHAIN = Pipeline().ntsig(0.4).biased_curve(0.3, 0.1, 0.9).modified_probability(1.5)
+
+@case("pipeline.chained_calls", SCALAR_N)
+def _():
+    xs = XS[:SCALAR_N]
+    f, g, h = curves.ntsig, curves.biased_curve, probability.modified_probability
+    return lambda: [h(g(0.3, 0.1, 0.9, f(0.4, x)), 1.5) for x in xs]
+
+case("pipeline.Pipeline", SCALAR_N)(_loop(_CHAIN, XS[:SCALAR_N]))
+for _n in BATCH_SIZES:
+    case(f"pipeline.Pipeline.many[n={_n}]", _n)(_batch(_CHAIN.many, XS[:_n]))
+
+
+# --- fit ---
+@case("fit.fit_nthsig", SCALAR_N)
+def _():
+    pairs = [(x, curves.nthsig(0.4, x)) for x in XS[:SCALAR_N]]
+    return lambda: [fit.fit_nthsig(x, y) for x, y in pairs]
+
+@case(f"fit.fit_ntsig_many[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    ys = [curves.ntsig(0.4, x) for x in XS]
+    return lambda: fit.fit_ntsig_many(XS, ys)
+
+case("fit.fit_nthsig_mean", SCALAR_N)(_loop(fit.fit_nthsig_mean, BASES[:SCALAR_N]))
+
+
+# --- stats ---
+case("stats.nthsig_mean", SCALAR_N)(_loop(stats.nthsig_mean, [2 * x - 1 for x in XS[:SCALAR_N]]))
+case("stats.nthsig_variance", SCALAR_N)(_loop(stats.nthsig_variance, [2 * x - 1 for x in XS[:SCALAR_N]]))
+case("stats.ntsig_quantile", SCALAR_N)(_loop(stats.ntsig_quantile, XS[:SCALAR_N], 0.5))
+case(f"stats.nthsig_variance_many[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))(_batch(stats.nthsig_variance_many, [2 * x - 1 for x in XS]))
+
+
+# --- derivatives ---
+_N = max(BATCH_SIZES)
+case("derivatives.nthsig_grad", SCALAR_N)(_loop(derivatives.nthsig_grad, XS[:SCALAR_N], 0.5))
+case(f"derivatives.nthsig_grad_many[n={_N}]", _N)(_batch(derivatives.nthsig_grad_many, 0.5, XS))
+case(f"derivatives.ntsig_grad_many[n={_N}]", _N)(_batch(derivatives.ntsig_grad_many, 0.5, XS))
+case(f"derivatives.modified_probability_grad_many[n={_N}]", _N)(_batch(derivatives.modified_probability_grad_many, BASES, RATIOS))
+
+@case(f"derivatives.nthsig[finite differences,n={_N}]", _N)
+def _():
+    # What the analytic gradient replaces: the value plus two central differences, five curve evaluations per element.
+    f, h = curves.nthsig, 1e-6
+    return lambda: [(f(0.5, x), (f(0.5 + h, x) - f(0.5 - h, x)) / (2 * h), (f(0.5, x + h) - f(0.5, x - h)) / (2 * h)) for x in XS[1:-1]]
+
+
+# --- utils ---
+@case("utils.transform_range", SCALAR_N)
+def _():
+    xs = XS[:SCALAR_N]
+    return lambda: [utils.transform_range(x, (0, 1), (-1, 1)) for x in xs]
+
+@case("utils.effective_ratio", SCALAR_N)
+def _():
+    pairs = list(zip(RATIOS[:SCALAR_N], XS[:SCALAR_N]))
+    return lambda: [utils.effective_ratio(a, b) for a, b in pairs]
+
+@case("utils.clamp", SCALAR_N)
+def _():
+    xs = RATIOS[:SCALAR_N]
+    return lambda: [utils.clamp(x, 0.5, 2) for x in xs]
+
+
+# --- sampling ---
+def _rng_loop(method:str, *args):
+    """Factory timing SCALAR_N calls of rng.<method>(*args)."""
+    def factory():
+        f = getattr(ProbkitRNG(1), method)
+        return lambda: [f(*args) for _ in range(SCALAR_N)]
+    return factory
+
+def _rng_batch(method:str, *args):
+    """Factory timing one call of rng.<method>(*args)."""
+    def factory():
+        f = getattr(ProbkitRNG(1), method)
+        return lambda: f(*args)
+    return factory
+
+for _label in ["interior", "0", "1"]:
+    _k = K_REGIMES[_label]
+    case(f"sampling.ntsig[k={_label}]", SCALAR_N)(_rng_loop("ntsig", _k))
+    case(f"sampling.nthsig[k={_label}]", SCALAR_N)(_rng_loop("nthsig", _k))
+    case(f"sampling.biased_curve[k={_label}]", SCALAR_N)(_rng_loop("biased_curve", _k, 2, 7))
+    for _n in BATCH_SIZES:
+        case(f"sampling.ntsig_many[k={_label},n={_n}]", _n)(_rng_batch("ntsig_many", _k, _n))
+        case(f"sampling.nthsig_many[k={_label},n={_n}]", _n)(_rng_batch("nthsig_many", _k, _n))
+        case(f"sampling.biased_curve_many[k={_label},n={_n}]", _n)(_rng_batch("biased_curve_many", _k, 2, 7, _n))
+
+case("sampling.random", SCALAR_N)(_rng_loop("random"))
+case(f"sampling.random_many[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))(_rng_batch("random_many", max(BATCH_SIZES)))
+
+@case("sampling.CounterRNG.random", SCALAR_N)
+def _():
+    f = CounterRNG(1).random
+    return lambda: [f() for _ in range(SCALAR_N)]
+
+@case(f"sampling.CounterRNG.random_many[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    r = CounterRNG(1)
+    return lambda: r.random_many(max(BATCH_SIZES))
+
+@case("sampling.CounterRNG.at", SCALAR_N)
+def _():
+    f = CounterRNG(1).at
+    return lambda: [f(i) for i in range(SCALAR_N)]
+
+@case("sampling.fork", 1)
+def _():
+    return ProbkitRNG(1).fork
+
+@case("sampling.fork[tuple state]", 1)
+def _():
+    # fork() as it was: a urandom-seeded instance, then setstate(getstate()).
+    r = ProbkitRNG(1)
+    def fork():
+        clone = ProbkitRNG()
+        clone.setstate(r.getstate())
+        return clone
+    return fork
+
+@case("sampling.snapshot", 1)
+def _():
+    return ProbkitRNG(1).snapshot
+
+@case("sampling.from_snapshot", 1)
+def _():
+    data = ProbkitRNG(1).snapshot()
+    return lambda: ProbkitRNG.from_snapshot(data)
+
+@case("sampling.snapshot[pickle getstate]", 1)
+def _():
+    r = ProbkitRNG(1)
+    return lambda: pickle.dumps(r.getstate(), pickle.HIGHEST_PROTOCOL)
+
+@case("sampling.from_snapshot[pickle getstate]", 1)
+def _():
+    data = pickle.dumps(ProbkitRNG(1).getstate(), pickle.HIGHEST_PROTOCOL)
+    def restore():
+        r = ProbkitRNG()
+        r.setstate(pickle.loads(data))
+        return r
+    return restore
+
+@case("qmc.SobolRNG.random", SCALAR_N)
+def _():
+    f = SobolRNG(1).random
+    return lambda: [f() for _ in range(SCALAR_N)]
+
+for _cls in (SobolRNG, HaltonRNG, StratifiedRNG, AntitheticRNG):
+    @case(f"qmc.{_cls.__name__}.random_many[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+    def _(cls=_cls):
+        r = cls(1)
+        return lambda: r.random_many(max(BATCH_SIZES))
+
+@case("sampling.ThreadLocalRNG.random", SCALAR_N)
+def _():
+    local = ThreadLocalRNG(1)
+    return lambda: [local.random() for _ in range(SCALAR_N)]
+
+@case("sampling.ThreadLocalRNG.current", SCALAR_N)
+def _():
+    f = ThreadLocalRNG(1).current
+    return lambda: [f() for _ in range(SCALAR_N)]
+
+@case("sampling.iter_ntsig[k=interior]", SCALAR_N)
+def _():
+    stream = ProbkitRNG(1).iter_ntsig(0.5)
+    return lambda: [next(stream) for _ in range(SCALAR_N)]
+
+
+# --- weighted ---
+@case("weighted.WeightedTable.sample[n=500]", SCALAR_N)
+def _():
+    table, r = WeightedTable(range(500), BASES[:500], RATIOS[:500]), ProbkitRNG(1)
+    return lambda: [table.sample(r) for _ in range(SCALAR_N)]
+
+@case("weighted.WeightedTable.sample_many[n=500]", SCALAR_N)
+def _():
+    table, r = WeightedTable(range(500), BASES[:500], RATIOS[:500]), ProbkitRNG(1)
+    return lambda: table.sample_many(SCALAR_N, r)
+
+@case("weighted.WeightedTable.update[n=500]", 1)
+def _():
+    table = WeightedTable(range(500), BASES[:500], RATIOS[:500])
+    return lambda: table.update(7, ratio=1.5)
+
+@case("weighted.random.choices[n=500]", SCALAR_N)
+def _():
+    weights = probability.modified_probability_many(BASES[:500], RATIOS[:500])
+    r, items = ProbkitRNG(1), range(500)
+    return lambda: [r.choices(items, weights) for _ in range(SCALAR_N)]
+
+@case("probability.OddsModifier.resolve[ratios=10]", SCALAR_N)
+def _():
+    m = probability.OddsModifier(RATIOS[:10])
+    return lambda: [m.resolve(k) for k in BASES[:SCALAR_N]]
+
+@case("probability.modified_probability[chained,ratios=10]", SCALAR_N)
+def _():
+    ratios, mp = RATIOS[:10], probability.modified_probability
+    def run():
+        for k in BASES[:SCALAR_N]:
+            for x in ratios:
+                k = mp(k, x)
+    return run
+
+@case(f"probability.OddsModifier.resolve_many[n={max(BATCH_SIZES)},ratios=10]", max(BATCH_SIZES))
+def _():
+    m = probability.OddsModifier(RATIOS[:10])
+    return lambda: m.resolve_many(BASES)
+
+# --- accumulators ---
+@case(f"accumulators.Welford.update[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    return lambda: accumulators.Welford().update(XS)
+
+@case(f"accumulators.Welford.add[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    def run():
+        w = accumulators.Welford()
+        for x in XS:
+            w.add(x)
+    return run
+
+@case(f"accumulators.statistics.fmean+variance[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    return lambda: (statistics.fmean(XS), statistics.variance(XS))
+
+@case(f"accumulators.Histogram.update[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    return lambda: accumulators.Histogram(100).update(XS)
+
+@case(f"accumulators.QuantileSketch.update[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    return lambda: accumulators.QuantileSketch().update(XS)
+
+@case(f"accumulators.sorted+index[n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    # Exact quantiles from keeping every sample, the baseline the sketch replaces.
+    return lambda: sorted(XS)[int(0.99 * len(XS))]
+
+@case(f"export.write_samples[raw,n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    return lambda: export.write_samples(io.BytesIO(), "ntsig", (0.3,), max(BATCH_SIZES), seed=1, format="raw")
+
+@case(f"export.write_samples[loop+struct,n={max(BATCH_SIZES)}]", max(BATCH_SIZES))
+def _():
+    # The text-free loop it replaces: one draw and one pack per sample.
+    def write():
+        out, r, pack = io.BytesIO(), ProbkitRNG(1), struct.Struct("<d").pack
+        for _ in range(max(BATCH_SIZES)):
+            out.write(pack(r.ntsig(0.3)))
+    return write
@@ -0,0 +1,79 @@
+"""
+Benchmark registry, timing, and baseline comparison.
+"""
+
+import json
+import platform
+import sys
+import time
+import timeit
+from collections.abc import Callable
+
+# name -> (factory, ops). factory() returns a zero-argument callable that performs ops operations.
+CASES:dict[str, tuple[Callable[[], Callable[[], object]], int]] = {}
+
+def case(name:str, ops:int=1):
+    """Register a benchmark factory under name. ops is how many operations one call of the returned callable performs, so results are per operation (per element for batch cases)."""
+    def register(factory):
+        if name in CASES:
+            raise ValueError(f"Duplicate benchmark case {name!r}.")
+        CASES[name] = (factory, ops)
+        return factory
+    return register
+
+def measure(fn:Callable[[], object], ops:int, repeat:int=5, min_time:float=0.05) -> float:
+    """Return the best-of-repeat time per operation of fn, in nanoseconds."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number / ops * 1e9
+
+def run(names:list[str]|None=None, repeat:int=5, min_time:float=0.05, log=None) -> dict:
+    """Run the named cases (default: all) and return a JSON-serializable results document."""
+    import probkit
+
+    results = {}
+    for name in names if names is not None else sorted(CASES):
+        factory, ops = CASES[name]
+        ns = measure(factory(), ops, repeat, min_time)
+        results[name] = {"ns_per_op": ns, "ops": ops}
+        if log:
+            log(f"{name:<55} {ns:12.1f} ns/op")
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "probkit": getattr(probkit, "__version__", None),
+        },
+        "results": results,
+    }
+
+def compare(baseline:dict, current:dict, threshold:float=0.1) -> tuple[list[tuple[str, float, float, float]], list[str]]:
+    """Compare two results documents.
+
+    Returns (rows, regressions): rows is (name, baseline_ns, current_ns, ratio) for every case present in both, and regressions lists the names whose time grew by more than threshold (0.1 = 10% slower).
+    """
+    rows, regressions = [], []
+    base, cur = baseline["results"], current["results"]
+    for name in sorted(base.keys() & cur.keys()):
+        b, c = base[name]["ns_per_op"], cur[name]["ns_per_op"]
+        ratio = c / b if b else float("inf")
+        rows.append((name, b, c, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+def load(path:str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def dump(doc:dict, path:str) -> None:
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2, sort_keys=True)
+        f.write("\n")
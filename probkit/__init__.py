@@ -1,8 +1,48 @@
 # probkit
+#
+# Exports are loaded lazily: `import probkit` only sets up this table, and each
+# submodule is imported the first time one of its names is looked up.
+# `from probkit import *` still imports everything listed here.
 
-from .curves import *
-from .probability import *
-from .utils import *
+import importlib
+
+_EXPORTS = {
+    "curves": [
+        "ntsig", "nthsig", "biased_curve",
+        "ntsig_many", "nthsig_many", "biased_curve_many",
+        "ntsig_inv", "nthsig_inv", "biased_curve_inv",
+        "ntsig_inv_many", "nthsig_inv_many", "biased_curve_inv_many",
+        "Curve", "HalfCurve", "BiasedCurve",
+    ],
+    "lut": ["CurveLUT"],
+    "pipeline": ["Pipeline"],
+    "probability": ["modified_probability", "modified_probability_many", "OddsModifier"],
+    "utils": ["clamp", "transform_range", "effective_ratio"],
+}
+
+# Submodules reachable as attributes (probkit.sampling, ...) without importing them first.
+_SUBMODULES = frozenset({
+    "accumulators", "backends", "curves", "derivatives", "export", "fit", "instrument", "lut",
+    "parallel", "pipeline", "probability", "qmc", "sampling", "stats", "utils", "weighted",
+})
+
+_ORIGIN = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_ORIGIN)
+
+def __getattr__(name:str):
+    module = _ORIGIN.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(f".{module}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
 
 # Random sampling functions (optional import)
 # Use: from probkit import sampling
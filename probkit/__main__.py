@@ -0,0 +1,60 @@
+"""
+Command line entry point: python -m probkit {sample,info}.
+
+    python -m probkit sample ntsig 0.3 -n 1000000000 --seed 42 -o ntsig.pk
+    python -m probkit sample biased_curve 0.2 10 100 -n 1000000 --seed 7 --format raw --dtype f4 | consumer
+    python -m probkit info ntsig.pk
+"""
+
+import argparse
+import json
+import sys
+
+from .export import KINDS, SampleFile, write_samples
+
+def _seed(text:str) -> int|str:
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+def main(argv:list[str]|None=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m probkit", description="probkit sample export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sample", help="stream samples to a file or stdout")
+    p.add_argument("kind", choices=list(KINDS), help="sampler")
+    p.add_argument("args", nargs="+", type=float, help="sampler arguments: k | k a b | a [b]")
+    p.add_argument("-n", "--count", type=int, required=True, help="number of samples")
+    p.add_argument("--seed", type=_seed, required=True, help="root seed (int or string)")
+    p.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    p.add_argument("--format", choices=["probkit", "npy", "raw"], default="probkit", help="file format (default probkit)")
+    p.add_argument("--dtype", choices=["f8", "f4"], default="f8", help="little-endian float64 or float32 (default f8)")
+    p.add_argument("--chunk-size", type=int, default=1 << 16, help="samples per chunk (default 65536)")
+    p.add_argument("--first-chunk", type=int, default=0, help="index of the first chunk, to split a dataset across files (default 0)")
+    p.add_argument("--rng", choices=["ProbkitRNG", "CounterRNG"], default="ProbkitRNG", help="generator (default ProbkitRNG)")
+
+    p = sub.add_parser("info", help="print a sample file's header as JSON")
+    p.add_argument("path")
+    p.add_argument("--dtype", choices=["f8", "f4"], default="f8", help="dtype of a raw file (default f8)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        with SampleFile(args.path, args.dtype) as f:
+            info = {"format": f.format, "dtype": f.dtype, "samples": len(f), "header": f.header}
+        print(json.dumps(info, indent=2))
+        return 0
+
+    try:
+        write_samples(
+            sys.stdout.buffer if args.output == "-" else args.output,
+            args.kind, tuple(args.args), args.count, args.seed,
+            format=args.format, dtype=args.dtype, chunk_size=args.chunk_size, first_chunk=args.first_chunk, rng_type=args.rng,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+Single-pass, constant-memory summaries of sampler output that merge across threads and processes.
+
+Feed an accumulator one sample at a time with add(x), or whole batches (sequences, array('d'), numpy arrays, or any iterable, consumed in chunks) with update(xs):
+
+    w, h, q = Welford(), Histogram(50), QuantileSketch()
+    for _ in range(1000):
+        batch = rng.ntsig_many(0.4, 4096)
+        for acc in (w, h, q):
+            acc.update(batch)
+    w.mean, w.stderr, h.counts, q.quantile(0.99)
+
+merge(other) folds another accumulator of the same kind (and settings) into this one and returns it, so partial results reduce pairwise,
+e.g. probkit.parallel.run(fn, n, seed, reduce=Welford.merge) with fn returning an accumulator per chunk. All of them pickle.
+
+- Welford: count, mean, variance, standard error, min and max (Welford's update, Chan et al.'s merge).
+- Histogram: counts in equal-width bins over [lo,hi], plus underflow and overflow counts.
+- QuantileSketch: KLL sketch of the distribution, answering quantile(p) and rank(x) within about 1.7/k of the true rank.
+"""
+
+__all__ = ["Welford", "Histogram", "QuantileSketch"]
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from itertools import accumulate, islice
+from math import ceil, fsum, inf, sqrt
+from random import Random
+from typing import Self
+
+from .utils import _numpy_for
+
+_CHUNK = 4096
+
+
+def _chunks(xs:Iterable[float]):
+    """Yield (np, chunk) pieces of xs: numpy arrays whole, sequences whole, other iterables as array('d') chunks of _CHUNK."""
+    np = _numpy_for(xs)
+    if np is not None:
+        yield np, np.asarray(xs, dtype=float).ravel()
+    elif hasattr(xs, "__len__"):
+        yield None, xs
+    else:
+        it = iter(xs)
+        while chunk := array("d", islice(it, _CHUNK)):
+            yield None, chunk
+
+
+class Welford:
+    """Running count, mean, variance, min and max.
+
+    Attributes:
+        count (int): Samples seen.
+        mean (float): Their mean (nan if none).
+        min (float), max (float): Extremes (inf and -inf if none).
+    """
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = float('nan')
+        self._m2 = 0.0
+        self.min = inf
+        self.max = -inf
+
+    def add(self, x:float) -> None:
+        """Add one sample."""
+        n = self.count = self.count + 1
+        if n == 1:
+            self.mean = x
+        else:
+            delta = x - self.mean
+            self.mean += delta / n
+            self._m2 += delta * (x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+
+    def update(self, xs:Iterable[float]) -> Self:
+        """Add every sample in xs, returning self. Each batch is summarized exactly (two passes over it) and merged in."""
+        for np, chunk in _chunks(xs):
+            n = len(chunk)
+            if n == 0:
+                continue
+            if np is not None:
+                mean = float(chunk.mean())
+                m2 = float(np.square(chunk - mean).sum())
+                lo, hi = float(chunk.min()), float(chunk.max())
+            else:
+                mean = fsum(chunk) / n
+                m2 = fsum([(x - mean) * (x - mean) for x in chunk])
+                lo, hi = min(chunk), max(chunk)
+            self._combine(n, mean, m2, lo, hi)
+        return self
+
+    def merge(self, other:"Welford") -> Self:
+        """Fold other into this accumulator, returning self."""
+        if not isinstance(other, Welford):
+            raise TypeError(f"Can only merge a Welford, got {type(other).__name__}.")
+        if other.count:
+            self._combine(other.count, other.mean, other._m2, other.min, other.max)
+        return self
+
+    def _combine(self, n:int, mean:float, m2:float, lo:float, hi:float) -> None:
+        if self.count == 0:
+            self.count, self.mean, self._m2 = n, mean, m2
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self._m2 += m2 + delta * delta * self.count * n / total
+            self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n-1 denominator); nan for fewer than 2 samples."""
+        return self._m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation."""
+        return sqrt(self.variance)
+
+    @property
+    def stderr(self) -> float:
+        """Standard error of the mean, sqrt(variance/count)."""
+        return sqrt(self.variance / self.count) if self.count > 1 else float('nan')
+
+    def __repr__(self) -> str:
+        return f"Welford(count={self.count}, mean={self.mean}, variance={self.variance})"
+
+
+class Histogram:
+    """Counts of samples in bins equal-width bins over [lo,hi].
+
+    Bin i covers [lo + i*w, lo + (i+1)*w), except the last, which also includes hi. Samples below lo or above hi are counted in underflow and overflow.
+
+    Args:
+        bins (int): Number of bins, at least 1.
+        lo (float), hi (float): The range, lo < hi. Defaults to [0,1].
+
+    Attributes:
+        counts (array): Per-bin counts, as array('q').
+        underflow (int), overflow (int): Samples outside [lo,hi].
+    """
+
+    __slots__ = ("bins", "lo", "hi", "counts", "underflow", "overflow", "_scale")
+
+    def __init__(self, bins:int=100, lo:float=0.0, hi:float=1.0):
+        if bins < 1:
+            raise ValueError(f"Argument 'bins' must be at least 1, got {bins}.")
+        if not lo < hi:
+            raise ValueError(f"Argument 'lo' must be less than 'hi', got {lo} and {hi}.")
+        self.bins = bins
+        self.lo = lo
+        self.hi = hi
+        self.counts = array('q', bytes(8 * bins))
+        self.underflow = 0
+        self.overflow = 0
+        self._scale = bins / (hi - lo)
+
+    def add(self, x:float) -> None:
+        """Add one sample."""
+        if not self.lo <= x <= self.hi:
+            if x < self.lo:
+                self.underflow += 1
+            elif x > self.hi:
+                self.overflow += 1
+            else:
+                raise ValueError(f"Sample must not be NaN, got {x}.")
+            return
+        i = int((x - self.lo) * self._scale)
+        self.counts[i if i < self.bins else self.bins - 1] += 1
+
+    def update(self, xs:Iterable[float]) -> Self:
+        """Add every sample in xs, returning self."""
+        lo, hi, scale, last = self.lo, self.hi, self._scale, self.bins - 1
+        counts = self.counts
+        for np, chunk in _chunks(xs):
+            if np is not None:
+                if np.isnan(chunk).any():
+                    raise ValueError(f"Sample must not be NaN, got nan at index {int(np.argmax(np.isnan(chunk)))}.")
+                inside = chunk[(chunk >= lo) & (chunk <= hi)]
+                self.underflow += int((chunk < lo).sum())
+                self.overflow += int((chunk > hi).sum())
+                index = np.minimum(((inside - lo) * scale).astype(np.int64), last)
+                for i, c in enumerate(np.bincount(index, minlength=self.bins).tolist()):
+                    counts[i] += c
+                continue
+            for j, x in enumerate(chunk):
+                if lo <= x <= hi:
+                    i = int((x - lo) * scale)
+                    counts[i if i <= last else last] += 1
+                elif x < lo:
+                    self.underflow += 1
+                elif x > hi:
+                    self.overflow += 1
+                else:
+                    raise ValueError(f"Sample must not be NaN, got {x} at index {j}.")
+        return self
+
+    def merge(self, other:"Histogram") -> Self:
+        """Fold other, which must have the same bins and range, into this histogram, returning self."""
+        if not isinstance(other, Histogram):
+            raise TypeError(f"Can only merge a Histogram, got {type(other).__name__}.")
+        if (other.bins, other.lo, other.hi) != (self.bins, self.lo, self.hi):
+            raise ValueError(f"Histograms must have the same bins and range to merge, got {(self.bins, self.lo, self.hi)} and {(other.bins, other.lo, other.hi)}.")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    @property
+    def total(self) -> int:
+        """All samples seen, including underflow and overflow."""
+        return sum(self.counts) + self.underflow + self.overflow
+
+    @property
+    def edges(self) -> list[float]:
+        """The bins+1 bin edges, from lo to hi."""
+        width = (self.hi - self.lo) / self.bins
+        return [self.lo + i * width for i in range(self.bins)] + [self.hi]
+
+    def density(self) -> list[float]:
+        """Per-bin probability density: counts / (total * bin width), so it integrates to the fraction of samples inside [lo,hi]."""
+        total = self.total
+        if total == 0:
+            return [0.0] * self.bins
+        return [c * self._scale / total for c in self.counts]
+
+    def quantile(self, p:float) -> float:
+        """The p-quantile, interpolating linearly within the bin it falls in. Underflow counts as lo and overflow as hi."""
+        if not 0 <= p <= 1:
+            raise ValueError(f"Argument 'p' must be in range [0,1], got {p}.")
+        total = self.total
+        if total == 0:
+            raise ValueError("Histogram is empty.")
+        target = p * total - self.underflow
+        if target <= 0:
+            return float(self.lo)
+        width = 1 / self._scale
+        for i, c in enumerate(self.counts):
+            if target <= c:
+                return self.lo + (i + target / c) * width
+            target -= c
+        return float(self.hi)
+
+    def __repr__(self) -> str:
+        return f"Histogram(bins={self.bins}, lo={self.lo}, hi={self.hi}, total={self.total})"
+
+
+class QuantileSketch:
+    """KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Items are kept in a stack of compactors; level h holds items that stand for 2**h samples. When the sketch is full, the lowest overfull level is sorted
+    and every other item (starting at a random offset) is promoted to the next level, halving its weight budget. Memory stays O(k) whatever the sample count.
+    Ranks are accurate to within about 1.7/k with high probability; min and max are exact.
+
+    Args:
+        k (int): Accuracy parameter, at least 8. The sketch holds roughly 3k items.
+        seed (int|str|None): Seed for the compaction offsets, so runs are reproducible. Defaults to 0.
+
+    Attributes:
+        count (int): Samples seen.
+        min (float), max (float): Extremes (inf and -inf if none).
+    """
+
+    __slots__ = ("k", "count", "min", "max", "_levels", "_size", "_capacity", "_rng")
+
+    def __init__(self, k:int=200, seed:int|str|None=0):
+        if k < 8:
+            raise ValueError(f"Argument 'k' must be at least 8, got {k}.")
+        self.k = k
+        self.count = 0
+        self.min = inf
+        self.max = -inf
+        self._levels = [[]]
+        self._size = 0
+        self._capacity = self._total_capacity()
+        self._rng = Random(seed)
+
+    def add(self, x:float) -> None:
+        """Add one sample."""
+        if x != x:
+            raise ValueError(f"Sample must not be NaN, got {x}.")
+        self._levels[0].append(x)
+        self.count += 1
+        self._size += 1
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+        if self._size >= self._capacity:
+            self._compress()
+
+    def update(self, xs:Iterable[float]) -> Self:
+        """Add every sample in xs, returning self."""
+        step = self.k
+        for np, chunk in _chunks(xs):
+            if np is not None:
+                if np.isnan(chunk).any():
+                    raise ValueError(f"Sample must not be NaN, got nan at index {int(np.argmax(np.isnan(chunk)))}.")
+                chunk = chunk.tolist()
+            for start in range(0, len(chunk), step):
+                piece = chunk[start:start + step]
+                total = sum(piece)
+                if total != total:
+                    # A NaN, or just inf and -inf together: find out which.
+                    bad = next((j for j, x in enumerate(piece) if x != x), None)
+                    if bad is not None:
+                        raise ValueError(f"Sample must not be NaN, got {piece[bad]} at index {start + bad}.")
+                self._levels[0].extend(piece)
+                self.count += len(piece)
+                self._size += len(piece)
+                self.min = min(self.min, min(piece))
+                self.max = max(self.max, max(piece))
+                while self._size >= self._capacity:
+                    self._compress()
+        return self
+
+    def merge(self, other:"QuantileSketch") -> Self:
+        """Fold other into this sketch, returning self. Sketches with different k merge, keeping this one's k."""
+        if not isinstance(other, QuantileSketch):
+            raise TypeError(f"Can only merge a QuantileSketch, got {type(other).__name__}.")
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in zip(self._levels, other._levels):
+            level.extend(items)
+        self.count += other.count
+        self._size += other._size
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._capacity = self._total_capacity()
+        while self._size >= self._capacity:
+            self._compress()
+        return self
+
+    def _level_capacity(self, h:int) -> int:
+        # Capacities shrink geometrically (by 2/3) going down from the top level, so most of the memory is at the top where each item carries the most weight.
+        depth = len(self._levels) - h - 1
+        return int(ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _total_capacity(self) -> int:
+        return sum(self._level_capacity(h) for h in range(len(self._levels)))
+
+    def _compress(self) -> None:
+        for h, items in enumerate(self._levels):
+            if len(items) >= self._level_capacity(h):
+                if h + 1 == len(self._levels):
+                    self._levels.append([])
+                    self._capacity = self._total_capacity()
+                items.sort()
+                # An odd item out stays behind at this level.
+                keep = items[:len(items) % 2]
+                promoted = items[len(keep) + self._rng.getrandbits(1)::2]
+                self._levels[h + 1].extend(promoted)
+                self._levels[h] = keep
+                self._size -= len(items) - len(keep) - len(promoted)
+                return
+
+    def _weighted(self) -> list[tuple[float, int]]:
+        items = [(x, 1 << h) for h, level in enumerate(self._levels) for x in level]
+        items.sort()
+        return items
+
+    def rank(self, x:float) -> float:
+        """Estimated fraction of samples <= x."""
+        if self.count == 0:
+            raise ValueError("QuantileSketch is empty.")
+        weight = sum(1 << h for h, level in enumerate(self._levels) for y in level if y <= x)
+        return min(1.0, weight / self._weight())
+
+    def quantile(self, p:float) -> float:
+        """Estimated p-quantile: the smallest retained item whose estimated rank is at least p. quantile(0) and quantile(1) are the exact min and max."""
+        return self.quantiles([p])[0]
+
+    def quantiles(self, ps:Iterable[float]) -> list[float]:
+        """Estimated quantiles for every p in ps, sorting the sketch once."""
+        ps = list(ps)
+        for i, p in enumerate(ps):
+            if not 0 <= p <= 1:
+                raise ValueError(f"Argument 'ps' must be in range [0,1], got {p} at index {i}.")
+        if self.count == 0:
+            raise ValueError("QuantileSketch is empty.")
+        items = self._weighted()
+        cumulative = list(accumulate(w for _, w in items))
+        total = cumulative[-1]
+        out = []
+        for p in ps:
+            if p == 0:
+                out.append(self.min)
+            elif p == 1:
+                out.append(self.max)
+            else:
+                out.append(items[min(bisect_left(cumulative, p * total), len(items) - 1)][0])
+        return out
+
+    def _weight(self) -> int:
+        return sum(len(level) << h for h, level in enumerate(self._levels))
+
+    def __len__(self) -> int:
+        """Items currently retained (not samples seen; see count)."""
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(k={self.k}, count={self.count}, retained={self._size})"
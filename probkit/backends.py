@@ -0,0 +1,134 @@
+"""
+Backend registry for probkit's batch (*_many) functions.
+
+A backend decides what the batch functions return when they build a new result, and whether plain sequences are routed to the numpy paths:
+
+    "auto"    (default) array('d') results; numpy arrays in give numpy arrays out.
+    "array"   Same as auto. Named explicitly so it can be requested.
+    "python"  list results; numpy arrays in still give numpy arrays out.
+    "numpy"   Every input, including lists, goes through the numpy paths and results are numpy arrays.
+
+Selecting a backend whose dependencies are missing falls back along numpy -> array -> python (with a RuntimeWarning) unless fallback=False, in which case ImportError is raised.
+numpy itself is only imported when the numpy backend is selected, or already imported by the caller. The PROBKIT_BACKEND environment variable sets the initial backend.
+
+    from probkit import backends
+    backends.set_backend("numpy")
+    with backends.use_backend("python"):
+        ys = ntsig_many(0.5, xs)   # a list
+"""
+
+__all__ = ["Backend", "register_backend", "available_backends", "get_backend", "set_backend", "use_backend"]
+
+import importlib
+import os
+import warnings
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+
+class Backend:
+    """A selectable batch backend.
+
+    Args:
+        name (str): Registry name.
+        new (callable): new(values, n) builds a result container from an iterable of n floats.
+        numpy (module, optional): The numpy module when every input should take the numpy paths, else None.
+    """
+
+    __slots__ = ("name", "new", "numpy")
+
+    def __init__(self, name:str, new:Callable[[Iterable[float], int], object], numpy=None):
+        self.name = name
+        self.new = new
+        self.numpy = numpy
+
+    def __repr__(self) -> str:
+        return f"Backend({self.name!r})"
+
+
+# Factories build a Backend on selection, raising ImportError if a dependency is missing.
+_FACTORIES:dict[str, Callable[[], Backend]] = {}
+_FALLBACK = {"numpy": "array", "array": "python"}
+
+def register_backend(name:str, factory:Callable[[], Backend], fallback:str|None=None) -> None:
+    """Register (or replace) a backend. factory is called each time the backend is selected and may raise ImportError."""
+    _FACTORIES[name] = factory
+    if fallback is not None:
+        _FALLBACK[name] = fallback
+
+def available_backends() -> list[str]:
+    """Names of the registered backends whose dependencies are importable."""
+    names = []
+    for name, factory in _FACTORIES.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def get_backend() -> Backend:
+    """The active backend."""
+    return _active
+
+def set_backend(name:str, fallback:bool=True) -> Backend:
+    """Select the active backend by name, returning the one actually selected.
+
+    Args:
+        name (str): A registered backend name.
+        fallback (bool): If the backend's dependencies are missing, try its fallback chain instead of raising ImportError.
+    """
+    global _active
+    _active = _resolve(name, fallback)
+    return _active
+
+@contextmanager
+def use_backend(name:str, fallback:bool=True) -> Iterator[Backend]:
+    """Context manager selecting a backend for the duration of the block."""
+    global _active
+    previous = _active
+    _active = _resolve(name, fallback)
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+def _resolve(name:str, fallback:bool) -> Backend:
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {sorted(_FACTORIES)}.")
+    requested = name
+    while True:
+        try:
+            backend = _FACTORIES[name]()
+        except ImportError as e:
+            if not fallback or name not in _FALLBACK:
+                raise
+            name = _FALLBACK[name]
+            warnings.warn(f"probkit backend {requested!r} is unavailable ({e}); falling back to {name!r}.", RuntimeWarning, stacklevel=3)
+            continue
+        return backend
+
+
+# --- Built-in backends ---
+
+def _array_backend(name:str="array") -> Backend:
+    return Backend(name, lambda values, n: array("d", values))
+
+def _python_backend() -> Backend:
+    return Backend("python", lambda values, n: list(values))
+
+def _numpy_backend() -> Backend:
+    np = importlib.import_module("numpy")
+    return Backend("numpy", lambda values, n: np.fromiter(values, float, n), np)
+
+register_backend("auto", lambda: _array_backend("auto"))
+register_backend("array", _array_backend)
+register_backend("python", _python_backend)
+register_backend("numpy", _numpy_backend)
+
+try:
+    _active = _resolve(os.environ.get("PROBKIT_BACKEND", "auto"), True)
+except ValueError as e:
+    warnings.warn(f"Ignoring PROBKIT_BACKEND: {e}", RuntimeWarning)
+    _active = _resolve("auto", True)
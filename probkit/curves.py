@@ -2,9 +2,17 @@
 Curve and sigmoid functions for probkit.
 """
 
-__all__ = ["ntsig", "nthsig", "biased_curve"]
+__all__ = [
+    "ntsig", "nthsig", "biased_curve",
+    "ntsig_many", "nthsig_many", "biased_curve_many",
+    "ntsig_inv", "nthsig_inv", "biased_curve_inv",
+    "ntsig_inv_many", "nthsig_inv_many", "biased_curve_inv_many",
+    "Curve", "HalfCurve", "BiasedCurve",
+]
 
-from .utils import transform_range
+from collections.abc import Callable, Iterable, MutableSequence
+
+from .utils import transform_range, _as_sequence, _check_range_many, _check_range_numpy, _fill, _numpy_for, _numpy_out, _numpy_result
 
 def ntsig(k:float, x:float) -> float:
     """Normalized Tunable Sigmoid
@@ -110,3 +118,327 @@ def _dd_ntsig(k:float, x:float) -> float:
     if k == -1: return -1 if x < 0 else 1
 
     return (k - 1) * x / (2 * k * abs(x) - k - 1)
+
+
+# --- Batch (array-in/array-out) versions ---
+
+def ntsig_many(k:float, xs:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig: evaluate the curve at every x in xs.
+
+    k is validated once and all x values are checked in bulk before any work is done. Results are bit-identical to calling ntsig(k, x) for each x.
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape (steepness/swinginess) of the curve.
+        xs (iterable of float): Values in range [0,1]. Any sequence, array.array, memoryview or numpy array.
+        out (mutable sequence, optional): Buffer of len(xs) to write results into instead of allocating a new one.
+    Returns:
+        array('d') | numpy.ndarray: out if given, otherwise a new array('d') (or a numpy array when xs is one).
+    """
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    np = _numpy_for(xs, out)
+    if np is not None:
+        return _ntsig_numpy(np, k, xs, out)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _fill(out, map(_ntsig_kernel(k), xs), len(xs))
+
+def nthsig_many(k:float, xs:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig: evaluate the curve at every x in xs.
+
+    k is validated once and all x values are checked in bulk before any work is done. Results are bit-identical to calling nthsig(k, x) for each x.
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape of the curve.
+        xs (iterable of float): Values in range [0,1]. Any sequence, array.array, memoryview or numpy array.
+        out (mutable sequence, optional): Buffer of len(xs) to write results into instead of allocating a new one.
+    Returns:
+        array('d') | numpy.ndarray: out if given, otherwise a new array('d') (or a numpy array when xs is one).
+    """
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    np = _numpy_for(xs, out)
+    if np is not None:
+        return _biased_curve_numpy(np, k, 0, 1, xs, out)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _fill(out, map(_nthsig_kernel(k), xs), len(xs))
+
+def biased_curve_many(k:float, a:float, b:float, xs:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve: evaluate the curve at every x in xs.
+
+    k is validated once and all x values are checked in bulk before any work is done. Results are bit-identical to calling biased_curve(k, a, b, x) for each x.
+
+    Args:
+        k (float): Must be in range [-1,1]. The bias of the curve.
+        a (float): The y value at x=0.
+        b (float): The y value at x=1.
+        xs (iterable of float): Values in range [0,1]. Any sequence, array.array, memoryview or numpy array.
+        out (mutable sequence, optional): Buffer of len(xs) to write results into instead of allocating a new one.
+    Returns:
+        array('d') | numpy.ndarray: out if given, otherwise a new array('d') (or a numpy array when xs is one).
+    """
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    np = _numpy_for(xs, out)
+    if np is not None:
+        return _biased_curve_numpy(np, k, a, b, xs, out)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _fill(out, map(_biased_curve_kernel(k, a, b), xs), len(xs))
+
+# --- Inverses ---
+# _dd_ntsig(k, .) and _dd_ntsig(-k, .) are inverses of each other, so each curve is inverted in closed form by flipping the sign of k.
+# At k=±1 the curves are steps/constants and have no true inverse; the flipped curve is their generalized inverse (quantile function) everywhere except at the endpoints.
+
+def ntsig_inv(k:float, y:float) -> float:
+    """Inverse of ntsig: the x for which ntsig(k, x) == y.
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape of the curve being inverted.
+        y (float): Must be in range [0,1].
+    Returns:
+        float: The x value in [0,1]. Equal to ntsig(-k, y).
+    """
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    if not 0 <= y <= 1:
+        raise ValueError(f"Argument 'y' must be in range [0,1], got {y}.")
+    return ntsig(-k, y)
+
+def nthsig_inv(k:float, y:float) -> float:
+    """Inverse of nthsig: the x for which nthsig(k, x) == y.
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape of the curve being inverted.
+        y (float): Must be in range [0,1].
+    Returns:
+        float: The x value in [0,1]. Equal to nthsig(-k, y).
+    """
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    if not 0 <= y <= 1:
+        raise ValueError(f"Argument 'y' must be in range [0,1], got {y}.")
+    return nthsig(-k, y)
+
+def biased_curve_inv(k:float, a:float, b:float, y:float) -> float:
+    """Inverse of biased_curve: the x for which biased_curve(k, a, b, x) == y.
+
+    Args:
+        k (float): Must be in range [-1,1]. The bias of the curve being inverted.
+        a (float): The y value at x=0. Must differ from b.
+        b (float): The y value at x=1.
+        y (float): Must be between a and b (inclusive).
+    Returns:
+        float: The x value in [0,1].
+    """
+    if a == b:
+        raise ValueError(f"biased_curve is constant when a == b ({a}) and has no inverse.")
+    if not min(a, b) <= y <= max(a, b):
+        raise ValueError(f"Argument 'y' must be between a and b ({a} and {b}), got {y}.")
+    return nthsig_inv(k, (y - a) / (b - a))
+
+def ntsig_inv_many(k:float, ys:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig_inv. See ntsig_many for the accepted inputs and the out buffer."""
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    np = _numpy_for(ys, out)
+    if np is not None:
+        return _ntsig_numpy(np, -k, ys, out, "ys")
+    ys = _as_sequence(ys)
+    _check_range_many(ys, 0, 1, "ys")
+    return _fill(out, map(_ntsig_kernel(-k), ys), len(ys))
+
+def nthsig_inv_many(k:float, ys:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig_inv. See nthsig_many for the accepted inputs and the out buffer."""
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    np = _numpy_for(ys, out)
+    if np is not None:
+        return _biased_curve_numpy(np, -k, 0, 1, ys, out, "ys")
+    ys = _as_sequence(ys)
+    _check_range_many(ys, 0, 1, "ys")
+    return _fill(out, map(_nthsig_kernel(-k), ys), len(ys))
+
+def biased_curve_inv_many(k:float, a:float, b:float, ys:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve_inv. See biased_curve_many for the accepted inputs and the out buffer."""
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    if a == b:
+        raise ValueError(f"biased_curve is constant when a == b ({a}) and has no inverse.")
+    lo, hi = min(a, b), max(a, b)
+    ba = b - a
+    np = _numpy_for(ys, out)
+    if np is not None:
+        ys = np.asarray(ys, dtype=float)
+        _check_range_numpy(np, ys, lo, hi, "ys")
+        return _biased_curve_numpy(np, -k, 0, 1, (ys - a) / ba, out, "ys")
+    ys = _as_sequence(ys)
+    _check_range_many(ys, lo, hi, "ys")
+    f = _nthsig_kernel(-k)
+    return _fill(out, (f((y - a) / ba) for y in ys), len(ys))
+
+# --- Compiled curves ---
+
+class Curve:
+    """ntsig with k fixed at construction.
+
+    k is validated and the evaluation function is chosen once (identity for k=0, step for k=1, constant for k=-1, otherwise the rational form with its constants precomputed), so a call only checks x and does the arithmetic.
+    Results are bit-identical to ntsig(k, x).
+
+        curve = Curve(0.5)
+        y = curve(x)            # validates x
+        y = curve.unchecked(x)  # skips the check: x must already be in [0,1]
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape (steepness/swinginess) of the curve.
+    """
+
+    __slots__ = ("k", "unchecked")
+
+    def __init__(self, k:float):
+        if not -1 <= k <= 1:
+            raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+        self.k = k
+        self.unchecked = self._kernel()
+
+    def _kernel(self) -> Callable[[float], float]:
+        return _ntsig_kernel(self.k)
+
+    def __call__(self, x:float) -> float:
+        if 0 <= x <= 1:
+            return self.unchecked(x)
+        raise ValueError(f"Argument 'x' must be in range [0,1], got {x}.")
+
+    def many(self, xs:Iterable[float], out:MutableSequence[float]|None=None, check:bool=True) -> MutableSequence[float]:
+        """Evaluate the curve at every x in xs, returning an array('d') (or filling out). Pass check=False to skip the bulk range check."""
+        xs = _as_sequence(xs)
+        if check:
+            _check_range_many(xs, 0, 1, "xs")
+        return _fill(out, map(self.unchecked, xs), len(xs))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.k})"
+
+class HalfCurve(Curve):
+    """nthsig with k fixed at construction. See Curve.
+
+    Args:
+        k (float): Must be in range [-1,1]. The shape of the curve.
+    """
+
+    __slots__ = ()
+
+    def _kernel(self) -> Callable[[float], float]:
+        return _nthsig_kernel(self.k)
+
+class BiasedCurve(Curve):
+    """biased_curve with k, a and b fixed at construction. See Curve.
+
+    Args:
+        k (float): Must be in range [-1,1]. The bias of the curve.
+        a (float): The y value at x=0.
+        b (float): The y value at x=1.
+    """
+
+    __slots__ = ("a", "b")
+
+    def __init__(self, k:float, a:float, b:float):
+        self.a = a
+        self.b = b
+        super().__init__(k)
+
+    def _kernel(self) -> Callable[[float], float]:
+        return _biased_curve_kernel(self.k, self.a, self.b)
+
+    def __repr__(self) -> str:
+        return f"BiasedCurve({self.k}, {self.a}, {self.b})"
+
+# --- Unchecked scalar kernels ---
+# Each factory takes an already-validated k and returns a function of x alone, with the k edge cases resolved up front and the constant parts of _dd_ntsig hoisted out.
+# The general-k closures skip the x in (0, 0.5, 1) shortcuts: the rational form returns exactly those values there (the denominator reduces to the numerator's (k-1)), so the results still match the scalar functions bit for bit.
+
+def _identity(x:float) -> float:
+    return x
+
+def _ntsig_kernel(k:float) -> Callable[[float], float]:
+    if k == 0: return _identity
+    if k == -1: return lambda x: x if x == 0 or x == 1 else 0.5
+    if k == 1: return lambda x: x if x == 0.5 else (0.0 if x < 0.5 else 1.0)
+
+    k = -k
+    km1 = k - 1
+    k2 = 2 * k
+    def f(x:float) -> float:
+        x = x * 2 - 1
+        return (km1 * x / (k2 * abs(x) - k - 1) + 1) / 2
+    return f
+
+def _nthsig_kernel(k:float) -> Callable[[float], float]:
+    if k == 0: return _identity
+    if k == -1: return lambda x: x if x == 1 else 0.0
+    if k == 1: return lambda x: x if x == 0 else 1.0
+
+    k = -k
+    km1 = k - 1
+    k2 = 2 * k
+    return lambda x: km1 * x / (k2 * x - k - 1)
+
+def _biased_curve_kernel(k:float, a:float, b:float) -> Callable[[float], float]:
+    ba = b - a
+    if k in (-1, 0, 1):
+        f = _nthsig_kernel(k)
+        return lambda x: a + ba * f(x)
+
+    k = -k
+    km1 = k - 1
+    k2 = 2 * k
+    return lambda x: a + ba * (km1 * x / (k2 * x - k - 1))
+
+# --- numpy paths (only reached when the caller already passed numpy arrays) ---
+
+def _ntsig_numpy(np, k:float, xs, out, name:str="xs", check:bool=True):
+    xs = np.asarray(xs, dtype=float)
+    if check:
+        _check_range_numpy(np, xs, 0, 1, name)
+    buf = _numpy_out(np, out, xs.shape)
+    edge = (xs == 0) | (xs == 0.5) | (xs == 1)
+
+    if k == 0:
+        np.copyto(buf, xs)
+        return _numpy_result(out, buf)
+    if k == -1:
+        y = np.full(xs.shape, 0.5)
+    elif k == 1:
+        y = np.where(xs < 0.5, 0.0, 1.0)
+    else:
+        k = -k
+        xt = xs * 2 - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = ((k - 1) * xt / (2 * k * np.abs(xt) - k - 1) + 1) / 2
+    np.copyto(y, xs, where=edge)
+    np.copyto(buf, y)
+    return _numpy_result(out, buf)
+
+def _biased_curve_numpy(np, k:float, a:float, b:float, xs, out, name:str="xs", check:bool=True):
+    xs = np.asarray(xs, dtype=float)
+    if check:
+        _check_range_numpy(np, xs, 0, 1, name)
+    buf = _numpy_out(np, out, xs.shape)
+    edge = (xs == 0) | (xs == 1)
+
+    if k == 0:
+        y = xs.copy()
+    elif k == -1:
+        y = np.zeros(xs.shape)
+    elif k == 1:
+        y = np.ones(xs.shape)
+    else:
+        k = -k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = (k - 1) * xs / (2 * k * xs - k - 1)
+    np.copyto(y, xs, where=edge)
+    if a != 0 or b != 1:
+        y = a + (b - a) * y
+    np.copyto(buf, y)
+    return _numpy_result(out, buf)
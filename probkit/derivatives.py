@@ -0,0 +1,304 @@
+"""
+Analytic derivatives of the probkit curves and of modified_probability.
+
+Every function returns a Gradient(y, dk, dx): the value and its partial derivatives with respect to k and x, from one evaluation.
+They share the denominator of the curves' rational form, so the gradient costs a few multiplications on top of the value instead of the two extra evaluations (and the cancellation error near k=±1) of a finite difference:
+
+    y, dk, dx = nthsig_grad(0.3, 0.2)
+    ys, dks, dxs = nthsig_grad_many(0.3, xs)
+
+With s = -k and D = 2s*x - s - 1, nthsig is y = (s-1)x / D, so
+
+    dy/dx = (1-k²) / D²        dy/dk = 2x(1-x) / D²
+
+ntsig is the same map on either side of x=0.5 (u = 2x-1, D = 2s|u| - s - 1, dy/dx = (1-k²)/D², dy/dk = u(1-|u|)/D²), and biased_curve scales both by (b-a).
+modified_probability is p = kx / D with D = k(x-1) + 1, so dp/dk = x/D² and dp/dx = k(1-k)/D², x being the ratio.
+
+y is bit-identical to the corresponding curve function. At k=±1 the curves have a step (nthsig at x=0 or 1, ntsig at x=0.5 or at the ends); there dx is inf and dk is 0, the limits from inside the domain.
+"""
+
+__all__ = [
+    "Gradient",
+    "ntsig_grad", "nthsig_grad", "biased_curve_grad", "modified_probability_grad",
+    "ntsig_grad_many", "nthsig_grad_many", "biased_curve_grad_many", "modified_probability_grad_many",
+]
+
+from array import array
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+from .curves import _biased_curve_numpy, _nthsig_kernel, _ntsig_kernel, _ntsig_numpy
+from .probability import _broadcast_len, _is_vector
+from .utils import effective_ratio, _as_sequence, _check_min_many, _check_range_many, _check_range_numpy, _fill, _numpy_for
+
+_INF = float('inf')
+
+
+class Gradient(NamedTuple):
+    """A function value and its partial derivatives in k and x. Arrays for the *_many functions."""
+    y: Any
+    dk: Any
+    dx: Any
+
+
+# --- Scalar ---
+
+def ntsig_grad(k:float, x:float) -> Gradient:
+    """ntsig(k, x) and its partial derivatives in k and x.
+
+    Args:
+        k (float): Must be in range [-1,1].
+        x (float): Must be in range [0,1].
+    Returns:
+        Gradient: (ntsig(k, x), d/dk, d/dx).
+    """
+    _check_k(k)
+    _check_x(x)
+    s = -k
+    u = x * 2 - 1
+    au = abs(u)
+    d = 2 * s * au - s - 1
+    if d == 0:
+        return Gradient(x, 0.0, _INF)
+    dd = d * d
+    y = _ntsig_kernel(k)(x) if k in (-1, 0, 1) else ((s - 1) * u / d + 1) / 2
+    return Gradient(y, u * (1 - au) / dd, (1 - k * k) / dd)
+
+def nthsig_grad(k:float, x:float) -> Gradient:
+    """nthsig(k, x) and its partial derivatives in k and x.
+
+    Args:
+        k (float): Must be in range [-1,1].
+        x (float): Must be in range [0,1].
+    Returns:
+        Gradient: (nthsig(k, x), d/dk, d/dx).
+    """
+    _check_k(k)
+    _check_x(x)
+    s = -k
+    d = 2 * s * x - s - 1
+    if d == 0:
+        return Gradient(x, 0.0, _INF)
+    dd = d * d
+    y = _nthsig_kernel(k)(x) if k in (-1, 0, 1) else (s - 1) * x / d + 0.0
+    return Gradient(y, 2 * x * (1 - x) / dd, (1 - k * k) / dd)
+
+def biased_curve_grad(k:float, a:float, b:float, x:float) -> Gradient:
+    """biased_curve(k, a, b, x) and its partial derivatives in k and x.
+
+    The derivatives in a and b need no extra work: they are 1-t and t, where t = (y-a)/(b-a) is the underlying nthsig value.
+
+    Args:
+        k (float): Must be in range [-1,1].
+        a (float): The y value at x=0.
+        b (float): The y value at x=1.
+        x (float): Must be in range [0,1].
+    Returns:
+        Gradient: (biased_curve(k, a, b, x), d/dk, d/dx).
+    """
+    t, dk, dx = nthsig_grad(k, x)
+    ba = b - a
+    if ba == 0:
+        return Gradient(a + ba * t, 0.0, 0.0)
+    return Gradient(a + ba * t, ba * dk, ba * dx)
+
+def modified_probability_grad(k:float, a:float, b:float|None=None) -> Gradient:
+    """modified_probability(k, a, b) and its partial derivatives in k and in the ratio.
+
+    Args:
+        k (float): Base probability in [0,1].
+        a (float): Ratio (if b is None) or numerator (if b is provided).
+        b (float, optional): Denominator of the ratio.
+    Returns:
+        Gradient: (modified_probability(k, a, b), d/dk, d/dx) where x is the ratio a/b. Chain through a/b for the derivatives in a and b.
+    """
+    x = a if b is None else effective_ratio(a, b)
+    if not 0 <= k <= 1:
+        raise ValueError(f"Base probability 'k' must be in range [0,1], got {k}.")
+    if x < 0:
+        raise ValueError(f"Ratio may not be negative, got {x}.")
+    return Gradient(*_modified_probability_grad(k, x))
+
+# --- Batch ---
+
+def ntsig_grad_many(k:float, xs:Iterable[float]) -> Gradient:
+    """Batch version of ntsig_grad: values and derivatives at every x in xs, each as an array('d') (numpy arrays when xs is one)."""
+    _check_k(k)
+    np = _numpy_for(xs)
+    if np is not None:
+        return _curve_grad_numpy(np, k, 0, 1, xs, True)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _unzip(map(_ntsig_grad_kernel(k), xs), len(xs))
+
+def nthsig_grad_many(k:float, xs:Iterable[float]) -> Gradient:
+    """Batch version of nthsig_grad: values and derivatives at every x in xs, each as an array('d') (numpy arrays when xs is one)."""
+    _check_k(k)
+    np = _numpy_for(xs)
+    if np is not None:
+        return _curve_grad_numpy(np, k, 0, 1, xs, False)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _unzip(map(_nthsig_grad_kernel(k), xs), len(xs))
+
+def biased_curve_grad_many(k:float, a:float, b:float, xs:Iterable[float]) -> Gradient:
+    """Batch version of biased_curve_grad: values and derivatives at every x in xs, each as an array('d') (numpy arrays when xs is one)."""
+    _check_k(k)
+    np = _numpy_for(xs)
+    if np is not None:
+        return _curve_grad_numpy(np, k, a, b, xs, False)
+    xs = _as_sequence(xs)
+    _check_range_many(xs, 0, 1, "xs")
+    return _unzip(map(_biased_curve_grad_kernel(k, a, b), xs), len(xs))
+
+def modified_probability_grad_many(k:float|Iterable[float], a:float|Iterable[float], b:float|Iterable[float]|None=None) -> Gradient:
+    """Batch version of modified_probability_grad, broadcasting over k, a and b like modified_probability_many."""
+    np = _numpy_for(k, a, b)
+    if np is not None:
+        return _modified_probability_grad_numpy(np, k, a, b)
+
+    args = [_as_sequence(v) if _is_vector(v) else v for v in (k, a, b)]
+    n = _broadcast_len(args)
+    k, a, b = (v if v is None or _is_vector(v) else [v] * n for v in args)
+    x = a if b is None else array('d', map(effective_ratio, a, b))
+
+    _check_range_many(k, 0, 1, "k", "Base probability 'k' must be in range [0,1], got {x} at index {i}.")
+    _check_min_many(x, 0, "Ratio may not be negative, got {x} at index {i}.")
+    return _unzip(map(_modified_probability_grad, k, x), n)
+
+# --- Kernels ---
+# Like the curve kernels, each factory takes an already-validated k and returns a function of x alone, here returning (y, dy/dk, dy/dx).
+# One formula covers the derivatives for every k: at k=±1 the factor (1-k²) zeroes dy/dx, and where D itself is 0 the step limits are returned.
+# For k in (-1, 0, 1) the value comes from the curve kernel instead, since the rational form is off by rounding there (1.0000000000000002 for nthsig(1, 0.1)).
+
+def _with_curve_value(f:Callable[[float], tuple[float, float, float]], curve:Callable[[float], float]) -> Callable[[float], tuple[float, float, float]]:
+    def g(x:float) -> tuple[float, float, float]:
+        _, dk, dx = f(x)
+        return (curve(x), dk, dx)
+    return g
+
+def _nthsig_grad_kernel(k:float) -> Callable[[float], tuple[float, float, float]]:
+    s = -k
+    sm1 = s - 1
+    s2 = 2 * s
+    c = 1 - k * k
+    def f(x:float) -> tuple[float, float, float]:
+        d = s2 * x - s - 1
+        if d == 0:
+            return (x, 0.0, _INF)
+        dd = d * d
+        # + 0.0 turns the -0.0 of k=-1 (and of x=0) into the 0 nthsig returns.
+        return (sm1 * x / d + 0.0, 2 * x * (1 - x) / dd, c / dd)
+    return _with_curve_value(f, _nthsig_kernel(k)) if k in (-1, 0, 1) else f
+
+def _ntsig_grad_kernel(k:float) -> Callable[[float], tuple[float, float, float]]:
+    s = -k
+    sm1 = s - 1
+    s2 = 2 * s
+    c = 1 - k * k
+    def f(x:float) -> tuple[float, float, float]:
+        u = x * 2 - 1
+        au = abs(u)
+        d = s2 * au - s - 1
+        if d == 0:
+            return (x, 0.0, _INF)
+        dd = d * d
+        return ((sm1 * u / d + 1) / 2, u * (1 - au) / dd, c / dd)
+    return _with_curve_value(f, _ntsig_kernel(k)) if k in (-1, 0, 1) else f
+
+def _biased_curve_grad_kernel(k:float, a:float, b:float) -> Callable[[float], tuple[float, float, float]]:
+    ba = b - a
+    f = _nthsig_grad_kernel(k)
+    def g(x:float) -> tuple[float, float, float]:
+        t, dk, dx = f(x)
+        if ba == 0:
+            return (a + ba * t, 0.0, 0.0)
+        return (a + ba * t, ba * dk, ba * dx)
+    return g
+
+def _modified_probability_grad(k:float, x:float) -> tuple[float, float, float]:
+    if x == _INF:
+        return (1.0, 0.0, 0.0)
+    kx = k * x
+    d = kx - k + 1
+    if d == 0:
+        # k=1, x=0: p jumps from 0 to 1 as the ratio leaves 0.
+        return (0.0, 0.0, _INF)
+    dd = d * d
+    return (kx / d, x / dd, k * (1 - k) / dd)
+
+def _unzip(rows:Iterable[tuple[float, float, float]], n:int) -> Gradient:
+    if n == 0:
+        return Gradient(*(_fill(None, (), 0) for _ in range(3)))
+    return Gradient(*(_fill(None, column, n) for column in zip(*rows)))
+
+def _check_k(k:float) -> None:
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+
+def _check_x(x:float) -> None:
+    if not 0 <= x <= 1:
+        raise ValueError(f"Argument 'x' must be in range [0,1], got {x}.")
+
+# --- numpy paths ---
+
+def _curve_grad_numpy(np, k:float, a:float, b:float, xs, symmetric:bool) -> Gradient:
+    xs = np.asarray(xs, dtype=float)
+    _check_range_numpy(np, xs, 0, 1, "xs")
+    s = -k
+    u = xs * 2 - 1 if symmetric else xs
+    au = np.abs(u) if symmetric else u
+    d = 2 * s * au - s - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = (s - 1) * u / d + 0.0
+        dd = d * d
+        dk = (u if symmetric else 2 * u) * (1 - au) / dd
+        dx = (1 - k * k) / dd
+    if symmetric:
+        y = (y + 1) / 2
+    step = d == 0
+    y = np.where(step, xs, y)
+    if k in (-1, 0, 1):
+        y = _ntsig_numpy(np, k, xs, None, check=False) if symmetric else _biased_curve_numpy(np, k, 0, 1, xs, None, check=False)
+    dk = np.where(step, 0.0, dk)
+    dx = np.where(step, _INF, dx)
+    ba = b - a
+    if a != 0 or b != 1:
+        y = a + ba * y
+        dk, dx = (ba * dk, ba * dx) if ba != 0 else (np.zeros(xs.shape), np.zeros(xs.shape))
+    return Gradient(y, dk, dx)
+
+def _modified_probability_grad_numpy(np, k, a, b) -> Gradient:
+    k = np.asarray(k, dtype=float)
+    a = np.asarray(a, dtype=float)
+    if b is None:
+        x = a
+    else:
+        b = np.asarray(b, dtype=float)
+        a, b = np.broadcast_arrays(a, b)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.where(a == 0, 0.0, np.where(b == 0, np.where(a > 0, _INF, -_INF), a / b))
+    k, x = np.broadcast_arrays(k, x)
+
+    bad = ~((k >= 0) & (k <= 1))
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"Base probability 'k' must be in range [0,1], got {k.flat[i]} at index {i}.")
+    bad = x < 0
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"Ratio may not be negative, got {x.flat[i]} at index {i}.")
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        kx = k * x
+        d = kx - k + 1
+        dd = d * d
+        p = kx / d
+        dk = x / dd
+        dx = k * (1 - k) / dd
+    inf, jump = x == _INF, d == 0
+    return Gradient(
+        np.select([inf, jump], [1.0, 0.0], p),
+        np.select([inf, jump], [0.0, 0.0], dk),
+        np.select([inf, jump], [0.0, _INF], dx),
+    )
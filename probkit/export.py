@@ -0,0 +1,277 @@
+"""
+Bulk binary export of sampler output, and zero-copy replay.
+
+write_samples() streams n samples of one sampler to a file (or stdout) in fixed-size chunks, so memory stays constant however large n is:
+
+    header = write_samples("ntsig.pk", "ntsig", (0.3,), 10**9, seed=42)
+    with SampleFile("ntsig.pk") as f:
+        total = math.fsum(f.values)      # memory-mapped, nothing is copied
+        again = f.regenerate(7)          # chunk 7, recomputed from the header
+
+Chunk c is drawn from rng_type(child_seed(seed, c)), the same scheme as probkit.parallel.run, so any chunk can be regenerated from (seed, c) alone.
+Formats:
+    "probkit"  A JSON header (kind, args, seed, rng, chunk_size, first_chunk, count, dtype) followed by the data, 64-byte aligned.
+    "npy"      numpy's .npy format (np.load(path, mmap_mode="r") reads it). The header only records dtype and shape.
+    "raw"      The data alone.
+The data is little-endian float64 ("f8") or float32 ("f4") in every format.
+"""
+
+__all__ = ["KINDS", "write_samples", "generate_chunk", "SampleFile"]
+
+import ast
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Callable
+from typing import BinaryIO
+
+from .parallel import child_seed
+from .pipeline import Pipeline
+from .sampling import CounterRNG, ProbkitRNG
+
+# Sampler kinds and their argument names. Each sample is the function applied to one random() value,
+# as rng.ntsig(k) is ntsig(k, rng.random()); for modified_probability the random value is the base probability.
+KINDS = {
+    "ntsig": ("k",),
+    "nthsig": ("k",),
+    "biased_curve": ("k", "a", "b"),
+    "modified_probability": ("a", "b"),
+}
+
+_RNG_TYPES = {"ProbkitRNG": ProbkitRNG, "CounterRNG": CounterRNG}
+_TYPECODES = {"f8": "d", "f4": "f"}
+_FORMATS = ("probkit", "npy", "raw")
+_PROBKIT_MAGIC = b"\x93PROBKIT"
+_NPY_MAGIC = b"\x93NUMPY"
+_ALIGN = 64
+_VERSION = 1
+
+
+def write_samples(
+    file:str|os.PathLike|BinaryIO,
+    kind:str,
+    args:tuple,
+    n:int,
+    seed:int|str,
+    format:str="probkit",
+    dtype:str="f8",
+    chunk_size:int=1 << 16,
+    first_chunk:int=0,
+    rng_type:str="ProbkitRNG",
+) -> dict:
+    """Write n samples of kind(*args) to file in chunks, returning the header describing them.
+
+    Args:
+        file (str|PathLike|file): Path to create, or a binary file object such as sys.stdout.buffer.
+        kind (str): One of KINDS: "ntsig", "nthsig", "biased_curve" or "modified_probability".
+        args (tuple): The sampler's arguments, e.g. (k,) or (k, a, b). modified_probability takes (a,) or (a, b).
+        n (int): Number of samples.
+        seed (int|str): Root seed. Chunk c uses child_seed(seed, c).
+        format (str): "probkit", "npy" or "raw".
+        dtype (str): "f8" (float64) or "f4" (float32).
+        chunk_size (int): Samples per chunk. Part of the dataset's identity: changing it changes the streams.
+        first_chunk (int): Index of the first chunk, so one dataset can be split across files.
+        rng_type (str): "ProbkitRNG" or "CounterRNG".
+    Returns:
+        dict: The header: everything needed to regenerate any chunk with generate_chunk().
+    """
+    if n < 0:
+        raise ValueError(f"Sample count must not be negative, got {n}.")
+    if format not in _FORMATS:
+        raise ValueError(f"Argument 'format' must be one of {_FORMATS}, got {format!r}.")
+    header = _header(kind, args, n, seed, dtype, chunk_size, first_chunk, rng_type)
+    f = _sampler(kind, args)
+    if format == "probkit":
+        prefix = _probkit_prefix(header)
+    elif format == "npy":
+        prefix = _npy_prefix(header)
+    else:
+        prefix = b""
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as out:
+            _write(out, prefix, header, f)
+    else:
+        _write(file, prefix, header, f)
+        file.flush()
+    return header
+
+def generate_chunk(header:dict, i:int) -> array:
+    """Recompute chunk i (counted from the file's first chunk) of the dataset described by header, as an array of its dtype."""
+    chunks = _chunk_count(header)
+    if not 0 <= i < chunks:
+        raise IndexError(f"Chunk index must be in range [0,{chunks}), got {i}.")
+    return _chunk(header, _sampler(header["kind"], header["args"]), i)
+
+
+class SampleFile:
+    """A memory-mapped sample file written by write_samples() (any format), for zero-copy replay.
+
+    Args:
+        path (str|PathLike): The file.
+        dtype (str): "f8" or "f4". Only used for raw files; the others record their dtype.
+
+    Attributes:
+        header (dict|None): The write_samples() header for "probkit" files, else None.
+        format (str): "probkit", "npy" or "raw".
+        dtype (str): "f8" or "f4".
+        values (memoryview): The samples, as a flat memoryview of doubles or floats backed by the mapped file.
+    """
+
+    def __init__(self, path:str|os.PathLike, dtype:str="f8"):
+        if sys.byteorder != "little":
+            raise OSError("SampleFile maps little-endian data directly and needs a little-endian host.")
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        buffer = memoryview(self._mmap if self._mmap is not None else b"")
+        try:
+            self.header, self.format, self.dtype, offset, count = _parse(buffer, dtype)
+            width = struct.calcsize(_TYPECODES[self.dtype])
+            if count is None:
+                count = (len(buffer) - offset) // width
+            if offset + count * width > len(buffer):
+                raise ValueError(f"File is truncated: expected {count} samples after a {offset}-byte header, got {len(buffer)} bytes.")
+            self.values = buffer[offset:offset + count * width].cast(_TYPECODES[self.dtype])
+        except BaseException:
+            # Unmap a file we cannot read now rather than when the half-built object is collected.
+            buffer.release()
+            if self._mmap is not None:
+                self._mmap.close()
+            raise
+        buffer.release()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def chunk(self, i:int) -> memoryview:
+        """The samples of chunk i (counted from the file's first chunk), as a view. Needs a header."""
+        size = self._require_header()["chunk_size"]
+        if not 0 <= i < _chunk_count(self.header):
+            raise IndexError(f"Chunk index must be in range [0,{_chunk_count(self.header)}), got {i}.")
+        return self.values[i * size:(i + 1) * size]
+
+    def regenerate(self, i:int) -> array:
+        """Recompute chunk i from the header; equal to chunk(i)."""
+        return generate_chunk(self._require_header(), i)
+
+    def close(self) -> None:
+        """Release the values view and unmap the file. Views taken from values or chunk() must be released (or dropped) first."""
+        self.values.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "SampleFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _require_header(self) -> dict:
+        if self.header is None:
+            raise ValueError(f"A {self.format} file has no seed header; write it with format='probkit' to regenerate chunks.")
+        return self.header
+
+    def __repr__(self) -> str:
+        return f"SampleFile({self.format}, {self.dtype}, {len(self.values)} samples)"
+
+
+# --- Writing ---
+
+def _header(kind:str, args:tuple, n:int, seed:int|str, dtype:str, chunk_size:int, first_chunk:int, rng_type:str) -> dict:
+    if dtype not in _TYPECODES:
+        raise ValueError(f"Argument 'dtype' must be one of {tuple(_TYPECODES)}, got {dtype!r}.")
+    if rng_type not in _RNG_TYPES:
+        raise ValueError(f"Argument 'rng_type' must be one of {tuple(_RNG_TYPES)}, got {rng_type!r}.")
+    if chunk_size < 1:
+        raise ValueError(f"Argument 'chunk_size' must be at least 1, got {chunk_size}.")
+    if first_chunk < 0:
+        raise ValueError(f"Argument 'first_chunk' must not be negative, got {first_chunk}.")
+    if isinstance(seed, bool) or not isinstance(seed, (int, str)):
+        raise TypeError(f"Argument 'seed' must be int or str so it can be stored in the header, got {type(seed).__name__}.")
+    return {
+        "format": "probkit",
+        "version": _VERSION,
+        "kind": kind,
+        "args": [float(x) for x in args],
+        "seed": seed,
+        "rng": rng_type,
+        "chunk_size": chunk_size,
+        "first_chunk": first_chunk,
+        "count": n,
+        "dtype": dtype,
+    }
+
+def _sampler(kind:str, args) -> Callable[[float], float]:
+    """The unchecked function of one random() value for kind(*args), with args validated once (by the matching Pipeline stage)."""
+    if kind not in KINDS:
+        raise ValueError(f"Argument 'kind' must be one of {tuple(KINDS)}, got {kind!r}.")
+    names = KINDS[kind]
+    required = len(names) - (kind == "modified_probability")
+    if not required <= len(args) <= len(names):
+        raise ValueError(f"{kind} takes arguments ({', '.join(names)}), got {tuple(args)}.")
+    return getattr(Pipeline(), kind)(*args).unchecked
+
+def _write(out:BinaryIO, prefix:bytes, header:dict, f:Callable[[float], float]) -> None:
+    out.write(prefix)
+    for i in range(_chunk_count(header)):
+        out.write(_chunk(header, f, i))
+
+def _chunk(header:dict, f:Callable[[float], float], i:int) -> array:
+    size = header["chunk_size"]
+    n = min(size, header["count"] - i * size)
+    r = _RNG_TYPES[header["rng"]](child_seed(header["seed"], header["first_chunk"] + i))
+    values = array(_TYPECODES[header["dtype"]], map(f, r._uniforms(n)))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+def _chunk_count(header:dict) -> int:
+    return -(-header["count"] // header["chunk_size"])
+
+def _padding(used:int) -> bytes:
+    return b" " * (-used % _ALIGN)
+
+def _probkit_prefix(header:dict) -> bytes:
+    # magic, uint32 header length, JSON header padded with spaces so the data is aligned.
+    text = json.dumps(header, separators=(",", ":")).encode()
+    body = text + _padding(len(_PROBKIT_MAGIC) + 4 + len(text))
+    return _PROBKIT_MAGIC + struct.pack("<I", len(body)) + body
+
+def _npy_prefix(header:dict) -> bytes:
+    # .npy format version 1.0: magic, version, uint16 header length, a dict literal padded with spaces and ending in a newline.
+    lead = _NPY_MAGIC + b"\x01\x00"
+    text = f"{{'descr': '<{header['dtype']}', 'fortran_order': False, 'shape': ({header['count']},), }}".encode()
+    body = text + _padding(len(lead) + 2 + len(text) + 1) + b"\n"
+    return lead + struct.pack("<H", len(body)) + body
+
+
+# --- Reading ---
+
+def _parse(buffer:memoryview, dtype:str) -> tuple:
+    """Return (header, format, dtype, data offset, sample count or None) for a mapped file."""
+    head = bytes(buffer[:_ALIGN])
+    if head.startswith(_PROBKIT_MAGIC):
+        start = len(_PROBKIT_MAGIC) + 4
+        (length,) = struct.unpack_from("<I", head, len(_PROBKIT_MAGIC))
+        header = json.loads(bytes(buffer[start:start + length]))
+        if header.get("version") != _VERSION:
+            raise ValueError(f"Unsupported probkit sample file version {header.get('version')!r}.")
+        return header, "probkit", header["dtype"], start + length, header["count"]
+    if head.startswith(_NPY_MAGIC):
+        major = head[6]
+        size, fmt = (2, "<H") if major == 1 else (4, "<I")
+        (length,) = struct.unpack_from(fmt, head, 8)
+        start = 8 + size
+        meta = ast.literal_eval(bytes(buffer[start:start + length]).decode("latin1"))
+        descr = meta["descr"]
+        if descr not in ("<f8", "<f4") or meta["fortran_order"] or len(meta["shape"]) != 1:
+            raise ValueError(f"Only 1-d little-endian float64/float32 .npy files are supported, got {meta}.")
+        return None, "npy", descr[1:], start + length, meta["shape"][0]
+    if dtype not in _TYPECODES:
+        raise ValueError(f"Argument 'dtype' must be one of {tuple(_TYPECODES)}, got {dtype!r}.")
+    return None, "raw", dtype, 0, None
@@ -0,0 +1,315 @@
+"""
+Solve for the k that makes a probkit curve hit a target.
+
+Point targets ("the curve must pass through (0.2, 0.05)") have closed-form solutions: nthsig is the rational map y = (s-1)x / (2sx - s - 1) with s = -k, which is linear in s once y is fixed,
+and ntsig is the same map applied to |2x-1| on either side of 0.5.
+
+    k, residual = fit_nthsig(0.2, 0.05)
+    ks, residuals = fit_nthsig_many(xs, ys)
+
+Mean targets ("the mean sampled drop must be 0.3") are solved with Newton's method on the analytic mean (see probkit.stats) and its derivative, safeguarded by bisection so every step stays inside a shrinking bracket on [-1,1]:
+
+    k, residual = fit_nthsig_mean(0.3)                 # mean of rng.nthsig(k)
+    k, residual = fit_nthsig_mean(0.3, variate=True)   # mean of rng.nthsig_variate(k)
+
+ntsig has no mean fit: it is symmetric about (0.5, 0.5), so its samples average 0.5 for every k.
+Every solver returns a FitResult(k, residual), where residual is the achieved value minus the target. The *_many versions take sequences (or numpy arrays) and return a FitResult of arrays.
+"""
+
+__all__ = [
+    "FitResult",
+    "fit_ntsig", "fit_nthsig", "fit_biased_curve",
+    "fit_ntsig_many", "fit_nthsig_many", "fit_biased_curve_many",
+    "fit_nthsig_mean", "fit_biased_curve_mean",
+    "fit_nthsig_mean_many", "fit_biased_curve_mean_many",
+]
+
+from array import array
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from . import curves
+from .probability import _broadcast_len, _is_vector
+from .stats import _nthsig_mean, _nthsig_mean_and_slope_numpy, _nthsig_numpy
+from .utils import _numpy_for
+
+_MAX_ITER = 100
+
+
+class FitResult(NamedTuple):
+    """The fitted k and the residual (achieved value minus target). Arrays for the *_many solvers."""
+    k: Any
+    residual: Any
+
+
+# --- Point targets ---
+
+def fit_nthsig(x:float, y:float) -> FitResult:
+    """Find k such that nthsig(k, x) == y.
+
+    Args:
+        x (float): Must be in range [0,1].
+        y (float): Must be in range [0,1].
+    Returns:
+        FitResult: k in [-1,1] and nthsig(k, x) - y. Where every k works (x at 0 or 1 with y == x), k is 0.
+    """
+    _check_unit(x, "x")
+    _check_unit(y, "y")
+    k = _nthsig_point(x, y)
+    if k is None:
+        raise ValueError(f"No k in [-1,1] gives nthsig(k, {x}) == {y}.")
+    return FitResult(k, curves.nthsig(k, x) - y)
+
+def fit_ntsig(x:float, y:float) -> FitResult:
+    """Find k such that ntsig(k, x) == y.
+
+    ntsig keeps each half of the unit interval on its side of 0.5, so y must be on the same side of 0.5 as x (or equal to 0.5).
+
+    Args:
+        x (float): Must be in range [0,1].
+        y (float): Must be in range [0,1].
+    Returns:
+        FitResult: k in [-1,1] and ntsig(k, x) - y. Where every k works (x at 0, 0.5 or 1 with y == x), k is 0.
+    """
+    _check_unit(x, "x")
+    _check_unit(y, "y")
+    k = _ntsig_point(x, y)
+    if k is None:
+        raise ValueError(f"No k in [-1,1] gives ntsig(k, {x}) == {y}.")
+    return FitResult(k, curves.ntsig(k, x) - y)
+
+def fit_biased_curve(a:float, b:float, x:float, y:float) -> FitResult:
+    """Find k such that biased_curve(k, a, b, x) == y.
+
+    Args:
+        a (float): The curve's value at x=0.
+        b (float): The curve's value at x=1. Must differ from a.
+        x (float): Must be in range [0,1].
+        y (float): Must be between a and b.
+    Returns:
+        FitResult: k in [-1,1] and biased_curve(k, a, b, x) - y.
+    """
+    _check_unit(x, "x")
+    if a == b:
+        raise ValueError(f"Arguments 'a' and 'b' must differ to fit k, got a=b={a}.")
+    k = _nthsig_point(x, (y - a) / (b - a))
+    if k is None:
+        raise ValueError(f"No k in [-1,1] gives biased_curve(k, {a}, {b}, {x}) == {y}.")
+    return FitResult(k, curves.biased_curve(k, a, b, x) - y)
+
+def fit_nthsig_many(xs:float|Iterable[float], ys:float|Iterable[float]) -> FitResult:
+    """Batch version of fit_nthsig, broadcasting scalars against equal-length sequences (or numpy arrays)."""
+    np = _numpy_for(xs, ys)
+    if np is not None:
+        return _fit_point_numpy(np, "nthsig", 0, 1, xs, ys)
+    return _fit_point_many("nthsig", _nthsig_point, curves.nthsig, xs, ys)
+
+def fit_ntsig_many(xs:float|Iterable[float], ys:float|Iterable[float]) -> FitResult:
+    """Batch version of fit_ntsig, broadcasting scalars against equal-length sequences (or numpy arrays)."""
+    np = _numpy_for(xs, ys)
+    if np is not None:
+        return _fit_point_numpy(np, "ntsig", 0, 1, xs, ys)
+    return _fit_point_many("ntsig", _ntsig_point, curves.ntsig, xs, ys)
+
+def fit_biased_curve_many(a:float, b:float, xs:float|Iterable[float], ys:float|Iterable[float]) -> FitResult:
+    """Batch version of fit_biased_curve for fixed a and b, broadcasting scalars against equal-length sequences (or numpy arrays)."""
+    if a == b:
+        raise ValueError(f"Arguments 'a' and 'b' must differ to fit k, got a=b={a}.")
+    np = _numpy_for(xs, ys)
+    if np is not None:
+        return _fit_point_numpy(np, "biased_curve", a, b, xs, ys)
+    ba = b - a
+    return _fit_point_many(
+        "biased_curve",
+        lambda x, y: _nthsig_point(x, (y - a) / ba),
+        lambda k, x: curves.biased_curve(k, a, b, x),
+        xs, ys,
+    )
+
+def _nthsig_point(x:float, y:float) -> float|None:
+    """Closed-form k for nthsig(k, x) == y, or None if there is none. Arguments are not range checked beyond that."""
+    if x == 0 or x == 1:
+        return 0.0 if y == x else None
+    if not 0 <= y <= 1:
+        return None
+    # y * (2sx - s - 1) == (s-1) * x, solved for s = -k. The denominator is -(x(1-y) + y(1-x)), never 0 for x in (0,1).
+    k = (x - y) / (2 * x * y - x - y)
+    return min(1.0, max(-1.0, k))
+
+def _ntsig_point(x:float, y:float) -> float|None:
+    if x == 0.5:
+        return 0.0 if y == 0.5 else None
+    u = 2 * x - 1
+    v = 2 * y - 1
+    if u < 0:
+        u, v = -u, -v
+    if v < 0:
+        return None
+    # On each side of 0.5, ntsig is nthsig applied to |2x-1|.
+    return _nthsig_point(u, v)
+
+def _fit_point_many(name, solve, f, xs, ys) -> FitResult:
+    n = _broadcast_len([xs, ys])
+    xs = xs if _is_vector(xs) else [xs] * n
+    ys = ys if _is_vector(ys) else [ys] * n
+    ks = array('d')
+    residuals = array('d')
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        if not 0 <= x <= 1:
+            raise ValueError(f"Argument 'xs' must be in range [0,1], got {x} at index {i}.")
+        k = solve(x, y)
+        if k is None:
+            raise ValueError(f"No k in [-1,1] fits {name} to y={y} at x={x} (index {i}).")
+        ks.append(k)
+        residuals.append(f(k, x) - y)
+    return FitResult(ks, residuals)
+
+def _fit_point_numpy(np, name, a, b, xs, ys) -> FitResult:
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    bad = ~((xs >= 0) & (xs <= 1))
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"Argument 'xs' must be in range [0,1], got {xs.flat[i]} at index {i}.")
+    vs = (ys - a) / (b - a)
+    if name == "ntsig":
+        us = 2 * xs - 1
+        sign = np.where(us < 0, -1.0, 1.0)
+        us, vs = us * sign, (2 * vs - 1) * sign
+    else:
+        us = xs
+    fixed = (us == 0) | (us == 1)
+    ok = np.where(fixed, vs == us, (vs >= 0) & (vs <= 1))
+    if not ok.all():
+        i = int(np.flatnonzero(~ok)[0])
+        raise ValueError(f"No k in [-1,1] fits {name} to y={ys.flat[i]} at x={xs.flat[i]} (index {i}).")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ks = np.clip((us - vs) / (2 * us * vs - us - vs), -1.0, 1.0)
+    ks = np.where(fixed, 0.0, ks)
+    fitted = _nthsig_numpy(np, ks, us)
+    if name == "ntsig":
+        fitted = (fitted * sign + 1) / 2
+    return FitResult(ks, a + (b - a) * fitted - ys)
+
+# --- Mean targets ---
+
+def fit_nthsig_mean(target:float, variate:bool=False) -> FitResult:
+    """Find k such that samples of rng.nthsig(k) (or rng.nthsig_variate(k) if variate) have mean target.
+
+    Args:
+        target (float): Must be in range [0,1].
+        variate (bool): Fit the inverse-transform sampler instead of the curve applied to a uniform x.
+    Returns:
+        FitResult: k and the achieved mean minus target.
+    """
+    _check_unit(target, "target")
+    # The variate's mean is 1 - the curve's mean: the CDF's graph and the curve's enclose the same area from opposite sides.
+    k = _solve_mean(1 - target if variate else target)
+    m = _nthsig_mean(k)[0]
+    return FitResult(k, (1 - m if variate else m) - target)
+
+def fit_biased_curve_mean(a:float, b:float, target:float, variate:bool=False) -> FitResult:
+    """Find k such that samples of rng.biased_curve(k, a, b) (or rng.biased_curve_variate(k, a, b) if variate) have mean target.
+
+    The mean of rng.biased_curve(k, a, b) is a + (b-a) * the nthsig mean, so target must be between a and b.
+    For the variate, which puts mass a at 0 and 1-b at 1 (requires 0 <= a <= b <= 1), the mean is 1 - a - (b-a) * the nthsig mean.
+
+    Returns:
+        FitResult: k and the achieved mean minus target.
+    """
+    if a == b:
+        raise ValueError(f"Arguments 'a' and 'b' must differ to fit k, got a=b={a}.")
+    if variate and not 0 <= a <= b <= 1:
+        raise ValueError(f"A CDF needs 0 <= a <= b <= 1, got a={a}, b={b}.")
+    t = ((1 - a - target) if variate else (target - a)) / (b - a)
+    if not 0 <= t <= 1:
+        lo, hi = (1 - b, 1 - a) if variate else sorted((a, b))
+        raise ValueError(f"Argument 'target' must be in range [{lo},{hi}], got {target}.")
+    k = _solve_mean(t)
+    m = _nthsig_mean(k)[0]
+    achieved = (1 - a - (b - a) * m) if variate else (a + (b - a) * m)
+    return FitResult(k, achieved - target)
+
+def fit_nthsig_mean_many(targets:Iterable[float], variate:bool=False) -> FitResult:
+    """Batch version of fit_nthsig_mean. numpy arrays are solved with vectorized Newton iterations."""
+    return fit_biased_curve_mean_many(0, 1, targets, variate)
+
+def fit_biased_curve_mean_many(a:float, b:float, targets:Iterable[float], variate:bool=False) -> FitResult:
+    """Batch version of fit_biased_curve_mean for fixed a and b. numpy arrays are solved with vectorized Newton iterations."""
+    if a == b:
+        raise ValueError(f"Arguments 'a' and 'b' must differ to fit k, got a=b={a}.")
+    if variate and not 0 <= a <= b <= 1:
+        raise ValueError(f"A CDF needs 0 <= a <= b <= 1, got a={a}, b={b}.")
+    ba = b - a
+    np = _numpy_for(targets)
+    if np is not None:
+        targets = np.asarray(targets, dtype=float)
+        ts = ((1 - a - targets) if variate else (targets - a)) / ba
+        bad = ~((ts >= 0) & (ts <= 1))
+        if bad.any():
+            i = int(np.flatnonzero(bad)[0])
+            raise ValueError(f"Mean target {targets.flat[i]} at index {i} is out of reach for k in [-1,1].")
+        ks = _solve_mean_numpy(np, ts)
+        ms = _nthsig_mean_and_slope_numpy(np, ks)[0]
+        achieved = (1 - a - ba * ms) if variate else (a + ba * ms)
+        return FitResult(ks, achieved - targets)
+
+    ks = array('d')
+    residuals = array('d')
+    for i, target in enumerate(targets):
+        t = ((1 - a - target) if variate else (target - a)) / ba
+        if not 0 <= t <= 1:
+            raise ValueError(f"Mean target {target} at index {i} is out of reach for k in [-1,1].")
+        k = _solve_mean(t)
+        m = _nthsig_mean(k)[0]
+        ks.append(k)
+        residuals.append(((1 - a - ba * m) if variate else (a + ba * m)) - target)
+    return FitResult(ks, residuals)
+
+def _solve_mean(t:float) -> float:
+    """k in [-1,1] with _nthsig_mean(k) == t, for t in [0,1]. The mean increases with k."""
+    if t <= 0: return -1.0
+    if t >= 1: return 1.0
+    lo, hi = -1.0, 1.0
+    # nthsig(k, 0.5) = (1+k)/2 is a good first guess for the mean.
+    k = 2 * t - 1
+    for _ in range(_MAX_ITER):
+        m, dm = _nthsig_mean(k)
+        r = m - t
+        if r == 0:
+            break
+        if r > 0:
+            hi = k
+        else:
+            lo = k
+        step = k - r / dm if dm > 0 else lo - 1
+        if not lo < step < hi:
+            step = (lo + hi) / 2
+        if step == k or hi - lo <= 1e-15:
+            break
+        k = step
+    return k
+
+def _solve_mean_numpy(np, ts):
+    lo = np.full(ts.shape, -1.0)
+    hi = np.full(ts.shape, 1.0)
+    ks = 2 * ts - 1
+    active = (ts > 0) & (ts < 1)
+    for _ in range(_MAX_ITER):
+        if not active.any():
+            break
+        m, dm = _nthsig_mean_and_slope_numpy(np, ks)
+        r = m - ts
+        hi = np.where(active & (r > 0), ks, hi)
+        lo = np.where(active & (r < 0), ks, lo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.where(dm > 0, ks - r / dm, lo - 1)
+        step = np.where((lo < step) & (step < hi), step, (lo + hi) / 2)
+        done = (r == 0) | (step == ks) | (hi - lo <= 1e-15)
+        ks = np.where(active & ~done, step, ks)
+        active &= ~done
+    return np.where(ts <= 0, -1.0, np.where(ts >= 1, 1.0, ks))
+
+def _check_unit(v:float, name:str) -> None:
+    if not 0 <= v <= 1:
+        raise ValueError(f"Argument '{name}' must be in range [0,1], got {v}.")
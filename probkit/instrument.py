@@ -0,0 +1,295 @@
+"""
+Opt-in instrumentation for probkit's hot paths.
+
+    from probkit import instrument
+    instrument.enable()
+    ...                          # run the frame / simulation
+    stats = instrument.snapshot()  # plain dict, ready for a metrics exporter
+    instrument.reset()
+
+enable() swaps instrumented wrappers into probkit.curves, probkit.probability, the probkit package namespace and ProbkitRNG; disable() puts the originals back.
+Nothing is checked on the normal call path, so while disabled the cost is exactly zero.
+Code that bound a function before enable() (e.g. `from probkit import ntsig` at import time) keeps calling the original; call through the module (`curves.ntsig`) to be counted.
+
+Per function, snapshot() reports:
+    calls, elements     number of calls, and values produced (equal to calls for scalar functions)
+    edge, full          values that took an edge-case shortcut (x or k at a special point) versus the full formula
+    errors              calls that raised
+    validation_s        time spent validating arguments (scalar functions only)
+    compute_s           time spent computing (the whole call for batch functions and ProbkitRNG methods)
+    k_histogram         count of calls per k, rounded to K_BIN_DECIMALS decimals
+
+Each call is counted once, under the outermost instrumented function: rng.ntsig(k) counts as sampling.ProbkitRNG.ntsig and not also as curves.ntsig,
+and ntsig_inv(k, y) counts as curves.ntsig_inv rather than as a curves.ntsig call with k=-k. Calls made from inside another instrumented call run the originals.
+
+Batch functions classify edge/full by k alone: every value of a batch with k at -1, 0 or 1 counts as edge.
+While enabled, scalar curve functions are evaluated through the same per-k kernels as the batch functions: the values are identical, but edge cases come back as floats (0.0) rather than ints (0).
+The counters are not locked; concurrent threads can occasionally lose an increment.
+"""
+
+__all__ = ["enable", "disable", "is_enabled", "snapshot", "reset"]
+
+import inspect
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache, wraps
+from time import perf_counter_ns
+
+from . import curves, probability
+from .probability import _modified_probability_unchecked
+from .utils import effective_ratio
+
+K_BIN_DECIMALS = 2
+
+
+class _Stats:
+    __slots__ = ("calls", "elements", "edge", "full", "errors", "validation_ns", "compute_ns", "k_histogram")
+
+    def __init__(self):
+        self.calls = self.elements = self.edge = self.full = self.errors = 0
+        self.validation_ns = self.compute_ns = 0
+        self.k_histogram = Counter()
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "elements": self.elements,
+            "edge": self.edge,
+            "full": self.full,
+            "errors": self.errors,
+            "validation_s": self.validation_ns / 1e9,
+            "compute_s": self.compute_ns / 1e9,
+            "k_histogram": dict(sorted(self.k_histogram.items())),
+        }
+
+
+class _Nesting(threading.local):
+    # Set while an instrumented call is running in this thread, so the calls it makes are not counted again.
+    active = False
+
+_nesting = _Nesting()
+_stats:dict[str, _Stats] = {}
+_originals:list[tuple[object, str, object]] = []
+
+def is_enabled() -> bool:
+    """Whether instrumentation is currently swapped in."""
+    return bool(_originals)
+
+def snapshot() -> dict[str, dict]:
+    """Return the counters of every instrumented function that has been called, keyed by 'module.function'."""
+    return {name: s.as_dict() for name, s in sorted(_stats.items()) if s.calls}
+
+def reset() -> None:
+    """Zero all counters."""
+    for name in _stats:
+        _stats[name] = _Stats()
+
+def enable() -> None:
+    """Swap instrumented wrappers in. Calling it again while enabled does nothing."""
+    if _originals:
+        return
+    from .sampling import ProbkitRNG
+    package = sys.modules[__package__]
+
+    targets = []
+    for name, (validate, compute, is_edge) in _SCALAR.items():
+        targets.append((curves if hasattr(curves, name) else probability, name, lambda f, v=validate, c=compute, e=is_edge: _scalar_wrapper(f, v, c, e)))
+    for name in _BATCH:
+        targets.append((curves if hasattr(curves, name) else probability, name, _batch_wrapper))
+    for name in _INVERSES:
+        targets.append((curves, name, _function_wrapper))
+    for name in _RNG_METHODS:
+        targets.append((ProbkitRNG, name, _method_wrapper))
+
+    for owner, name, make in targets:
+        original = getattr(owner, name)
+        key = f"{'sampling.ProbkitRNG' if isinstance(owner, type) else owner.__name__.rpartition('.')[2]}.{name}"
+        _stats.setdefault(key, _Stats())
+        wrapper = make(original)
+        wrapper.__probkit_stats_key__ = key
+        # The package loads its exports lazily, so load this one before swapping: otherwise the first package lookup would cache the wrapper for good.
+        exported = not isinstance(owner, type) and getattr(package, name, None) is original
+        _swap(owner, name, wrapper)
+        if exported:
+            _swap(package, name, wrapper)
+
+def disable() -> None:
+    """Restore the original functions. Counters are kept until reset()."""
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+
+def _swap(owner, name:str, wrapper) -> None:
+    _originals.append((owner, name, getattr(owner, name)))
+    setattr(owner, name, wrapper)
+
+def _k_bin(k) -> float:
+    return round(float(k), K_BIN_DECIMALS)
+
+
+# --- Wrappers ---
+
+def _scalar_wrapper(original, validate, compute, is_edge):
+    signature = inspect.signature(original)
+
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        if _nesting.active:
+            return original(*args, **kwargs)
+        s = _stats[wrapper.__probkit_stats_key__]
+        if kwargs:
+            args = signature.bind(*args, **kwargs).args
+        s.calls += 1
+        _nesting.active = True
+        try:
+            t0 = perf_counter_ns()
+            try:
+                prepared = validate(*args)
+            except Exception:
+                s.errors += 1
+                raise
+            t1 = perf_counter_ns()
+            result = compute(*prepared)
+            t2 = perf_counter_ns()
+        finally:
+            _nesting.active = False
+        s.elements += 1
+        s.validation_ns += t1 - t0
+        s.compute_ns += t2 - t1
+        s.k_histogram[_k_bin(args[0])] += 1
+        if is_edge(*prepared):
+            s.edge += 1
+        else:
+            s.full += 1
+        return result
+    return wrapper
+
+def _batch_wrapper(original):
+    @wraps(original)
+    def wrapper(k, *args, **kwargs):
+        if _nesting.active:
+            return original(k, *args, **kwargs)
+        s = _stats[wrapper.__probkit_stats_key__]
+        result = _timed(s, original, k, *args, **kwargs)
+        _count_batch(s, k, len(result), original.__name__.startswith("modified"))
+        return result
+    return wrapper
+
+def _method_wrapper(original):
+    @wraps(original)
+    def wrapper(self, *args, **kwargs):
+        if _nesting.active:
+            return original(self, *args, **kwargs)
+        s = _stats[wrapper.__probkit_stats_key__]
+        result = _timed(s, original, self, *args, **kwargs)
+        n = len(result) if hasattr(result, "__len__") else 1
+        _count_batch(s, args[0] if args else kwargs.get("k"), n, False)
+        return result
+    return wrapper
+
+def _function_wrapper(original):
+    # Scalar functions without a validation/computation split (the inverses): the whole call is timed as compute.
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        if _nesting.active:
+            return original(*args, **kwargs)
+        s = _stats[wrapper.__probkit_stats_key__]
+        result = _timed(s, original, *args, **kwargs)
+        _count_batch(s, args[0] if args else kwargs.get("k"), 1, False)
+        return result
+    return wrapper
+
+def _timed(s:_Stats, original, *args, **kwargs):
+    """Call original with nested counting switched off, adding the call, its time and any error to s."""
+    s.calls += 1
+    _nesting.active = True
+    t0 = perf_counter_ns()
+    try:
+        return original(*args, **kwargs)
+    except Exception:
+        s.errors += 1
+        raise
+    finally:
+        s.compute_ns += perf_counter_ns() - t0
+        _nesting.active = False
+
+def _count_batch(s:_Stats, k, n:int, probability_k:bool) -> None:
+    s.elements += n
+    if isinstance(k, (int, float)):
+        s.k_histogram[_k_bin(k)] += 1
+        if k in ((0, 1) if probability_k else (-1, 0, 1)):
+            s.edge += n
+            return
+    s.full += n
+
+
+# --- Validation/computation split for the scalar functions ---
+# Each validator raises exactly what the original would and returns the arguments for the compute step, which must return the original's value.
+
+def _check_k(k:float) -> None:
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+
+def _check_x(x:float) -> None:
+    if not 0 <= x <= 1:
+        raise ValueError(f"Argument 'x' must be in range [0,1], got {x}.")
+
+def _validate_curve(k, x):
+    _check_k(k)
+    _check_x(x)
+    return k, x
+
+def _validate_biased_curve(k, a, b, x):
+    _check_k(k)
+    _check_x(x)
+    return k, a, b, x
+
+def _validate_modified_probability(k, a, b=None):
+    x = a if b is None else effective_ratio(a, b)
+    if not 0 <= k <= 1:
+        raise ValueError(f"Base probability 'k' must be in range [0,1], got {k}.")
+    if x < 0:
+        raise ValueError(f"Ratio may not be negative, got {x}.")
+    return k, x
+
+_ntsig_kernel = lru_cache(maxsize=1024)(curves._ntsig_kernel)
+_nthsig_kernel = lru_cache(maxsize=1024)(curves._nthsig_kernel)
+_biased_curve_kernel = lru_cache(maxsize=1024)(curves._biased_curve_kernel)
+
+_SCALAR = {
+    "ntsig": (
+        _validate_curve,
+        lambda k, x: _ntsig_kernel(k)(x),
+        lambda k, x: k in (-1, 0, 1) or x in (0, 0.5, 1),
+    ),
+    "nthsig": (
+        _validate_curve,
+        lambda k, x: _nthsig_kernel(k)(x),
+        lambda k, x: k in (-1, 0, 1) or x in (0, 1),
+    ),
+    "biased_curve": (
+        _validate_biased_curve,
+        lambda k, a, b, x: _biased_curve_kernel(k, a, b)(x),
+        lambda k, a, b, x: k in (-1, 0, 1) or x in (0, 1),
+    ),
+    "modified_probability": (
+        _validate_modified_probability,
+        _modified_probability_unchecked,
+        lambda k, x: x in (0, 1, float('inf')) or k in (0, 1),
+    ),
+}
+
+_BATCH = [
+    "ntsig_many", "nthsig_many", "biased_curve_many",
+    "ntsig_inv_many", "nthsig_inv_many", "biased_curve_inv_many",
+    "modified_probability_many",
+]
+
+_INVERSES = ["ntsig_inv", "nthsig_inv", "biased_curve_inv"]
+
+_RNG_METHODS = [
+    "ntsig", "nthsig", "biased_curve",
+    "ntsig_many", "nthsig_many", "biased_curve_many",
+    "ntsig_variate", "nthsig_variate", "biased_curve_variate",
+]
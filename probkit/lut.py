@@ -0,0 +1,199 @@
+"""
+Lookup-table approximations of probkit curves.
+
+A CurveLUT samples a curve at n+1 evenly spaced points once, then answers queries by linear or cubic (Catmull-Rom) interpolation with no validation or branching per call.
+Build one for a hot loop with a fixed k:
+
+    lut = CurveLUT.from_ntsig(0.9, max_error=1e-6)
+    y = lut(x)
+
+Queries cost O(1) regardless of n. On CPython a linear query is about 1.7x faster than calling ntsig() and a cubic one only slightly faster; both are slower than
+Curve(k).unchecked, which evaluates the exact formula without validation (benchmarks/ has the numbers for your machine). A LUT pays off for functions with no such kernel,
+tabulated with build(), or where a fixed-size table of samples is wanted.
+
+The price is memory and build time: the closer k is to ±1, the sharper the knee of the curve and the more points a given max_error needs, roughly n ~ 1/(1-|k|) for linear
+and no better for cubic, whose error grows with the third derivative at the knee. Measured for ntsig at max_error=1e-6:
+
+    k       linear points   cubic points
+    0.5     2,118           1,155
+    0.9     15,093          11,243
+    0.99    153,871         93,133
+    0.999   over 1M         over 1M
+
+build() refuses tables of more than max_points intervals (default 2**18, a 2 MB table that takes a few seconds to build), raising ValueError as soon as its estimate of
+the size needed passes that, so k=0.999 at 1e-6 is rejected rather than built. Use a looser max_error, raise max_points, or use Curve(k) that close to ±1.
+"""
+
+__all__ = ["CurveLUT"]
+
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Callable, Iterable, MutableSequence
+from math import ceil
+
+from . import curves
+from .utils import _as_sequence, _fill
+
+_ORDER = {"linear": 2, "cubic": 3}
+_CHECKS_PER_INTERVAL = {"linear": 3, "cubic": 7}
+_HEADROOM = 0.9
+_MAX_POINTS = 1 << 18
+
+
+class CurveLUT(ABC):
+    """Lookup table over x in [0,1] for a curve evaluated at a fixed k.
+
+    Use the from_ntsig/from_nthsig/from_biased_curve constructors (or build() for any function on [0,1]), which return the linear or cubic subclass. Inputs are NOT validated: x must be in [0,1].
+
+    Attributes:
+        table (array('d')): The sampled values, including the padding the interpolation needs. Store it and pass it back to from_table() to rebuild the LUT without re-sampling.
+        n (int): Number of intervals the unit interval is split into.
+        method (str): "linear" or "cubic".
+        max_error (float|None): Largest absolute error measured against the exact curve while building, or None for LUTs rebuilt with from_table().
+    """
+
+    __slots__ = ("table", "n", "method", "max_error")
+
+    def __init__(self, table:array, n:int, method:str, max_error:float|None=None):
+        self.table = table
+        self.n = n
+        self.method = method
+        self.max_error = max_error
+
+    # --- Constructors ---
+    @classmethod
+    def from_ntsig(cls, k:float, max_error:float=1e-6, method:str="linear", max_points:int=_MAX_POINTS) -> "CurveLUT":
+        """Build a LUT for ntsig(k, x). See build() for the remaining arguments."""
+        return cls.build(curves._ntsig_kernel(_check_continuous_k(k)), max_error, method, max_points)
+
+    @classmethod
+    def from_nthsig(cls, k:float, max_error:float=1e-6, method:str="linear", max_points:int=_MAX_POINTS) -> "CurveLUT":
+        """Build a LUT for nthsig(k, x). See build() for the remaining arguments."""
+        return cls.build(curves._nthsig_kernel(_check_continuous_k(k)), max_error, method, max_points)
+
+    @classmethod
+    def from_biased_curve(cls, k:float, a:float, b:float, max_error:float=1e-6, method:str="linear", max_points:int=_MAX_POINTS) -> "CurveLUT":
+        """Build a LUT for biased_curve(k, a, b, x). See build() for the remaining arguments."""
+        return cls.build(curves._biased_curve_kernel(_check_continuous_k(k), a, b), max_error, method, max_points)
+
+    @classmethod
+    def build(cls, f:Callable[[float], float], max_error:float=1e-6, method:str="linear", max_points:int=_MAX_POINTS) -> "CurveLUT":
+        """Build a LUT for f on [0,1], choosing the number of points to meet max_error.
+
+        The error is measured against f at several points inside every interval; n grows (using the interpolation order to predict how far) until the measured error is within 90% of max_error, leaving headroom for error between the check points.
+
+        Args:
+            f (callable): The function to tabulate. Must be defined on [0,1].
+            max_error (float): Target maximum absolute error. Must be > 0.
+            method (str): "linear" or "cubic". Cubic needs fewer points (about half for moderate k, barely fewer near k=±1) but is slower per query.
+            max_points (int): Upper bound on n. Raises ValueError if max_error cannot be reached within it, as soon as the predicted n exceeds it.
+        Returns:
+            CurveLUT: The table.
+        """
+        if method not in _ORDER:
+            raise ValueError(f"Argument 'method' must be 'linear' or 'cubic', got {method!r}.")
+        if not max_error > 0:
+            raise ValueError(f"Argument 'max_error' must be > 0, got {max_error}.")
+
+        order = _ORDER[method]
+        n = 16
+        while True:
+            lut = cls._sample(f, n, method)
+            err = lut._measure_error(f)
+            if err <= max_error * _HEADROOM:
+                lut.max_error = err
+                return lut
+            # Error shrinks like n**-order. Before that regime the error is larger than the power law predicts, so the estimate only ever falls short.
+            need = n * (err / (max_error * _HEADROOM)) ** (1 / order)
+            if n >= max_points or need > max_points:
+                raise ValueError(
+                    f"Could not reach max_error={max_error} within max_points={max_points} (got {err} with {n} points, "
+                    f"about {ceil(need)} needed). Use a larger max_error or max_points."
+                )
+            # Aim a little past the target, but always grow by at least 25%.
+            n = min(max_points, max(ceil(need * 1.1), ceil(n * 1.25)))
+
+    @classmethod
+    def from_table(cls, table:Iterable[float], method:str="linear") -> "CurveLUT":
+        """Rebuild a LUT from a stored table (as produced by the table attribute)."""
+        if method not in _ORDER:
+            raise ValueError(f"Argument 'method' must be 'linear' or 'cubic', got {method!r}.")
+        table = array("d", table)
+        n = len(table) - (2 if method == "linear" else 4)
+        if n < 1:
+            raise ValueError(f"Table is too short for a {method} LUT, got {len(table)} values.")
+        return _LUT_TYPES[method](table, n, method)
+
+    @classmethod
+    def _sample(cls, f:Callable[[float], float], n:int, method:str) -> "CurveLUT":
+        ys = array("d", (f(i / n) for i in range(n + 1)))
+        if method == "linear":
+            # One trailing copy of f(1) so x=1 (i=n, t=0) needs no bounds check.
+            ys.append(ys[-1])
+        else:
+            # Catmull-Rom reads one node before and two after the interval; extend the ends linearly.
+            ys.insert(0, 2 * ys[0] - ys[1])
+            ys.append(2 * ys[-1] - ys[-2])
+            ys.append(ys[-1])
+        return _LUT_TYPES[method](ys, n, method)
+
+    def _measure_error(self, f:Callable[[float], float]) -> float:
+        n = self.n
+        m = _CHECKS_PER_INTERVAL[self.method] + 1
+        err = 0.0
+        for i in range(n):
+            for j in range(1, m):
+                x = (i + j / m) / n
+                d = abs(self(x) - f(x))
+                if d > err:
+                    err = d
+        return err
+
+    # --- Queries ---
+    @abstractmethod
+    def __call__(self, x:float) -> float:
+        """Interpolate the table at x, which must be in [0,1]."""
+
+    def many(self, xs:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """Evaluate the LUT at every x in xs, returning an array('d') (or filling out). Inputs are not validated."""
+        xs = _as_sequence(xs)
+        return _fill(out, map(self, xs), len(xs))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the table, in bytes."""
+        return len(self.table) * self.table.itemsize
+
+    def __repr__(self) -> str:
+        return f"CurveLUT(n={self.n}, method={self.method!r}, max_error={self.max_error}, nbytes={self.nbytes})"
+
+
+class _LinearLUT(CurveLUT):
+    __slots__ = ()
+
+    def __call__(self, x:float) -> float:
+        p = x * self.n
+        i = int(p)
+        t = self.table
+        y0 = t[i]
+        return y0 + (t[i + 1] - y0) * (p - i)
+
+
+class _CubicLUT(CurveLUT):
+    __slots__ = ()
+
+    def __call__(self, x:float) -> float:
+        p = x * self.n
+        i = int(p)
+        u = p - i
+        t = self.table
+        p0 = t[i]; p1 = t[i + 1]; p2 = t[i + 2]; p3 = t[i + 3]
+        return p1 + 0.5 * u * (p2 - p0 + u * (2 * p0 - 5 * p1 + 4 * p2 - p3 + u * (3 * (p1 - p2) + p3 - p0)))
+
+
+_LUT_TYPES = {"linear": _LinearLUT, "cubic": _CubicLUT}
+
+def _check_continuous_k(k:float) -> float:
+    if not -1 < k < 1:
+        raise ValueError(f"Argument 'k' must be in range (-1,1) for a LUT (the curves are discontinuous at k=±1), got {k}.")
+    return k
@@ -0,0 +1,278 @@
+"""
+Fused chains of probkit curve and probability stages.
+
+A Pipeline is built once, stage by stage, and then evaluated as a single function:
+
+    shape = Pipeline().ntsig(0.4).biased_curve(0.3, 0.1, 0.9).modified_probability(1.5)
+    y = shape(x)           # same as modified_probability(biased_curve(0.3, 0.1, 0.9, ntsig(0.4, x)), 1.5)
+    ys = shape.many(xs)    # one pass over xs, no intermediate arrays
+
+Each builder method returns a new Pipeline, checking its arguments and that the previous stage's output range fits the new stage's input range.
+Only the pipeline's input is validated at call time: intermediate values are known to be in range, so the stages run unchecked.
+
+At build time the chain is also simplified:
+- identity stages (k=0, ratio 1, a=0 and b=1) are dropped;
+- a/b ratios are resolved once;
+- consecutive odds-scaling stages are merged: modified_probability multiplies the odds p/(1-p) by its ratio, and nthsig(k) multiplies them by (1+k)/(1-k), so a run of them is a single stage;
+- consecutive affine stages (the a + (b-a)*y of biased_curve, transform_range) and clamps are merged;
+- stages that always produce the same value (ratio 0 or inf) turn the rest of the chain into a constant.
+Merged stages round differently from the step-by-step chain, so results agree to within a few ulps rather than bit for bit. A pipeline with nothing to merge matches the step-by-step chain exactly.
+"""
+
+__all__ = ["Pipeline"]
+
+from collections.abc import Callable, Iterable, MutableSequence
+
+from . import curves
+from .utils import clamp, effective_ratio, _as_sequence, _check_range_many, _check_range_numpy, _fill, _numpy_for, _numpy_out, _numpy_result
+
+_INF = float('inf')
+_UNIT = (0, 1)
+_UNBOUNDED = (-_INF, _INF)
+
+
+class Pipeline:
+    """An immutable chain of curve and probability stages, evaluated as one function.
+
+    Start from Pipeline() and add stages with the builder methods, each of which returns a new Pipeline:
+    ntsig(k), nthsig(k), biased_curve(k, a, b), modified_probability(a, b=None), transform_range(oldrange, newrange) and clamp(min_val, max_val).
+    The value flowing through the chain is each stage's x (for modified_probability, the base probability k).
+
+    Attributes:
+        stages (tuple): The stages as added, as (name, args) pairs.
+        ops (tuple): The simplified operations actually evaluated, as (kind, *constants) tuples.
+        domain (tuple): The (min,max) range the input must be in.
+        range (tuple): The (min,max) range of the output.
+        unchecked (callable): The fused function without the input range check.
+    """
+
+    __slots__ = ("stages", "ops", "domain", "range", "unchecked", "_kernels")
+
+    def __init__(self):
+        self._set((), (), _UNBOUNDED, _UNBOUNDED)
+
+    def _set(self, stages:tuple, ops:tuple, domain:tuple[float,float], range_:tuple[float,float]) -> None:
+        self.stages = stages
+        self.ops = ops
+        self.domain = domain
+        self.range = range_
+        self._kernels = tuple(_kernel(op) for op in ops)
+        self.unchecked = _compose(self._kernels)
+
+    # --- Builders ---
+    def ntsig(self, k:float) -> "Pipeline":
+        """Append ntsig(k, x)."""
+        _check_k(k)
+        return self._append("ntsig", (k,), _UNIT, [("ntsig", k)] if k != 0 else [])
+
+    def nthsig(self, k:float) -> "Pipeline":
+        """Append nthsig(k, x)."""
+        _check_k(k)
+        return self._append("nthsig", (k,), _UNIT, [("nthsig", k)] if k != 0 else [])
+
+    def biased_curve(self, k:float, a:float, b:float) -> "Pipeline":
+        """Append biased_curve(k, a, b, x)."""
+        _check_k(k)
+        ops = [("nthsig", k)] if k != 0 else []
+        if a != 0 or b != 1:
+            ops.append(_affine(a, b - a))
+        return self._append("biased_curve", (k, a, b), _UNIT, ops)
+
+    def modified_probability(self, a:float, b:float|None=None) -> "Pipeline":
+        """Append modified_probability(x, a, b): the flowing value is the base probability, scaled by the fixed ratio a (or a/b)."""
+        x = a if b is None else effective_ratio(a, b)
+        if x < 0:
+            raise ValueError(f"Ratio may not be negative, got {x}.")
+        if x == 0:
+            ops = [("const", 0.0)]
+        elif x == _INF:
+            ops = [("const", 1.0)]
+        else:
+            ops = [("odds", x)] if x != 1 else []
+        return self._append("modified_probability", (a,) if b is None else (a, b), _UNIT, ops)
+
+    def transform_range(self, oldrange:tuple[float,float], newrange:tuple[float,float]=(0,1)) -> "Pipeline":
+        """Append transform_range(x, oldrange, newrange)."""
+        if oldrange[0] == oldrange[1]:
+            raise ValueError(f"Argument 'oldrange' must not be empty, got {oldrange}.")
+        scale = (newrange[1] - newrange[0]) / (oldrange[1] - oldrange[0])
+        op = _affine(newrange[0] - oldrange[0] * scale, scale)
+        return self._append("transform_range", (tuple(oldrange), tuple(newrange)), _UNBOUNDED, [op])
+
+    def clamp(self, min_val:float, max_val:float) -> "Pipeline":
+        """Append clamp(x, min_val, max_val)."""
+        if not min_val <= max_val:
+            raise ValueError(f"Argument 'min_val' must not exceed 'max_val', got {min_val} and {max_val}.")
+        return self._append("clamp", (min_val, max_val), _UNBOUNDED, [("clamp", min_val, max_val)])
+
+    def _append(self, name:str, args:tuple, domain:tuple[float,float], ops:list[tuple]) -> "Pipeline":
+        if self.stages:
+            lo, hi = self.range
+            if not (domain[0] <= lo and hi <= domain[1]):
+                raise ValueError(
+                    f"Stage {len(self.stages)} ({name}) needs input in [{domain[0]},{domain[1]}], "
+                    f"but stage {len(self.stages) - 1} ({self.stages[-1][0]}) outputs [{lo},{hi}]."
+                )
+            pipeline_domain = self.domain
+        else:
+            lo, hi = pipeline_domain = domain
+
+        # Stages are monotonic, so the output range is spanned by the images of the input range's ends.
+        for op in ops:
+            f = _kernel(op)
+            lo, hi = sorted((f(lo), f(hi)))
+
+        p = Pipeline.__new__(Pipeline)
+        p._set(self.stages + ((name, args),), _fold(self.ops + tuple(ops)), pipeline_domain, (lo, hi))
+        return p
+
+    # --- Evaluation ---
+    def __call__(self, x:float) -> float:
+        lo, hi = self.domain
+        if lo <= x <= hi:
+            return self.unchecked(x)
+        raise ValueError(f"Argument 'x' must be in range [{lo},{hi}], got {x}.")
+
+    def many(self, xs:Iterable[float], out:MutableSequence[float]|None=None, check:bool=True) -> MutableSequence[float]:
+        """Evaluate the pipeline at every x in xs in one pass, returning an array('d') (or filling out).
+
+        xs may be any sequence, array.array, memoryview or numpy array (which is evaluated with numpy, stage by stage). Pass check=False to skip the bulk range check.
+        """
+        lo, hi = self.domain
+        np = _numpy_for(xs, out)
+        if np is not None:
+            return self._many_numpy(np, xs, out, check)
+        xs = _as_sequence(xs)
+        if check:
+            _check_range_many(xs, lo, hi, "xs")
+        values = xs
+        for f in self._kernels:
+            values = map(f, values)
+        return _fill(out, values, len(xs))
+
+    def _many_numpy(self, np, xs, out, check:bool):
+        xs = np.asarray(xs, dtype=float)
+        if check:
+            _check_range_numpy(np, xs, *self.domain, "xs")
+        ys = xs
+        for op in self.ops:
+            ys = _numpy_op(np, op, ys)
+        buf = _numpy_out(np, out, xs.shape)
+        np.copyto(buf, ys)
+        return _numpy_result(out, buf)
+
+    def __repr__(self) -> str:
+        return "Pipeline()" + "".join(f".{name}({', '.join(map(repr, args))})" for name, args in self.stages)
+
+
+# --- Operations ---
+# ("ntsig", k), ("nthsig", k): the curves, via their unchecked kernels.
+# ("odds", r): p -> modified_probability(p, r) for a finite ratio r > 0, clamped to [0,1] against rounding.
+# ("affine", offset, scale): x -> offset + scale * x.
+# ("clamp", lo, hi), ("const", c).
+
+def _check_k(k:float) -> None:
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+
+def _affine(offset:float, scale:float) -> tuple:
+    return ("const", offset) if scale == 0 else ("affine", offset, scale)
+
+def _odds_factor(op:tuple) -> float|None:
+    """The factor op multiplies the odds p/(1-p) by, or None if it is not a finite, positive odds scaling."""
+    if op[0] == "odds":
+        return op[1]
+    if op[0] == "nthsig" and -1 < op[1] < 1:
+        return (1 + op[1]) / (1 - op[1])
+    return None
+
+def _is_identity(op:tuple) -> bool:
+    return op == ("odds", 1) or op == ("affine", 0, 1)
+
+def _fold(ops:tuple) -> tuple:
+    folded = []
+    for op in ops:
+        if folded and folded[-1][0] == "const":
+            folded[-1] = ("const", _kernel(op)(folded[-1][1]))
+            continue
+        if folded:
+            op = _merge(folded, op)
+        if op[0] == "const":
+            # Whatever came before no longer matters.
+            folded = [op]
+        elif not _is_identity(op):
+            folded.append(op)
+    return tuple(folded)
+
+def _merge(folded:list[tuple], op:tuple) -> tuple:
+    """Merge op into the last of folded (popping it) if the two combine into one operation, and return the result."""
+    prev = folded[-1]
+    r0, r1 = _odds_factor(prev), _odds_factor(op)
+    if r0 is not None and r1 is not None:
+        r = r0 * r1
+        if 0 < r < _INF:
+            folded.pop()
+            return ("odds", r)
+    elif prev[0] == op[0] == "affine":
+        folded.pop()
+        return _affine(op[1] + op[2] * prev[1], op[2] * prev[2])
+    elif prev[0] == op[0] == "clamp":
+        folded.pop()
+        lo, hi = clamp(prev[1], op[1], op[2]), clamp(prev[2], op[1], op[2])
+        return ("const", lo) if lo == hi else ("clamp", lo, hi)
+    return op
+
+def _kernel(op:tuple) -> Callable[[float], float]:
+    kind = op[0]
+    if kind == "ntsig":
+        return curves._ntsig_kernel(op[1])
+    if kind == "nthsig":
+        return curves._nthsig_kernel(op[1])
+    if kind == "odds":
+        r = op[1]
+        def odds(p:float) -> float:
+            # The ends are returned as is, like modified_probability does: the formula rounds past 1 at p=1 for r<1 (and divides by 0 for tiny r).
+            if p == 0 or p == 1: return p
+            pr = p * r
+            y = pr / (pr - p + 1)
+            return 1.0 if y > 1 else y
+        return odds
+    if kind == "affine":
+        _, offset, scale = op
+        return lambda x: offset + scale * x
+    if kind == "clamp":
+        _, lo, hi = op
+        return lambda x: lo if x < lo else (hi if x > hi else x)
+    c = op[1]
+    return lambda x: c
+
+def _compose(fs:tuple[Callable[[float], float], ...]) -> Callable[[float], float]:
+    if not fs:
+        return curves._identity
+    if len(fs) == 1:
+        return fs[0]
+    if len(fs) == 2:
+        f, g = fs
+        return lambda x: g(f(x))
+    def composed(x:float) -> float:
+        for f in fs:
+            x = f(x)
+        return x
+    return composed
+
+def _numpy_op(np, op:tuple, xs):
+    kind = op[0]
+    if kind == "ntsig":
+        return curves._ntsig_numpy(np, op[1], xs, None, check=False)
+    if kind == "nthsig":
+        return curves._biased_curve_numpy(np, op[1], 0, 1, xs, None, check=False)
+    if kind == "odds":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pr = xs * op[1]
+            ys = np.minimum(pr / (pr - xs + 1), 1.0)
+        return np.where((xs == 0) | (xs == 1), xs, ys)
+    if kind == "affine":
+        return op[1] + op[2] * xs
+    if kind == "clamp":
+        return np.clip(xs, op[1], op[2])
+    return np.full(xs.shape, op[1])
@@ -0,0 +1,461 @@
+"""
+Quasi-Monte Carlo and variance-reduced uniform sources for the probkit samplers.
+
+Each class here is a CounterRNG whose random() values are not independent uniforms but a sequence that covers [0,1) (or [0,1)^dims) evenly.
+Every helper built on random() works unchanged on top of them: rng.ntsig and the other curve samplers, the *_many batch paths, the *_variate samplers, iter_* and the random.Random methods.
+With SobolRNG or HaltonRNG, an estimate like fsum(src.ntsig_many(k, n)) / n of a smooth integrand converges roughly like 1/n (up to log factors) instead of 1/sqrt(n):
+
+    src = SobolRNG(42)
+    mean = math.fsum(src.ntsig_many(0.4, 4096)) / 4096
+
+- SobolRNG(seed, dims=1, scramble=True): Sobol points (Joe-Kuo direction numbers, up to 21 dimensions), scrambled with a random linear matrix and digital shift.
+- HaltonRNG(seed, dims=1, scramble=True): Halton points in the first dims prime bases, scrambled with random digit permutations.
+- StratifiedRNG(seed, strata=1024): every run of strata consecutive values has exactly one value in each [j/strata, (j+1)/strata), in random order.
+- AntitheticRNG(seed): values come in pairs u, 1-u.
+
+The last two are variance reduction rather than quasi-Monte Carlo. StratifiedRNG reaches roughly 1/n error only when n is a whole number of strata sweeps, and the error of several sweeps averaged together falls like 1/sqrt(sweeps).
+AntitheticRNG still converges like 1/sqrt(n), with a smaller constant for monotone integrands such as the curves.
+
+A d-dimensional point is d consecutive random() values, so a simulation drawing d uniforms per trial should use dims=d.
+As with CounterRNG, value i is a pure function of (seed, i): jump(n) skips n values and at(i) reads value i directly.
+To split one sequence across workers, give them all the same seed and worker w `fork()` followed by `jump(w * points_per_worker * dims)`.
+Different seeds give independent randomizations, which is what repeated runs (for an error estimate) need, but chunks drawn from different seeds lose the even coverage between them.
+Prefer powers of two for Sobol point counts and multiples of strata for StratifiedRNG.
+
+getrandbits() (and so randbytes) is CounterRNG's, which consumes positions but ignores the sequence.
+"""
+
+__all__ = ["SobolRNG", "HaltonRNG", "StratifiedRNG", "AntitheticRNG"]
+
+import struct
+from collections.abc import Iterator
+from random import Random
+from typing import Self
+
+from .sampling import CounterRNG, _GAMMA, _NAN, _2_POW_M53, _splitmix64
+
+_BELOW_ONE = 1 - 2.0 ** -53
+_2_POW_M52 = 2.0 ** -52
+
+
+class _SequenceRNG(CounterRNG):
+    """Base for the sequence sources: a CounterRNG whose value at each position comes from _value() and _block() instead of SplitMix64.
+
+    Subclasses set _TAG and _N_PARAMS and implement _params(), _set_params(*params), _build() (derive tables from self._key) and _value(i).
+    """
+
+    _TAG = b""
+    _N_PARAMS = 0
+
+    def seed(self, a:int|float|str|bytes|bytearray|None=None, version:int=2) -> None:
+        """Derive the randomization from a and rewind to position 0. None seeds from os.urandom."""
+        super().seed(a, version)
+        self._build()
+
+    def getstate(self) -> tuple:
+        """Return the state (parameters, key, position and Gaussian carry); setstate() restores it."""
+        return (type(self).__name__, self._params(), self._key, self._counter, self.gauss_next)
+
+    def setstate(self, state:tuple) -> None:
+        """Restore a state returned by getstate()."""
+        if not (isinstance(state, tuple) and len(state) == 5 and state[0] == type(self).__name__):
+            raise ValueError(f"State is not from a {type(self).__name__}: {state!r:.60}")
+        _, params, self._key, self._counter, self.gauss_next = state
+        self._set_params(*params)
+        self._build()
+
+    def snapshot(self) -> bytes:
+        """The state as 44 bytes; restore() reads it back."""
+        if self._counter >> 64:
+            raise OverflowError(f"Position {self._counter} does not fit in a snapshot.")
+        params = self._params() + (0,) * (2 - self._N_PARAMS)
+        return _SEQ_SNAPSHOT.pack(self._TAG, _NAN if self.gauss_next is None else self.gauss_next, self._key, self._counter, *map(int, params))
+
+    def restore(self, data:bytes) -> None:
+        """Restore a state returned by snapshot()."""
+        if len(data) != _SEQ_SNAPSHOT.size or data[:4] != self._TAG:
+            raise ValueError(f"Snapshot is not from a {type(self).__name__}: {bytes(data[:16])!r}...")
+        _, gauss, key, counter, *params = _SEQ_SNAPSHOT.unpack(data)
+        self.setstate((type(self).__name__, tuple(params[:self._N_PARAMS]), key, counter, None if gauss != gauss else gauss))
+
+    def spawn(self, seed_value:int|float|str|None=None) -> Self:
+        """Create an instance with the same parameters and a new randomization."""
+        r = self.fork()
+        r.seed(seed_value)
+        return r
+
+    # --- Values ---
+    def random(self) -> float:
+        """Next value of the sequence."""
+        n = self._counter
+        self._counter = n + 1
+        return self._value(n)
+
+    def at(self, index:int) -> float:
+        """The value at position index of the sequence, without moving the position."""
+        if index < 0:
+            raise ValueError(f"Stream index must not be negative, got {index}.")
+        return self._value(index)
+
+    def _block(self, start:int, n:int) -> Iterator[float]:
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        return map(self._value, range(start, start + n))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(map(repr, self._params()))})"
+
+
+class SobolRNG(_SequenceRNG):
+    """Scrambled Sobol sequence: a (t,s)-sequence in base 2, 53-bit, in Gray code order.
+
+    With scramble=True (the default) the direction numbers of every dimension are multiplied by a random lower-triangular bit matrix and the points XORed with a random shift.
+    This is Matousek's linear matrix scramble, as in scipy.stats.qmc.Sobol. Each point is then uniform on [0,1)^dims and the sequence keeps its net structure.
+    With scramble=False the points match the unscrambled Sobol sequence (starting at 0) and the seed is ignored.
+
+    Args:
+        seed_value (int|float|str|bytes, optional): Seed for the scramble. None seeds from os.urandom.
+        dims (int): Dimensions per point, 1 to 21.
+        scramble (bool): Randomize the sequence.
+    """
+
+    _TAG = b"PKQS"
+    _N_PARAMS = 2
+
+    def __init__(self, seed_value:int|float|str|bytes|None=None, dims:int=1, scramble:bool=True):
+        self._set_params(dims, scramble)
+        super().__init__(seed_value)
+
+    def _params(self) -> tuple:
+        return (self.dims, self.scramble)
+
+    def _set_params(self, dims:int, scramble:bool) -> None:
+        if not 1 <= dims <= len(_JOE_KUO) + 1:
+            raise ValueError(f"Argument 'dims' must be in range [1,{len(_JOE_KUO) + 1}], got {dims}.")
+        self.dims = dims
+        self.scramble = bool(scramble)
+
+    def _build(self) -> None:
+        directions = [_sobol_directions(d) for d in range(self.dims)]
+        if self.scramble:
+            r = Random(self._key)
+            directions = [_scramble_directions(r, v) for v in directions]
+            self._shift = [r.getrandbits(_SOBOL_BITS) for _ in range(self.dims)]
+        else:
+            self._shift = [0] * self.dims
+        self._directions = directions
+        self._last = (0, list(self._shift))
+
+    def _point(self, i:int) -> list[int]:
+        """The integer coordinates of point i."""
+        if i >> _SOBOL_BITS:
+            raise ValueError(f"The Sobol sequence has 2**{_SOBOL_BITS} points, got index {i}.")
+        gray = i ^ (i >> 1)
+        point = list(self._shift)
+        bit = 0
+        while gray:
+            if gray & 1:
+                for d, v in enumerate(self._directions):
+                    point[d] ^= v[bit]
+            gray >>= 1
+            bit += 1
+        return point
+
+    def _value(self, n:int) -> float:
+        # The last point is cached, so sequential random() calls step through the Gray code instead of rebuilding each point.
+        i, d = divmod(n, self.dims)
+        last, point = self._last
+        if i != last:
+            if i == last + 1:
+                bit = (i & -i).bit_length() - 1
+                point = [x ^ v[bit] for x, v in zip(point, self._directions)]
+            else:
+                point = self._point(i)
+            self._last = (i, point)
+        return point[d] * _2_POW_M53
+
+    def _block(self, start:int, n:int) -> Iterator[float]:
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        dims = self.dims
+        i, d = divmod(start, dims)
+        if (start + n) // dims >> _SOBOL_BITS:
+            raise ValueError(f"The Sobol sequence has 2**{_SOBOL_BITS} points, got index {(start + n) // dims}.")
+        return self._walk(i, d, n)
+
+    def _walk(self, i:int, d:int, n:int) -> Iterator[float]:
+        # Consecutive Gray codes differ in one bit, the lowest set bit of the new index, so each point is the previous one XOR one direction number per dimension.
+        point = self._point(i)
+        directions = self._directions
+        scale = _2_POW_M53
+        if self.dims == 1:
+            x, v = point[0], directions[0]
+            if n:
+                yield x * scale
+            for i in range(i + 1, i + n):
+                x ^= v[(i & -i).bit_length() - 1]
+                yield x * scale
+            return
+        dims = self.dims
+        while n:
+            yield point[d] * scale
+            n -= 1
+            d += 1
+            if d == dims:
+                d = 0
+                i += 1
+                bit = (i & -i).bit_length() - 1
+                for e in range(dims):
+                    point[e] ^= directions[e][bit]
+
+
+class HaltonRNG(_SequenceRNG):
+    """Scrambled Halton sequence: dimension d is the radical inverse of the point index in the d-th prime base.
+
+    With scramble=True (the default) each digit position of each base gets its own random permutation of the digits.
+    This is random digit permutation scrambling, which removes the correlation between the higher bases that makes plain Halton poor beyond a few dimensions.
+    With scramble=False the points match the plain Halton sequence (starting at 0) and the seed is ignored.
+
+    Args:
+        seed_value (int|float|str|bytes, optional): Seed for the scramble. None seeds from os.urandom.
+        dims (int): Dimensions per point, at least 1.
+        scramble (bool): Randomize the sequence.
+    """
+
+    _TAG = b"PKQH"
+    _N_PARAMS = 2
+
+    def __init__(self, seed_value:int|float|str|bytes|None=None, dims:int=1, scramble:bool=True):
+        self._set_params(dims, scramble)
+        super().__init__(seed_value)
+
+    def _params(self) -> tuple:
+        return (self.dims, self.scramble)
+
+    def _set_params(self, dims:int, scramble:bool) -> None:
+        if dims < 1:
+            raise ValueError(f"Argument 'dims' must be at least 1, got {dims}.")
+        self.dims = dims
+        self.scramble = bool(scramble)
+
+    def _build(self) -> None:
+        r = Random(self._key)
+        self._bases = _primes(self.dims)
+        self._perms = []
+        self._tails = []
+        for b in self._bases:
+            # Enough digits that the first 2**53 indices are distinct.
+            digits = 1
+            while b ** digits < 1 << 53:
+                digits += 1
+            perms = []
+            for _ in range(digits):
+                perm = list(range(b))
+                if self.scramble:
+                    r.shuffle(perm)
+                perms.append(perm)
+            # tail[j]: the value of digit positions j and beyond when the index has no digits there (all zeros).
+            tail = [0.0] * (digits + 1)
+            for j in range(digits - 1, -1, -1):
+                tail[j] = (perms[j][0] + tail[j + 1]) / b
+            self._perms.append(perms)
+            self._tails.append(tail)
+
+    def _value(self, n:int) -> float:
+        i, d = divmod(n, self.dims)
+        b = self._bases[d]
+        perms = self._perms[d]
+        digits = []
+        while i:
+            i, digit = divmod(i, b)
+            digits.append(digit)
+        if len(digits) > len(perms):
+            raise ValueError(f"The Halton sequence has {b}**{len(perms)} points in base {b}, got index {n // self.dims}.")
+        x = self._tails[d][len(digits)]
+        for j in range(len(digits) - 1, -1, -1):
+            x = (perms[j][digits[j]] + x) / b
+        return x if x < 1.0 else _BELOW_ONE
+
+    def _block(self, start:int, n:int) -> Iterator[float]:
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        if (start + n) // self.dims >> 53:
+            raise ValueError(f"The Halton sequence is limited to 2**53 points here, got index {(start + n) // self.dims}.")
+        return self._walk(start, n)
+
+    def _walk(self, start:int, n:int) -> Iterator[float]:
+        # Each dimension keeps the digits of the index and partial[j], the value of digit positions j and beyond (the same Horner sums as _value).
+        # Stepping to the next index only changes the digits up to the last carry, so only those partial sums are recomputed.
+        dims = self.dims
+        i, d = divmod(start, dims)
+        states = []
+        for b, perms, tail in zip(self._bases, self._perms, self._tails):
+            digits = [0] * len(perms)
+            j, rest = 0, i
+            while rest:
+                rest, digits[j] = divmod(rest, b)
+                j += 1
+            partial = list(tail)
+            for j in range(j - 1, -1, -1):
+                partial[j] = (perms[j][digits[j]] + partial[j + 1]) / b
+            states.append((b, perms, digits, partial))
+        while n:
+            x = states[d][3][0]
+            yield x if x < 1.0 else _BELOW_ONE
+            n -= 1
+            d += 1
+            if d == dims:
+                d = 0
+                for b, perms, digits, partial in states:
+                    j = 0
+                    while digits[j] == b - 1:
+                        digits[j] = 0
+                        j += 1
+                    digits[j] += 1
+                    for j in range(j, -1, -1):
+                        partial[j] = (perms[j][digits[j]] + partial[j + 1]) / b
+
+
+class StratifiedRNG(_SequenceRNG):
+    """Stratified uniforms: positions [j*strata, (j+1)*strata) hold one uniform draw from each interval [s/strata, (s+1)/strata), in random order.
+
+    Averages over whole blocks of strata values have the variance of stratified sampling instead of plain Monte Carlo.
+
+    Args:
+        seed_value (int|float|str|bytes, optional): Seed. None seeds from os.urandom.
+        strata (int): Strata per block, at least 1.
+    """
+
+    _TAG = b"PKQT"
+    _N_PARAMS = 1
+
+    def __init__(self, seed_value:int|float|str|bytes|None=None, strata:int=1024):
+        self._set_params(strata)
+        super().__init__(seed_value)
+
+    def _params(self) -> tuple:
+        return (self.strata,)
+
+    def _set_params(self, strata:int) -> None:
+        if strata < 1:
+            raise ValueError(f"Argument 'strata' must be at least 1, got {strata}.")
+        self.strata = strata
+
+    def _build(self) -> None:
+        self._cached = (-1, None)
+
+    def _order(self, block:int) -> list[int]:
+        """The strata in the order block visits them."""
+        cached_block, order = self._cached
+        if cached_block != block:
+            order = list(range(self.strata))
+            Random((self._key << 64) | block).shuffle(order)
+            self._cached = (block, order)
+        return order
+
+    def _value(self, n:int) -> float:
+        block, j = divmod(n, self.strata)
+        u = (_splitmix64(self._key + (n + 1) * _GAMMA) >> 11) * _2_POW_M53
+        x = (self._order(block)[j] + u) / self.strata
+        return x if x < 1.0 else _BELOW_ONE
+
+
+class AntitheticRNG(_SequenceRNG):
+    """Antithetic uniforms: positions 2i and 2i+1 hold u and 1-u for an independent uniform u.
+
+    u is drawn from the open interval (0,1) on a 2**-52 grid offset by half a step, so 1-u is exact and also in (0,1).
+    Averages over pairs cancel the odd part of the integrand, which helps most for monotonic functions such as the curve samplers.
+
+    Args:
+        seed_value (int|float|str|bytes, optional): Seed. None seeds from os.urandom.
+    """
+
+    _TAG = b"PKQA"
+    _N_PARAMS = 0
+
+    def _params(self) -> tuple:
+        return ()
+
+    def _set_params(self) -> None:
+        pass
+
+    def _build(self) -> None:
+        pass
+
+    def _value(self, n:int) -> float:
+        u = ((_splitmix64(self._key + ((n >> 1) + 1) * _GAMMA) >> 12) + 0.5) * _2_POW_M52
+        return 1.0 - u if n & 1 else u
+
+
+# --- Tables ---
+
+# Snapshot layout: tag, gauss_next (NaN for None), key, position, up to two parameters.
+_SEQ_SNAPSHOT = struct.Struct("<4sdQQQQ")
+
+_SOBOL_BITS = 53
+
+# Joe and Kuo's direction numbers (new-joe-kuo-6.21201) for dimensions 2 to 21, as (degree s, coefficients a, initial m_1..m_s).
+# Dimension 1 is the van der Corput sequence.
+_JOE_KUO = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+
+def _sobol_directions(dim:int) -> list[int]:
+    """The _SOBOL_BITS direction numbers of dimension dim (0-based), as integers scaled by 2**_SOBOL_BITS."""
+    bits = _SOBOL_BITS
+    if dim == 0:
+        return [1 << (bits - 1 - j) for j in range(bits)]
+    s, a, m = _JOE_KUO[dim - 1]
+    v = [m[j] << (bits - 1 - j) for j in range(s)]
+    for j in range(s, bits):
+        x = v[j - s] ^ (v[j - s] >> s)
+        for k in range(1, s):
+            if (a >> (s - 1 - k)) & 1:
+                x ^= v[j - k]
+        v.append(x)
+    return v
+
+def _scramble_directions(r:Random, v:list[int]) -> list[int]:
+    """Multiply each direction number by the same random lower-triangular bit matrix with unit diagonal.
+
+    Output bit b (counting from the most significant) is the parity of input bit b and a random subset of the more significant bits.
+    """
+    bits = _SOBOL_BITS
+    rows = [(r.getrandbits(b) << (bits - b) if b else 0) | (1 << (bits - 1 - b)) for b in range(bits)]
+    scrambled = []
+    for x in v:
+        y = 0
+        for b, row in enumerate(rows):
+            if (x & row).bit_count() & 1:
+                y |= 1 << (bits - 1 - b)
+        scrambled.append(y)
+    return scrambled
+
+def _primes(n:int) -> list[int]:
+    """The first n primes."""
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
@@ -3,20 +3,35 @@ Random sampling functions for probkit curves and probability functions.
 
 - Exposes a singleton RNG (`rng`) that inherits all of `random.Random` APIs (seed, random, choices, sample, shuffle, etc.)
 - Adds probkit helpers on the same object: rng.ntsig, rng.nthsig, rng.biased_curve
+- Inverse-transform samplers draw from the distribution whose CDF is a curve: rng.ntsig_variate, rng.nthsig_variate, rng.biased_curve_variate
+- Batch helpers draw many samples at once: rng.random_many, rng.ntsig_many, rng.nthsig_many, rng.biased_curve_many
+- Buffered streams yield samples one at a time but draw them in chunks: rng.iter_ntsig, rng.iter_nthsig, rng.iter_biased_curve
 - Deterministic control:
     - rng.seed(x): set global sequence for the whole run
     - rng.fork() and rng.spawn(x): create independent RNG instances
     - rng.forked() and rng.spawned(x): context managers yielding independent RNG instances
+    - rng.snapshot() / rng.restore(data): compact binary checkpoints of the state
+- Threads and asyncio tasks: rng.local() (or ThreadLocalRNG(seed)) gives each thread, or each task that binds a key, its own ProbkitRNG stream derived from one root seed
+- CounterRNG is a drop-in ProbkitRNG on a counter-based generator: sample i of a stream is computed directly from (seed, i), so it can jump(n) ahead or read at(i) in O(1)
 """
 
+import hashlib
+import os
+import struct
+import threading
+import weakref
+from contextvars import ContextVar
+from array import array
 from random import Random
 from typing import Self
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator, MutableSequence
 from contextlib import contextmanager
+from itertools import repeat, starmap
 
 from . import curves
+from .utils import _fill
 
-__all__ = ["ProbkitRNG", "rng"]
+__all__ = ["ProbkitRNG", "CounterRNG", "ThreadLocalRNG", "rng"]
 
 
 class ProbkitRNG(Random):
@@ -35,19 +50,123 @@ class ProbkitRNG(Random):
         """Sample biased_curve with random x."""
         return curves.biased_curve(k, a, b, self.random())
 
+    # --- Inverse-transform samplers ---
+    def ntsig_variate(self, k:float)->float:
+        """Sample the distribution on [0,1] whose CDF is ntsig(k, x)."""
+        return curves.ntsig_inv(k, self.random())
+
+    def nthsig_variate(self, k:float)->float:
+        """Sample the distribution on [0,1] whose CDF is nthsig(k, x)."""
+        return curves.nthsig_inv(k, self.random())
+
+    def biased_curve_variate(self, k:float, a:float, b:float)->float:
+        """Sample the distribution on [0,1] whose CDF is biased_curve(k, a, b, x).
+
+        Requires 0 <= a <= b <= 1. The CDF starts at a, so a is the probability mass at x=0, and 1-b is the mass at x=1.
+        """
+        if not 0 <= a <= b <= 1:
+            raise ValueError(f"A CDF needs 0 <= a <= b <= 1, got a={a}, b={b}.")
+        u = self.random()
+        if u <= a: return 0.0
+        if u > b: return 1.0
+        return curves.biased_curve_inv(k, a, b, u)
+
+    # --- Batch helpers ---
+    # These consume exactly one random() per sample, in order, so for the same state they return the same values as the equivalent loop over the scalar helpers.
+    def random_many(self, n:int, out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """Draw n random() floats into an array('d') (or into out)."""
+        return _fill(out, self._uniforms(n), n)
+
+    def ntsig_many(self, k:float, n:int, out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """Draw n ntsig samples into an array('d') (or into out)."""
+        f = curves._ntsig_kernel(_check_k(k))
+        return _fill(out, map(f, self._uniforms(n)), n)
+
+    def nthsig_many(self, k:float, n:int, out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """Draw n nthsig samples into an array('d') (or into out)."""
+        f = curves._nthsig_kernel(_check_k(k))
+        return _fill(out, map(f, self._uniforms(n)), n)
+
+    def biased_curve_many(self, k:float, a:float, b:float, n:int, out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """Draw n biased_curve samples into an array('d') (or into out)."""
+        f = curves._biased_curve_kernel(_check_k(k), a, b)
+        return _fill(out, map(f, self._uniforms(n)), n)
+
+    # --- Buffered streams ---
+    # A stream draws chunk_size uniforms from this RNG whenever its buffer runs dry, so interleaving other calls on the same RNG changes which values each gets.
+    # Give a stream its own RNG (fork/spawn) when that matters; on its own, a stream yields exactly the sequence of the scalar helper for the same seed.
+    def iter_ntsig(self, k:float, chunk_size:int=4096) -> Iterator[float]:
+        """Endless iterator of ntsig samples, refilled chunk_size at a time."""
+        return self._stream(curves._ntsig_kernel(_check_k(k)), chunk_size)
+
+    def iter_nthsig(self, k:float, chunk_size:int=4096) -> Iterator[float]:
+        """Endless iterator of nthsig samples, refilled chunk_size at a time."""
+        return self._stream(curves._nthsig_kernel(_check_k(k)), chunk_size)
+
+    def iter_biased_curve(self, k:float, a:float, b:float, chunk_size:int=4096) -> Iterator[float]:
+        """Endless iterator of biased_curve samples, refilled chunk_size at a time."""
+        return self._stream(curves._biased_curve_kernel(_check_k(k), a, b), chunk_size)
+
+    def _stream(self, f:Callable[[float], float], chunk_size:int) -> Iterator[float]:
+        if chunk_size < 1:
+            raise ValueError(f"Argument 'chunk_size' must be at least 1, got {chunk_size}.")
+        def stream():
+            while True:
+                yield from array('d', map(f, self._uniforms(chunk_size)))
+        return stream()
+
+    def _uniforms(self, n:int) -> Iterator[float]:
+        """Lazily yield the next n random() values."""
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        return starmap(self.random, repeat((), n))
+
     # --- RNG factories ---
+    # These build instances with _blank(), which skips the os.urandom seeding that type(self)() does in __init__ only for it to be overwritten.
+    # A subclass whose __init__ sets up more than the generator state should override _blank().
     def fork(self) -> Self:
         """Clone the current state into an independent RNG instance."""
-        r = type(self)()
+        r = self._blank()
         r.setstate(self.getstate())
         return r
 
     def spawn(self, seed_value:int|float|str|None=None) -> Self:
         """Create an independent seeded RNG instance."""
-        r = type(self)()
+        r = self._blank()
         r.seed(seed_value)
         return r
 
+    @classmethod
+    def _blank(cls) -> Self:
+        """An instance whose state is about to be overwritten: __init__ (and so seeding) is skipped."""
+        r = cls.__new__(cls, 0)
+        r.gauss_next = None
+        return r
+
+    # --- Compact state snapshots ---
+    def snapshot(self) -> bytes:
+        """The full state as 2,512 bytes (Mersenne Twister words, position and Gaussian carry, little-endian); restore() reads it back.
+
+        About a third the size of pickling getstate(), and faster to write and read, for checkpointing many RNGs.
+        """
+        _, internal, gauss = self.getstate()
+        return _MT_SNAPSHOT.pack(_MT_TAG, _NAN if gauss is None else gauss, *internal)
+
+    def restore(self, data:bytes) -> None:
+        """Restore a state returned by snapshot()."""
+        if len(data) != _MT_SNAPSHOT.size or data[:4] != _MT_TAG:
+            raise ValueError(f"Snapshot is not from a {ProbkitRNG.__name__}: {bytes(data[:16])!r}...")
+        values = _MT_SNAPSHOT.unpack(data)
+        gauss = values[1]
+        self.setstate((self.VERSION, values[2:], None if gauss != gauss else gauss))
+
+    @classmethod
+    def from_snapshot(cls, data:bytes) -> Self:
+        """Create an RNG in the state returned by snapshot()."""
+        r = cls._blank()
+        r.restore(data)
+        return r
+
     # --- Context helpers which do NOT drift global state ---
     @contextmanager
     def forked(self) -> Iterator[Self]:
@@ -59,6 +178,246 @@ class ProbkitRNG(Random):
         """Context manager yielding a spawned RNG instance."""
         yield self.spawn(seed_value)
 
+    def local(self, seed_value:int|str|bytes|None=None) -> "ThreadLocalRNG":
+        """Create a ThreadLocalRNG of this RNG's type, rooted at seed_value or, if None, at 128 bits drawn from this RNG (so a seeded rng gives reproducible per-thread streams)."""
+        return ThreadLocalRNG(self.getrandbits(128) if seed_value is None else seed_value, type(self))
+
+
+class CounterRNG(ProbkitRNG):
+    """ProbkitRNG driven by a counter-based generator instead of the Mersenne Twister.
+
+    The n-th 64-bit output is SplitMix64's finalizer applied to key + (n+1)*gamma, where the key is derived from the seed.
+    Every output is a pure function of (key, n), so the stream can be entered anywhere: jump(n) skips n outputs and at(i) reads output i, both in O(1).
+    To split one stream across workers, give worker w `rng.fork()` followed by `jump(w * block)`.
+
+    random() consumes one output; getrandbits(k) consumes ceil(k/64). All random.Random methods and probkit helpers work unchanged on top of them.
+    The stream differs from ProbkitRNG's for the same seed.
+    """
+
+    def seed(self, a:int|float|str|bytes|bytearray|None=None, version:int=2) -> None:
+        """Derive the key from a and rewind to position 0. None seeds from os.urandom."""
+        self._key = _hash_seed(a, b"probkit.ctr")
+        self._counter = 0
+        self.gauss_next = None
+
+    def getstate(self) -> tuple:
+        """Return the state (key, position and Gaussian carry); setstate() restores it."""
+        return ("counter", self._key, self._counter, self.gauss_next)
+
+    def setstate(self, state:tuple) -> None:
+        """Restore a state returned by getstate()."""
+        if not (isinstance(state, tuple) and len(state) == 4 and state[0] == "counter"):
+            raise ValueError(f"State is not from a CounterRNG: {state!r:.60}")
+        _, self._key, self._counter, self.gauss_next = state
+
+    def snapshot(self) -> bytes:
+        """The state (key, position and Gaussian carry) as 36 bytes; restore() reads it back."""
+        counter = self._counter
+        if counter >> 128:
+            raise OverflowError(f"Position {counter} does not fit in a snapshot.")
+        return _CTR_SNAPSHOT.pack(_CTR_TAG, _NAN if self.gauss_next is None else self.gauss_next, self._key, counter & _MASK64, counter >> 64)
+
+    def restore(self, data:bytes) -> None:
+        """Restore a state returned by snapshot()."""
+        if len(data) != _CTR_SNAPSHOT.size or data[:4] != _CTR_TAG:
+            raise ValueError(f"Snapshot is not from a {CounterRNG.__name__}: {bytes(data[:16])!r}...")
+        _, gauss, self._key, lo, hi = _CTR_SNAPSHOT.unpack(data)
+        self._counter = lo | hi << 64
+        self.gauss_next = None if gauss != gauss else gauss
+
+    # --- Core generator ---
+    def random(self) -> float:
+        """Next float in [0,1), from the top 53 bits of one 64-bit output."""
+        n = self._counter
+        self._counter = n + 1
+        return (_splitmix64(self._key + (n + 1) * _GAMMA) >> 11) * _2_POW_M53
+
+    def getrandbits(self, k:int) -> int:
+        """Next k random bits, from ceil(k/64) outputs (low words first; the last word keeps its top bits)."""
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        words = (k + 63) >> 6
+        n = self._counter
+        self._counter = n + words
+        key = self._key
+        x = 0
+        for i in range(words):
+            x |= _splitmix64(key + (n + i + 1) * _GAMMA) << (64 * i)
+        return x >> (64 * words - k)
+
+    # --- Random access ---
+    @property
+    def position(self) -> int:
+        """Number of 64-bit outputs consumed so far, i.e. the index of the next one."""
+        return self._counter
+
+    def jump(self, n:int) -> None:
+        """Skip the next n outputs in O(1). Each random() call is one output."""
+        if n < 0:
+            raise ValueError(f"Jump distance must not be negative, got {n}.")
+        self._counter += n
+
+    def at(self, index:int) -> float:
+        """The random() value at position index of this stream, without moving the position."""
+        if index < 0:
+            raise ValueError(f"Stream index must not be negative, got {index}.")
+        return (_splitmix64(self._key + (index + 1) * _GAMMA) >> 11) * _2_POW_M53
+
+    def at_many(self, start:int, n:int, out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+        """The random() values at positions [start, start+n) into an array('d') (or into out), without moving the position."""
+        if start < 0:
+            raise ValueError(f"Stream index must not be negative, got {start}.")
+        return _fill(out, self._block(start, n), n)
+
+    def _uniforms(self, n:int) -> Iterator[float]:
+        """Lazily yield the next n random() values, claiming the whole block of counters when iteration starts.
+
+        Claiming lazily means a call rejected before any value is drawn (a bad out buffer, an index past the end of a sequence) leaves the position unchanged.
+        """
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        # Subclasses range check in _block before returning their iterator; run those checks now, not at the first draw.
+        self._block(self._counter, n)
+        return self._claim(n)
+
+    def _claim(self, n:int) -> Iterator[float]:
+        start = self._counter
+        self._counter = start + n
+        yield from self._block(start, n)
+
+    def _block(self, start:int, n:int) -> Iterator[float]:
+        if n < 0:
+            raise ValueError(f"Sample count must not be negative, got {n}.")
+        key = self._key
+        mask = _MASK64
+        scale = _2_POW_M53
+        # _splitmix64 inlined: this is the bulk path.
+        for z in range(key + (start + 1) * _GAMMA, key + (start + n + 1) * _GAMMA, _GAMMA):
+            z &= mask
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+            yield ((z ^ (z >> 31)) >> 11) * scale
+
+
+class ThreadLocalRNG:
+    """Per-thread and per-task RNG streams derived from one root seed.
+
+    Every thread gets its own rng_type instance, created on first use and seeded with child_seed(root, "thread", name) for the thread's name,
+    so threads never share (or contend on) generator state and each thread's sequence does not depend on how the threads are scheduled.
+    Give worker threads stable names (e.g. ThreadPoolExecutor's thread_name_prefix) for streams that are reproducible across runs.
+    The names of threads drawing at the same time must be unique, since two such threads would otherwise draw identical streams:
+    a thread whose name belongs to another live thread that already has a stream raises RuntimeError. A later thread may reuse the name of one that has exited.
+
+    Code that is not tied to one thread, such as asyncio tasks, binds an explicit key instead: inside `with local.bind(key):` the current context
+    (tracked with contextvars, so each task sees only its own binding) uses the stream child_seed(root, "task", key). Binding the same key again replays that stream.
+
+    All ProbkitRNG methods and helpers are available on this object and act on the current stream; current() returns that stream itself,
+    which is the cheaper handle to keep in a hot loop. Looking up the stream takes no locks; only a thread's first use does.
+
+    Args:
+        seed_value (int|str|bytes, optional): The root seed. None uses 128 bits from os.urandom.
+        rng_type (type): The ProbkitRNG subclass to create streams with.
+    """
+
+    def __init__(self, seed_value:int|str|bytes|None=None, rng_type:type[ProbkitRNG]=ProbkitRNG):
+        self.rng_type = rng_type
+        self._bound = ContextVar(f"probkit.sampling.ThreadLocalRNG.{id(self):x}", default=None)
+        self._lock = threading.Lock()
+        self.seed(seed_value)
+
+    def seed(self, seed_value:int|str|bytes|None=None) -> None:
+        """Set the root seed. Every thread starts a new stream from it on next use; streams already bound with bind() are kept until their block ends."""
+        self.root = int.from_bytes(os.urandom(16), "little") if seed_value is None else seed_value
+        self._local = threading.local()
+        self._owners = weakref.WeakValueDictionary()
+
+    def stream(self, key:int|str) -> ProbkitRNG:
+        """A new rng_type instance for key's stream, not tied to any thread or context."""
+        from .parallel import child_seed
+        return self.rng_type(child_seed(self.root, "task", key))
+
+    @contextmanager
+    def bind(self, key:int|str) -> Iterator[ProbkitRNG]:
+        """Context manager making key's stream the current one in this context (thread or asyncio task) for the duration of the block."""
+        r = self.stream(key)
+        token = self._bound.set(r)
+        try:
+            yield r
+        finally:
+            self._bound.reset(token)
+
+    def current(self) -> ProbkitRNG:
+        """The stream for the current context: the innermost bind() if any, else this thread's stream."""
+        r = self._bound.get()
+        if r is not None:
+            return r
+        try:
+            return self._local.rng
+        except AttributeError:
+            return self._new_thread_stream()
+
+    def _new_thread_stream(self) -> ProbkitRNG:
+        from .parallel import child_seed
+        thread = threading.current_thread()
+        name = thread.name
+        with self._lock:
+            owner = self._owners.get(name)
+            if owner is not None and owner is not thread and owner.is_alive():
+                raise RuntimeError(f"Thread name {name!r} is already used by another live thread, which would draw the same stream; give each thread a unique name.")
+            self._owners[name] = thread
+        local = self._local
+        local.rng = self.rng_type(child_seed(self.root, "thread", name))
+        return local.rng
+
+    def __getattr__(self, name:str):
+        # Only reached for names not defined above: the ProbkitRNG methods and helpers.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.current(), name)
+
+    def __repr__(self) -> str:
+        return f"ThreadLocalRNG({self.root!r}, {self.rng_type.__name__})"
+
+
+# Snapshot layouts. A NaN Gaussian carry stands for None (gauss() never returns NaN).
+_NAN = float('nan')
+_MT_TAG = b"PKM1"
+_MT_SNAPSHOT = struct.Struct("<4sd624II")  # tag, gauss_next, 624 state words, position
+_CTR_TAG = b"PKC1"
+_CTR_SNAPSHOT = struct.Struct("<4sdQQQ")   # tag, gauss_next, key, position (low and high 64 bits)
+
+_MASK64 = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+_2_POW_M53 = 2.0 ** -53
+
+def _splitmix64(z:int) -> int:
+    """SplitMix64's output finalizer."""
+    z &= _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+def _hash_seed(a:int|float|str|bytes|bytearray|None, person:bytes) -> int:
+    """A 64-bit key from a seed value, stable across runs and platforms. None draws from os.urandom."""
+    if a is None:
+        data = os.urandom(16)
+    elif isinstance(a, (bytes, bytearray)):
+        data = b"b" + bytes(a)
+    elif isinstance(a, str):
+        data = b"s" + a.encode()
+    elif isinstance(a, int):
+        data = b"i" + str(a).encode()
+    elif isinstance(a, float):
+        data = b"f" + a.hex().encode()
+    else:
+        raise TypeError(f"The only supported seed types are: None, int, float, str, bytes, and bytearray, got {type(a).__name__}.")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8, person=person).digest(), "little")
+
+def _check_k(k:float) -> float:
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    return k
+
 
 # --- Singleton RNG ---
 rng = ProbkitRNG()
@@ -0,0 +1,359 @@
+"""
+Exact moments, quantiles and CDFs of the curve samplers.
+
+rng.nthsig(k) returns nthsig(k, U) for U uniform on [0,1], and likewise for ntsig and biased_curve. Because each curve is non-decreasing in x, the sample's quantile function is the curve itself and its CDF is the inverse curve; because the curves are rational, the moments have closed forms:
+
+    mean of nthsig(k, U) = (s-1) (s - (1+s) atanh(s)) / (2s^2)                                with s = -k
+    E[nthsig(k, U)^2]    = (s-1)^2 ((s-1) + (1+s)^2/(1-s) - 4 (1+s) atanh(s)) / (8s^3)
+
+ntsig(k, U) is 0.5 ± nthsig(k, V)/2 with a fair sign and V uniform, so its mean is always 0.5 and its variance is a quarter of E[nthsig(k, V)^2]. biased_curve is an affine map of nthsig.
+Near k=0 the closed forms lose digits to cancellation and their Taylor series in s are used instead, so every value is accurate to a few ulps.
+
+At k=±1 the samplers are discrete (nthsig is constant, ntsig a fair coin between 0 and 1, or constant 0.5) and the quantiles and CDFs are those of the discrete distributions.
+
+    nthsig_mean(0.5)                    # instead of mean(rng.nthsig_many(0.5, 10**7))
+    ntsig_quantile(0.8, 0.95)           # 95th percentile of rng.ntsig(0.8)
+    nthsig_variance_many(ks)            # many k at once; numpy arrays are evaluated with numpy
+"""
+
+__all__ = [
+    "ntsig_mean", "ntsig_variance", "ntsig_quantile", "ntsig_cdf",
+    "nthsig_mean", "nthsig_variance", "nthsig_quantile", "nthsig_cdf",
+    "biased_curve_mean", "biased_curve_variance", "biased_curve_quantile", "biased_curve_cdf",
+    "ntsig_mean_many", "ntsig_variance_many", "ntsig_quantile_many", "ntsig_cdf_many",
+    "nthsig_mean_many", "nthsig_variance_many", "nthsig_quantile_many", "nthsig_cdf_many",
+    "biased_curve_mean_many", "biased_curve_variance_many", "biased_curve_quantile_many", "biased_curve_cdf_many",
+]
+
+from collections.abc import Callable, Iterable, MutableSequence
+from itertools import repeat
+from math import atanh
+
+from . import curves
+from .probability import _broadcast_len, _is_vector
+from .utils import _as_sequence, _check_range_many, _check_range_numpy, _fill, _numpy_for, _numpy_out, _numpy_result
+
+# Below this |k| the closed forms lose more than about a digit to cancellation; the series are used instead.
+_SERIES_CUTOFF = 0.25
+_SERIES_TERMS = 36
+# mean = (1-s)/2 * sum(_MEAN_SERIES[n] * s**n), from expanding 1/(1 + s(1-2x)) as a geometric series and integrating term by term.
+_MEAN_SERIES = [1 / (2 * ((n + 1) // 2) + 1) for n in range(_SERIES_TERMS)]
+# E[Y^2] = (1-s)^2 * sum(_SQUARE_SERIES[n] * s**n), likewise.
+_SQUARE_SERIES = [(1 + (n + 1) / (n + 3)) / 4 if n % 2 == 0 else (n + 1) / (2 * (n + 2)) for n in range(_SERIES_TERMS)]
+
+
+# --- nthsig ---
+
+def nthsig_mean(k:float) -> float:
+    """Mean of rng.nthsig(k): the integral of nthsig(k, x) over [0,1]."""
+    return _nthsig_mean(_check_k(k))[0]
+
+def nthsig_variance(k:float) -> float:
+    """Variance of rng.nthsig(k)."""
+    return _nthsig_variance(_check_k(k))
+
+def nthsig_quantile(k:float, p:float) -> float:
+    """The p-quantile of rng.nthsig(k), p in [0,1]. Equal to nthsig(k, p) except at k=±1, where the sample is constant."""
+    return _nthsig_quantile(_check_k(k), _check_p(p))
+
+def nthsig_cdf(k:float, y:float) -> float:
+    """P(rng.nthsig(k) <= y). Equal to nthsig_inv(k, y) for y in [0,1] except at k=-1, where the sample is always 0."""
+    return _nthsig_cdf(_check_k(k), y)
+
+def _nthsig_mean(k:float) -> tuple[float, float]:
+    """The mean of nthsig(k, U) and its derivative in k (for probkit.fit's Newton steps)."""
+    if k == 1: return 1.0, 0.0
+    if k == -1: return 0.0, 0.0
+    s = -k
+    if abs(s) < _SERIES_CUTOFF:
+        total = dtotal = 0.0
+        for c in reversed(_MEAN_SERIES):
+            dtotal = dtotal * s + total
+            total = total * s + c
+        mean = (1 - s) / 2 * total
+        dmean_ds = (-total + (1 - s) * dtotal) / 2
+    else:
+        at = atanh(s)
+        g = (s - (1 + s) * at) / (2 * s * s)
+        dg = ((1 - at - 1 / (1 - s)) * s - 2 * (s - (1 + s) * at)) / (2 * s ** 3)
+        mean = (s - 1) * g
+        dmean_ds = g + (s - 1) * dg
+    return mean, -dmean_ds
+
+def _nthsig_square(k:float) -> float:
+    """E[nthsig(k, U)^2]."""
+    if k == 1: return 1.0
+    if k == -1: return 0.0
+    s = -k
+    if abs(s) < _SERIES_CUTOFF:
+        total = 0.0
+        for c in reversed(_SQUARE_SERIES):
+            total = total * s + c
+        return (1 - s) ** 2 * total
+    return (s - 1) ** 2 * ((s - 1) + (1 + s) ** 2 / (1 - s) - 4 * (1 + s) * atanh(s)) / (8 * s ** 3)
+
+def _nthsig_variance(k:float) -> float:
+    # 1 - nthsig(k, x) = nthsig(-k, 1-x), so the variance is even in k. Evaluating it at -|k|, where the samples crowd toward 0,
+    # keeps E[Y^2] much larger than mean^2 and avoids cancellation as |k| approaches 1.
+    k = -abs(k)
+    return max(0.0, _nthsig_square(k) - _nthsig_mean(k)[0] ** 2)
+
+def _nthsig_quantile(k:float, p:float) -> float:
+    if k == -1: return 0.0
+    if k == 1: return 1.0
+    return curves.nthsig(k, p)
+
+def _nthsig_cdf(k:float, y:float) -> float:
+    if y < 0: return 0.0
+    if y >= 1 or k == -1: return 1.0
+    return curves.nthsig(-k, y)
+
+
+# --- ntsig ---
+
+def ntsig_mean(k:float) -> float:
+    """Mean of rng.ntsig(k). Always 0.5: ntsig is symmetric about (0.5, 0.5)."""
+    _check_k(k)
+    return 0.5
+
+def ntsig_variance(k:float) -> float:
+    """Variance of rng.ntsig(k)."""
+    return _ntsig_variance(_check_k(k))
+
+def ntsig_quantile(k:float, p:float) -> float:
+    """The p-quantile of rng.ntsig(k), p in [0,1]. Equal to ntsig(k, p) except at k=±1, where the sample is discrete."""
+    return _ntsig_quantile(_check_k(k), _check_p(p))
+
+def ntsig_cdf(k:float, y:float) -> float:
+    """P(rng.ntsig(k) <= y). Equal to ntsig_inv(k, y) for y in [0,1] except at k=±1, where the sample is discrete."""
+    return _ntsig_cdf(_check_k(k), y)
+
+def _ntsig_mean(k:float) -> float:
+    return 0.5
+
+def _ntsig_variance(k:float) -> float:
+    return _nthsig_square(k) / 4
+
+def _ntsig_quantile(k:float, p:float) -> float:
+    if k == -1: return 0.5
+    if k == 1: return 0.0 if p <= 0.5 else 1.0
+    return curves.ntsig(k, p)
+
+def _ntsig_cdf(k:float, y:float) -> float:
+    if y < 0: return 0.0
+    if y >= 1: return 1.0
+    if k == -1: return 0.0 if y < 0.5 else 1.0
+    if k == 1: return 0.5
+    return curves.ntsig(-k, y)
+
+
+# --- biased_curve ---
+
+def biased_curve_mean(k:float, a:float, b:float) -> float:
+    """Mean of rng.biased_curve(k, a, b)."""
+    return _biased_curve_mean(_check_k(k), a, b)
+
+def biased_curve_variance(k:float, a:float, b:float) -> float:
+    """Variance of rng.biased_curve(k, a, b)."""
+    return _biased_curve_variance(_check_k(k), a, b)
+
+def biased_curve_quantile(k:float, a:float, b:float, p:float) -> float:
+    """The p-quantile of rng.biased_curve(k, a, b), p in [0,1]. Works for b < a too, where larger x gives smaller samples."""
+    return _biased_curve_quantile(_check_k(k), a, b, _check_p(p))
+
+def biased_curve_cdf(k:float, a:float, b:float, y:float) -> float:
+    """P(rng.biased_curve(k, a, b) <= y)."""
+    return _biased_curve_cdf(_check_k(k), a, b, y)
+
+def _biased_curve_mean(k:float, a:float, b:float) -> float:
+    return a + (b - a) * _nthsig_mean(k)[0]
+
+def _biased_curve_variance(k:float, a:float, b:float) -> float:
+    return (b - a) ** 2 * _nthsig_variance(k)
+
+def _biased_curve_quantile(k:float, a:float, b:float, p:float) -> float:
+    return a + (b - a) * _nthsig_quantile(k, p if a <= b else 1 - p)
+
+def _biased_curve_cdf(k:float, a:float, b:float, y:float) -> float:
+    if a == b or k in (-1, 1):
+        # The sample is constant.
+        return 1.0 if y >= a + (b - a) * _nthsig_quantile(k, 0.5) else 0.0
+    w = (y - a) / (b - a)
+    if a < b:
+        return _nthsig_cdf(k, w)
+    # Decreasing in x: P(Y <= y) = P(W >= w), and W is continuous here.
+    return 1.0 - _nthsig_cdf(k, w)
+
+
+# --- Batch versions ---
+# Each broadcasts scalars against equal-length sequences (numpy broadcasting for numpy arrays), validates k (and p) in bulk, and matches the scalar function element by element.
+
+def nthsig_mean_many(ks:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig_mean."""
+    return _many(lambda k: _nthsig_mean(k)[0], _nthsig_mean_numpy, (ks,), out)
+
+def nthsig_variance_many(ks:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig_variance."""
+    return _many(_nthsig_variance, _nthsig_variance_numpy, (ks,), out)
+
+def nthsig_quantile_many(ks:float|Iterable[float], ps:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig_quantile."""
+    return _many(_nthsig_quantile, _nthsig_quantile_numpy, (ks, ps), out, check_p=True)
+
+def nthsig_cdf_many(ks:float|Iterable[float], ys:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of nthsig_cdf."""
+    return _many(_nthsig_cdf, _nthsig_cdf_numpy, (ks, ys), out)
+
+def ntsig_mean_many(ks:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig_mean."""
+    return _many(_ntsig_mean, lambda np, ks: np.full(ks.shape, 0.5), (ks,), out)
+
+def ntsig_variance_many(ks:Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig_variance."""
+    return _many(_ntsig_variance, lambda np, ks: _nthsig_square_numpy(np, ks) / 4, (ks,), out)
+
+def ntsig_quantile_many(ks:float|Iterable[float], ps:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig_quantile."""
+    return _many(_ntsig_quantile, _ntsig_quantile_numpy, (ks, ps), out, check_p=True)
+
+def ntsig_cdf_many(ks:float|Iterable[float], ys:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of ntsig_cdf."""
+    return _many(_ntsig_cdf, _ntsig_cdf_numpy, (ks, ys), out)
+
+def biased_curve_mean_many(ks:float|Iterable[float], a:float|Iterable[float], b:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve_mean."""
+    return _many(_biased_curve_mean, lambda np, ks, a, b: a + (b - a) * _nthsig_mean_numpy(np, ks), (ks, a, b), out)
+
+def biased_curve_variance_many(ks:float|Iterable[float], a:float|Iterable[float], b:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve_variance."""
+    return _many(_biased_curve_variance, lambda np, ks, a, b: (b - a) ** 2 * _nthsig_variance_numpy(np, ks), (ks, a, b), out)
+
+def biased_curve_quantile_many(ks:float|Iterable[float], a:float|Iterable[float], b:float|Iterable[float], ps:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve_quantile."""
+    return _many(_biased_curve_quantile, _biased_curve_quantile_numpy, (ks, a, b, ps), out, check_p=True)
+
+def biased_curve_cdf_many(ks:float|Iterable[float], a:float|Iterable[float], b:float|Iterable[float], ys:float|Iterable[float], out:MutableSequence[float]|None=None) -> MutableSequence[float]:
+    """Batch version of biased_curve_cdf."""
+    return _many(_biased_curve_cdf, _biased_curve_cdf_numpy, (ks, a, b, ys), out)
+
+def _many(f:Callable[..., float], f_numpy:Callable, args:tuple, out, check_p:bool=False):
+    """Broadcast args, validate k (the first) and p (the last, if check_p), and evaluate f or, for numpy input, f_numpy."""
+    np = _numpy_for(*args, out)
+    if np is not None:
+        arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in args))
+        _check_range_numpy(np, arrays[0], -1, 1, "ks")
+        if check_p:
+            _check_range_numpy(np, arrays[-1], 0, 1, "ps")
+        buf = _numpy_out(np, out, arrays[0].shape)
+        np.copyto(buf, f_numpy(np, *arrays))
+        return _numpy_result(out, buf)
+
+    n = _broadcast_len(list(args))
+    args = [_as_sequence(v) if _is_vector(v) else v for v in args]
+    _check_many(args[0], -1, 1, "ks")
+    if check_p:
+        _check_many(args[-1], 0, 1, "ps")
+    return _fill(out, map(f, *(v if _is_vector(v) else repeat(v, n) for v in args)), n)
+
+def _check_many(v, lo:float, hi:float, name:str) -> None:
+    if _is_vector(v):
+        _check_range_many(v, lo, hi, name)
+    elif not lo <= v <= hi:
+        raise ValueError(f"Argument '{name}' must be in range [{lo},{hi}], got {v}.")
+
+
+# --- numpy paths (only reached when the caller already passed numpy arrays) ---
+
+def _horner_numpy(np, coefficients:list[float], s):
+    total = np.zeros(s.shape)
+    for c in reversed(coefficients):
+        total = total * s + c
+    return total
+
+def _nthsig_mean_numpy(np, ks):
+    return _nthsig_mean_and_slope_numpy(np, ks)[0]
+
+def _nthsig_mean_and_slope_numpy(np, ks):
+    """Vectorized _nthsig_mean: the means and their derivatives in k."""
+    s = -np.asarray(ks, dtype=float)
+    total = np.zeros(s.shape)
+    dtotal = np.zeros(s.shape)
+    for c in reversed(_MEAN_SERIES):
+        dtotal = dtotal * s + total
+        total = total * s + c
+    mean_series = (1 - s) / 2 * total
+    dmean_series = (-total + (1 - s) * dtotal) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        at = np.arctanh(s)
+        g = (s - (1 + s) * at) / (2 * s * s)
+        dg = ((1 - at - 1 / (1 - s)) * s - 2 * (s - (1 + s) * at)) / (2 * s ** 3)
+        mean_closed = (s - 1) * g
+        dmean_closed = g + (s - 1) * dg
+
+    series = np.abs(s) < _SERIES_CUTOFF
+    mean = np.select([s == -1, s == 1, series], [1.0, 0.0, mean_series], mean_closed)
+    dmean = np.select([np.abs(s) == 1, series], [0.0, dmean_series], dmean_closed)
+    return mean, -dmean
+
+def _nthsig_square_numpy(np, ks):
+    s = -np.asarray(ks, dtype=float)
+    series = (1 - s) ** 2 * _horner_numpy(np, _SQUARE_SERIES, s)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        closed = (s - 1) ** 2 * ((s - 1) + (1 + s) ** 2 / (1 - s) - 4 * (1 + s) * np.arctanh(s)) / (8 * s ** 3)
+    return np.select([s == -1, s == 1, np.abs(s) < _SERIES_CUTOFF], [1.0, 0.0, series], closed)
+
+def _nthsig_variance_numpy(np, ks):
+    ks = -np.abs(ks)
+    return np.maximum(0.0, _nthsig_square_numpy(np, ks) - _nthsig_mean_numpy(np, ks) ** 2)
+
+def _nthsig_numpy(np, ks, xs):
+    """nthsig with both k and x arrays (unchecked)."""
+    s = -ks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = (s - 1) * xs / (2 * s * xs - s - 1)
+    return np.select([(xs == 0) | (xs == 1) | (ks == 0), ks == -1, ks == 1], [xs, 0.0, 1.0], y)
+
+def _ntsig_numpy(np, ks, xs):
+    """ntsig with both k and x arrays (unchecked): on each side of 0.5, nthsig applied to |2x-1|."""
+    t = 2 * xs - 1
+    y = (np.sign(t) * _nthsig_numpy(np, ks, np.abs(t)) + 1) / 2
+    return np.where((xs == 0) | (xs == 0.5) | (xs == 1) | (ks == 0), xs, y)
+
+def _nthsig_quantile_numpy(np, ks, ps):
+    return np.select([ks == -1, ks == 1], [0.0, 1.0], _nthsig_numpy(np, ks, ps))
+
+def _nthsig_cdf_numpy(np, ks, ys):
+    y = _nthsig_numpy(np, -ks, np.clip(ys, 0, 1))
+    return np.select([ys < 0, (ys >= 1) | (ks == -1)], [0.0, 1.0], y)
+
+def _ntsig_quantile_numpy(np, ks, ps):
+    return np.select([ks == -1, ks == 1], [0.5, np.where(ps <= 0.5, 0.0, 1.0)], _ntsig_numpy(np, ks, ps))
+
+def _ntsig_cdf_numpy(np, ks, ys):
+    y = _ntsig_numpy(np, -ks, np.clip(ys, 0, 1))
+    return np.select([ys < 0, ys >= 1, ks == -1, ks == 1], [0.0, 1.0, np.where(ys < 0.5, 0.0, 1.0), 0.5], y)
+
+def _biased_curve_quantile_numpy(np, ks, a, b, ps):
+    return a + (b - a) * _nthsig_quantile_numpy(np, ks, np.where(a <= b, ps, 1 - ps))
+
+def _biased_curve_cdf_numpy(np, ks, a, b, ys):
+    constant = (a == b) | (np.abs(ks) == 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = (ys - a) / (b - a)
+    w = np.where(constant, 0.0, w)
+    y = _nthsig_cdf_numpy(np, ks, w)
+    y = np.where(a < b, y, 1.0 - y)
+    value = a + (b - a) * np.where(ks == 1, 1.0, 0.0)
+    return np.where(constant, np.where(ys >= value, 1.0, 0.0), y)
+
+
+def _check_k(k:float) -> float:
+    if not -1 <= k <= 1:
+        raise ValueError(f"Argument 'k' must be in range [-1,1], got {k}.")
+    return k
+
+def _check_p(p:float) -> float:
+    if not 0 <= p <= 1:
+        raise ValueError(f"Argument 'p' must be in range [0,1], got {p}.")
+    return p
@@ -4,6 +4,11 @@ General utility functions for probkit.
 
 __all__ = ["clamp", "transform_range", "effective_ratio"]
 
+import sys
+from array import array
+
+from . import backends
+
 def clamp(val:float, min_val:float, max_val:float) -> float:
     """Clamp a value between min_val and max_val.
 
@@ -44,3 +49,100 @@ def effective_ratio(a:float, b:float) -> float:
     if b == 0:
         return float('inf') if a > 0 else float('-inf')
     return a / b
+
+# --- Bulk helpers shared by the *_many functions (private) ---
+
+def _numpy_for(*objs):
+    """Return the numpy module if any of objs is a numpy array or the numpy backend is active, else None.
+
+    numpy is only looked up in sys.modules: if the caller handed us an ndarray, numpy is already imported, and if not we never pay for importing it.
+    """
+    backend = backends._active
+    if backend.numpy is not None:
+        return backend.numpy
+    np = sys.modules.get("numpy")
+    if np is not None:
+        for obj in objs:
+            if isinstance(obj, np.ndarray):
+                return np
+    return None
+
+def _as_sequence(xs):
+    """Return xs unchanged if it supports len(), otherwise materialize it as an array('d')."""
+    return xs if hasattr(xs, "__len__") else array("d", xs)
+
+def _check_range_many(xs, lo:float, hi:float, name:str, message:str|None=None) -> None:
+    """Validate that every element of xs is in [lo,hi], raising ValueError naming the first offender.
+
+    message, if given, replaces the default error text and is formatted with the offending value and its index.
+    The happy path is three C-level passes (min, max, sum); sum catches NaN, which min/max can silently skip.
+    """
+    if len(xs) == 0:
+        return
+    if lo <= min(xs) and max(xs) <= hi:
+        s = sum(xs)
+        if s == s:
+            return
+    for i, x in enumerate(xs):
+        if not lo <= x <= hi:
+            if message is None:
+                message = f"Argument '{name}' must be in range [{lo},{hi}], got {{x}} at index {{i}}."
+            raise ValueError(message.format(x=x, i=i))
+
+def _check_min_many(xs, lo:float, message:str) -> None:
+    """Validate that no element of xs is below lo (NaN passes, as it does in the scalar checks).
+
+    message is formatted with the offending value and its index.
+    """
+    if len(xs) == 0:
+        return
+    if lo <= min(xs):
+        s = sum(xs)
+        if s == s:
+            return
+    for i, x in enumerate(xs):
+        if x < lo:
+            raise ValueError(message.format(x=x, i=i))
+
+def _check_range_numpy(np, xs, lo:float, hi:float, name:str) -> None:
+    """numpy counterpart of _check_range_many."""
+    bad = ~((xs >= lo) & (xs <= hi))
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"Argument '{name}' must be in range [{lo},{hi}], got {xs.flat[i]} at index {i}.")
+
+def _fill(out, values, n:int):
+    """Write an iterable of n floats into out (or a new container from the active backend, array('d') by default, if out is None) and return it."""
+    if out is None:
+        return backends._active.new(values, n)
+    if len(out) != n:
+        raise ValueError(f"Argument 'out' must have length {n}, got {len(out)}.")
+    for i, y in enumerate(values):
+        out[i] = y
+    return out
+
+def _numpy_out(np, out, shape):
+    """Return out (checked against shape) or a new float64 array of that shape, for a numpy path to write its results into.
+
+    A non-numpy out (array('d'), writable memoryview) is wrapped in a numpy view sharing its memory.
+    One without the buffer protocol (a list) gets a new array instead, which _numpy_result copies back into it.
+    """
+    if out is None:
+        return np.empty(shape)
+    if not isinstance(out, np.ndarray):
+        try:
+            out = np.frombuffer(out, dtype=float)
+        except TypeError:
+            if (len(out),) != shape:
+                raise ValueError(f"Argument 'out' must have shape {shape}, got ({len(out)},).") from None
+            return np.empty(shape)
+    if out.shape != shape:
+        raise ValueError(f"Argument 'out' must have shape {shape}, got {out.shape}.")
+    return out
+
+def _numpy_result(out, buf):
+    """Return the result of a numpy path that wrote into buf = _numpy_out(np, out, shape): buf itself, or out when buf had to be a separate array."""
+    if out is None or buf.base is not None or out is buf:
+        return buf
+    out[:] = buf.tolist()
+    return out
@@ -0,0 +1,165 @@
+"""
+Weighted random selection driven by modified_probability.
+
+WeightedTable holds entries with a base probability and a ratio modifier each; an entry's weight is modified_probability(base, ratio).
+Picks cost O(1) via Walker/Vose alias tables. Entries are split into ~sqrt(n) blocks, each with its own alias table, plus a top-level table over the block totals, so changing one entry rebuilds only its block and the top level: O(sqrt(n)) instead of O(n).
+
+    table = WeightedTable(["common", "rare", "epic"], [0.6, 0.3, 0.1])
+    table.update(2, ratio=1.5)   # player modifier changed
+    loot = table.sample(rng)
+"""
+
+__all__ = ["WeightedTable"]
+
+from array import array
+from collections.abc import Iterable, Sequence
+from math import fsum, isqrt
+from typing import Any
+
+from .probability import modified_probability, modified_probability_many
+
+
+class WeightedTable:
+    """Alias-table sampler over entries weighted by modified_probability(base, ratio).
+
+    Weights are relative: they do not need to sum to 1.
+
+    Args:
+        items (sequence): The values returned by sample().
+        bases (sequence of float): Base probability of each entry, in [0,1].
+        ratios (sequence of float, optional): Ratio modifier of each entry (>= 0). Defaults to 1 (no modification).
+    """
+
+    def __init__(self, items:Iterable[Any], bases:Iterable[float], ratios:Iterable[float]|None=None):
+        self.items = list(items)
+        self._bases = array('d', bases)
+        n = len(self.items)
+        self._ratios = array('d', [1.0] * n) if ratios is None else array('d', ratios)
+        if not n == len(self._bases) == len(self._ratios):
+            raise ValueError(f"items, bases and ratios must have the same length, got {n}, {len(self._bases)} and {len(self._ratios)}.")
+        if n == 0:
+            raise ValueError("WeightedTable needs at least one entry.")
+
+        self._weights = modified_probability_many(self._bases, self._ratios)
+
+        size = self._block_size = max(1, isqrt(n))
+        self._starts = list(range(0, n, size))
+        self._sizes = [min(size, n - s) for s in self._starts]
+        self._prob = array('d', bytes(8 * n))
+        self._alias = array('q', bytes(8 * n))
+        self._totals = array('d', bytes(8 * len(self._starts)))
+        for j in range(len(self._starts)):
+            self._build_block(j)
+        self._build_top()
+
+    # --- Queries ---
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def total(self) -> float:
+        """Sum of all weights."""
+        return fsum(self._totals)
+
+    def weight(self, i:int) -> float:
+        """Weight of entry i, i.e. modified_probability(base, ratio)."""
+        return self._weights[i]
+
+    def probability(self, i:int) -> float:
+        """Probability that sample() picks entry i."""
+        total = self.total
+        return self._weights[i] / total if total else 0.0
+
+    # --- Updates ---
+    def update(self, i:int, base:float|None=None, ratio:float|None=None) -> None:
+        """Change the base probability and/or ratio of entry i, rebuilding only its block. O(sqrt(n)). Negative i counts from the end, as in a list."""
+        i = range(len(self.items))[i]
+        if base is None: base = self._bases[i]
+        if ratio is None: ratio = self._ratios[i]
+        weight = modified_probability(base, ratio)
+        self._bases[i] = base
+        self._ratios[i] = ratio
+        self._weights[i] = weight
+        self._build_block(i // self._block_size)
+        self._build_top()
+
+    # --- Sampling ---
+    def sample_index(self, rng=None) -> int:
+        """Pick an entry index in O(1), using two random() draws from rng (default: probkit.sampling.rng)."""
+        if rng is None:
+            from .sampling import rng
+        return self._pick(rng.random(), rng.random())
+
+    def sample(self, rng=None) -> Any:
+        """Pick an entry in O(1), using two random() draws from rng (default: probkit.sampling.rng)."""
+        return self.items[self.sample_index(rng)]
+
+    def sample_many(self, n:int, rng=None) -> list:
+        """Pick n entries. Returns the same picks, in order, as n calls to sample() with the same rng state."""
+        return [self.items[i] for i in self.sample_indices(n, rng)]
+
+    def sample_indices(self, n:int, rng=None) -> array:
+        """Pick n entry indices into an array('q'). See sample_many."""
+        if rng is None:
+            from .sampling import rng
+        us = rng.random_many(2 * n)
+        pick = self._pick
+        return array('q', map(pick, us[::2], us[1::2]))
+
+    def _pick(self, u:float, v:float) -> int:
+        if not self._top_ready:
+            raise ValueError("Cannot sample from a WeightedTable whose weights are all zero.")
+        # Each uniform picks a column (integer part) and flips that column's biased coin (fractional part).
+        x = u * len(self._totals)
+        j = int(x)
+        if x - j >= self._top_prob[j]:
+            j = self._top_alias[j]
+        x = v * self._sizes[j]
+        i = int(x)
+        coin = x - i
+        i += self._starts[j]
+        if coin >= self._prob[i]:
+            return self._alias[i]
+        return i
+
+    # --- Alias table construction ---
+    def _build_block(self, j:int) -> None:
+        start, size = self._starts[j], self._sizes[j]
+        weights = self._weights[start:start + size]
+        prob, alias, total = _vose(weights)
+        self._prob[start:start + size] = prob
+        self._alias[start:start + size] = array('q', [start + a for a in alias])
+        self._totals[j] = total
+
+    def _build_top(self) -> None:
+        self._top_prob, self._top_alias, total = _vose(self._totals)
+        self._top_ready = total > 0
+
+
+def _vose(weights:Sequence[float]) -> tuple[array, array, float]:
+    """Build a Vose alias table for weights, returning (prob, alias, total)."""
+    for w in weights:
+        if not 0 <= w < float('inf'):
+            raise ValueError(f"Weights must be finite and non-negative, got {w}.")
+    m = len(weights)
+    total = fsum(weights)
+    prob = array('d', bytes(8 * m))
+    alias = array('q', range(m))
+    if total == 0:
+        return prob, alias, 0.0
+
+    scaled = [w * m / total for w in weights]
+    small = [i for i, s in enumerate(scaled) if s < 1]
+    large = [i for i, s in enumerate(scaled) if s >= 1]
+    while small and large:
+        s = small.pop()
+        l = large[-1]
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1
+        if scaled[l] < 1:
+            small.append(large.pop())
+    # Whatever is left over is 1 up to rounding.
+    for i in large + small:
+        prob[i] = 1.0
+    return prob, alias, total
@@ -0,0 +1,150 @@
+import math
+import pickle
+import statistics
+import unittest
+from bisect import bisect_right
+from itertools import islice
+
+from probkit.accumulators import Histogram, QuantileSketch, Welford
+from probkit.parallel import run
+from probkit.sampling import ProbkitRNG
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def _chunk_welford(rng, n):
+    return Welford().update(rng.ntsig_many(0.4, n))
+
+class TestWelford(unittest.TestCase):
+    def test_matches_statistics(self):
+        xs = list(ProbkitRNG(1).ntsig_many(0.4, 10_000))
+        for feed in ("add", "update", "stream", "pieces"):
+            w = Welford()
+            if feed == "add":
+                for x in xs: w.add(x)
+            elif feed == "update":
+                w.update(xs)
+            elif feed == "stream":
+                w.update(iter(xs))
+            else:
+                for i in range(0, len(xs), 333): w.update(xs[i:i + 333])
+            self.assertEqual(w.count, len(xs))
+            self.assertAlmostEqual(w.mean, statistics.fmean(xs), places=13)
+            self.assertAlmostEqual(w.variance, statistics.variance(xs), places=13)
+            self.assertAlmostEqual(w.stderr, math.sqrt(statistics.variance(xs) / len(xs)), places=13)
+            self.assertEqual((w.min, w.max), (min(xs), max(xs)))
+
+    def test_merge(self):
+        xs = list(ProbkitRNG(2).random_many(1000))
+        parts = [Welford().update(xs[i:i + 100]) for i in range(0, 1000, 100)]
+        merged = Welford()
+        for part in pickle.loads(pickle.dumps(parts)):
+            merged.merge(part)
+        merged.merge(Welford())
+        self.assertAlmostEqual(merged.mean, statistics.fmean(xs), places=13)
+        self.assertAlmostEqual(merged.variance, statistics.variance(xs), places=13)
+        with self.assertRaises(TypeError):
+            merged.merge(Histogram())
+
+    def test_empty_and_parallel_reduce(self):
+        w = Welford()
+        self.assertTrue(math.isnan(w.mean) and math.isnan(w.variance))
+        w.add(3.0)
+        self.assertEqual(w.mean, 3.0)
+        self.assertTrue(math.isnan(w.variance))
+        total = run(_chunk_welford, 5000, seed=1, chunk_size=1000, workers=1, reduce=Welford.merge)
+        self.assertEqual(total.count, 5000)
+        self.assertAlmostEqual(total.mean, 0.5, delta=0.02)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        xs = numpy.asarray(ProbkitRNG(3).random_many(5000))
+        w = Welford().update(xs)
+        self.assertAlmostEqual(w.mean, float(xs.mean()), places=13)
+        self.assertAlmostEqual(w.variance, float(xs.var(ddof=1)), places=13)
+
+class TestHistogram(unittest.TestCase):
+    def test_counts(self):
+        h = Histogram(4, 0, 2)
+        h.update([0, 0.49, 0.5, 1.99, 2, -1, 3])
+        h.add(1.0)
+        self.assertEqual(list(h.counts), [2, 1, 1, 2])
+        self.assertEqual((h.underflow, h.overflow, h.total), (1, 1, 8))
+        self.assertEqual(h.edges, [0, 0.5, 1.0, 1.5, 2])
+        self.assertEqual(h.density(), [0.5, 0.25, 0.25, 0.5])
+
+    def test_quantile_and_merge(self):
+        xs = list(ProbkitRNG(4).random_many(20_000))
+        a = Histogram(100).update(xs[:10_000])
+        b = Histogram(100).update(iter(xs[10_000:]))
+        self.assertEqual(list(a.merge(b).counts), list(Histogram(100).update(xs).counts))
+        for p in (0.1, 0.5, 0.9):
+            self.assertAlmostEqual(a.quantile(p), p, delta=0.01)
+        self.assertEqual((a.quantile(0), a.quantile(1)), (0.0, 1.0))
+        with self.assertRaisesRegex(ValueError, "same bins"):
+            a.merge(Histogram(10))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "bins"):
+            Histogram(0)
+        with self.assertRaisesRegex(ValueError, "'lo'"):
+            Histogram(10, 1, 1)
+        with self.assertRaisesRegex(ValueError, "NaN.*index 1"):
+            Histogram().update([0.5, float('nan')])
+        with self.assertRaisesRegex(ValueError, "empty"):
+            Histogram().quantile(0.5)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        xs = [0.0, 0.3, 0.99, 1.0, 1.5, -0.2]
+        h = Histogram(10).update(numpy.asarray(xs))
+        self.assertEqual(list(h.counts), list(Histogram(10).update(xs).counts))
+        self.assertEqual((h.underflow, h.overflow), (1, 1))
+
+class TestQuantileSketch(unittest.TestCase):
+    def rank_error(self, sketch, xs):
+        s = sorted(xs)
+        return max(abs(bisect_right(s, sketch.quantile(p)) / len(s) - p) for p in [i / 100 for i in range(1, 100)])
+
+    def test_accuracy_and_memory(self):
+        xs = list(ProbkitRNG(5).ntsig_many(-0.3, 100_000))
+        q = QuantileSketch(200).update(xs)
+        self.assertEqual(q.count, len(xs))
+        self.assertLess(len(q), 3 * 200 + 50)
+        self.assertLess(self.rank_error(q, xs), 1.7 / 200)
+        self.assertEqual((q.quantile(0), q.quantile(1)), (min(xs), max(xs)))
+        self.assertAlmostEqual(q.rank(q.quantile(0.25)), 0.25, delta=1.7 / 200)
+        scalar = QuantileSketch(200)
+        for x in islice(xs, 20_000): scalar.add(x)
+        self.assertLess(self.rank_error(scalar, xs[:20_000]), 1.7 / 200)
+
+    def test_merge_and_reproducibility(self):
+        chunks = [list(ProbkitRNG(i).nthsig_many(0.5, 20_000)) for i in range(6)]
+        parts = [QuantileSketch(seed=i).update(c) for i, c in enumerate(chunks)]
+        merged = QuantileSketch()
+        for part in pickle.loads(pickle.dumps(parts)):
+            merged.merge(part)
+        xs = [x for c in chunks for x in c]
+        self.assertEqual(merged.count, len(xs))
+        self.assertLess(len(merged), 3 * 200 + 50)
+        self.assertLess(self.rank_error(merged, xs), 2 / 200)
+        self.assertEqual(QuantileSketch(seed=1).update(xs).quantiles([0.1, 0.9]), QuantileSketch(seed=1).update(xs).quantiles([0.1, 0.9]))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "'k'"):
+            QuantileSketch(4)
+        with self.assertRaisesRegex(ValueError, "empty"):
+            QuantileSketch().quantile(0.5)
+        with self.assertRaisesRegex(ValueError, "NaN.*index 2"):
+            QuantileSketch().update([0.1, 0.2, float('nan')])
+        with self.assertRaisesRegex(ValueError, "NaN"):
+            QuantileSketch().add(float('nan'))
+        with self.assertRaisesRegex(ValueError, "index 1"):
+            QuantileSketch().update([0.5]).quantiles([0.5, 2])
+        q = QuantileSketch().update([float('inf'), -float('inf'), 0.0])
+        self.assertEqual(q.quantile(0.5), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import importlib
+import subprocess
+import sys
+import unittest
+import warnings
+from array import array
+from unittest import mock
+
+import probkit
+from probkit import backends, curves, probability
+from probkit.sampling import ProbkitRNG
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestBackends(unittest.TestCase):
+    def tearDown(self):
+        backends.set_backend("auto")
+
+    def test_default_is_auto(self):
+        self.assertEqual(backends.get_backend().name, "auto")
+        self.assertIsInstance(curves.ntsig_many(0.5, [0.1, 0.9]), array)
+
+    def test_python_backend_returns_lists(self):
+        backends.set_backend("python")
+        ys = curves.ntsig_many(0.5, [0.1, 0.9])
+        self.assertIsInstance(ys, list)
+        self.assertEqual(ys, [curves.ntsig(0.5, 0.1), curves.ntsig(0.5, 0.9)])
+        self.assertIsInstance(probability.modified_probability_many([0.5], 2), list)
+        self.assertIsInstance(ProbkitRNG(1).random_many(3), list)
+
+    def test_out_is_filled_regardless_of_backend(self):
+        out = array("d", [0, 0])
+        with backends.use_backend("python"):
+            self.assertIs(curves.nthsig_many(0.5, [0.1, 0.9], out=out), out)
+        self.assertEqual(list(out), [curves.nthsig(0.5, 0.1), curves.nthsig(0.5, 0.9)])
+
+    def test_use_backend_restores(self):
+        with backends.use_backend("array") as backend:
+            self.assertIs(backends.get_backend(), backend)
+            self.assertEqual(backend.name, "array")
+        self.assertEqual(backends.get_backend().name, "auto")
+        with self.assertRaises(KeyError):
+            with backends.use_backend("python"):
+                raise KeyError
+        self.assertEqual(backends.get_backend().name, "auto")
+
+    def test_unknown_backend(self):
+        with self.assertRaisesRegex(ValueError, "Unknown backend 'fortran'"):
+            backends.set_backend("fortran")
+        self.assertEqual(backends.get_backend().name, "auto")
+
+    def test_fallback_chain(self):
+        def broken():
+            raise ImportError("no such thing")
+        backends.register_backend("broken", broken, fallback="python")
+        try:
+            with self.assertWarnsRegex(RuntimeWarning, "falling back to 'python'"):
+                self.assertEqual(backends.set_backend("broken").name, "python")
+            with self.assertRaises(ImportError):
+                backends.set_backend("broken", fallback=False)
+            self.assertNotIn("broken", backends.available_backends())
+        finally:
+            del backends._FACTORIES["broken"], backends._FALLBACK["broken"]
+
+    def test_numpy_falls_back_to_array_without_numpy(self):
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            with self.assertWarnsRegex(RuntimeWarning, "falling back to 'array'"):
+                self.assertEqual(backends.set_backend("numpy").name, "array")
+            with self.assertRaises(ImportError):
+                backends.set_backend("numpy", fallback=False)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_backend(self):
+        xs = [0.1, 0.5, 0.9]
+        expected = list(curves.biased_curve_many(0.3, 0.2, 0.8, xs))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            backends.set_backend("numpy")
+        self.assertIn("numpy", backends.available_backends())
+        ys = curves.biased_curve_many(0.3, 0.2, 0.8, xs)
+        self.assertIsInstance(ys, numpy.ndarray)
+        for y, e in zip(ys, expected):
+            self.assertAlmostEqual(y, e, places=12)
+        self.assertIsInstance(ProbkitRNG(1).random_many(3), numpy.ndarray)
+        out = array("d", [0, 0, 0])
+        curves.ntsig_many(0.5, xs, out=out)
+        self.assertEqual(out[1], curves.ntsig(0.5, 0.5))
+        with self.assertRaisesRegex(ValueError, "xs"):
+            curves.ntsig_many(0.5, [0.5, 2])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_backend_fills_list_out(self):
+        xs = [0.1, 0.5, 0.9]
+        with backends.use_backend("numpy"):
+            for f in [
+                lambda out: curves.ntsig_many(0.5, xs, out=out),
+                lambda out: curves.nthsig_many(0, xs, out=out),
+                lambda out: probability.modified_probability_many(xs, 2, out=out),
+                lambda out: probability.OddsModifier([2]).resolve_many(xs, out=out),
+                lambda out: probability.OddsModifier([0]).resolve_many(xs, out=out),
+            ]:
+                out = [0, 0, 0]
+                self.assertIs(f(out), out)
+                with backends.use_backend("auto"):
+                    self.assertEqual(out, list(f(None)))
+            with self.assertRaisesRegex(ValueError, "'out'"):
+                curves.ntsig_many(0.5, xs, out=[0, 0])
+
+class TestLazyImport(unittest.TestCase):
+    # Generous caps: they catch an accidental eager import of the whole package (or of numpy), not machine noise.
+    IMPORT_SECONDS = 0.05
+    NEW_MODULES = 8
+
+    def run_python(self, code):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        return result.stdout.split()
+
+    def test_import_budget(self):
+        seconds, count, loaded = self.run_python(
+            "import sys, time\n"
+            "before = set(sys.modules)\n"
+            "t = time.perf_counter()\n"
+            "import probkit\n"
+            "t = time.perf_counter() - t\n"
+            "new = set(sys.modules) - before\n"
+            "print(t, len(new), any(m.startswith('probkit.') for m in new))\n"
+        )
+        self.assertLess(float(seconds), self.IMPORT_SECONDS)
+        self.assertLessEqual(int(count), self.NEW_MODULES)
+        self.assertEqual(loaded, "False")
+
+    def test_exports_match_submodules(self):
+        for module, names in probkit._EXPORTS.items():
+            self.assertEqual(names, importlib.import_module(f"probkit.{module}").__all__, module)
+        self.assertEqual(set(probkit.__all__), set(probkit._ORIGIN))
+
+    def test_lazy_attributes(self):
+        self.assertIs(probkit.ntsig, curves.ntsig)
+        self.assertIs(probkit.sampling, sys.modules["probkit.sampling"])
+        self.assertIn("Pipeline", dir(probkit))
+        self.assertIn("stats", dir(probkit))
+        with self.assertRaises(AttributeError):
+            probkit.no_such_name
+
+    def test_star_import_and_instrumentation_from_fresh_import(self):
+        out = self.run_python(
+            "import probkit\n"
+            "from probkit import instrument\n"
+            "instrument.enable()\n"
+            "wrapped = probkit.ntsig is probkit.curves.ntsig\n"
+            "instrument.disable()\n"
+            "from probkit import *\n"
+            "print(wrapped, probkit.ntsig is ntsig is probkit.curves.ntsig, hasattr(ntsig, '__probkit_stats_key__'))\n"
+        )
+        self.assertEqual(out, ["True", "True", "False"])
+
+if __name__ == '__main__':
+    unittest.main()
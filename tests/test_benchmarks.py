@@ -0,0 +1,42 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.__main__ import main
+from benchmarks.harness import CASES, compare
+
+def doc(**times):
+    return {"meta": {}, "results": {name: {"ns_per_op": ns, "ops": 1} for name, ns in times.items()}}
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare(self):
+        rows, regressions = compare(doc(a=100, b=100, c=100), doc(a=105, b=130, d=1), threshold=0.1)
+        self.assertEqual([r[0] for r in rows], ["a", "b"])
+        self.assertEqual(regressions, ["b"])
+        self.assertEqual(compare(doc(a=100), doc(a=130), threshold=0.5)[1], [])
+
+    def test_cases_cover_public_api(self):
+        names = " ".join(CASES)
+        for fn in ["ntsig", "nthsig", "biased_curve", "_dd_ntsig", "modified_probability", "transform_range", "effective_ratio", "sampling.ntsig_many"]:
+            self.assertIn(fn, names)
+
+    def test_run_and_compare_cli(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(["run", "-f", "utils.clamp", "--repeat", "1", "--min-time", "0.001", "-o", path]), 0)
+            with open(path) as f:
+                results = json.load(f)
+            self.assertEqual(list(results["results"]), ["utils.clamp"])
+
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w") as f:
+                json.dump(doc(**{"utils.clamp": results["results"]["utils.clamp"]["ns_per_op"] / 10}), f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(["compare", baseline, path, "--threshold", "0.5"]), 1)
+                self.assertEqual(main(["compare", path, path]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
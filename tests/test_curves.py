@@ -1,5 +1,18 @@
 import unittest
-from probkit.curves import ntsig, nthsig, biased_curve
+from array import array
+from probkit.curves import (
+    ntsig, nthsig, biased_curve, ntsig_many, nthsig_many, biased_curve_many,
+    ntsig_inv, nthsig_inv, biased_curve_inv, ntsig_inv_many, nthsig_inv_many, biased_curve_inv_many,
+    Curve, HalfCurve, BiasedCurve,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+XS = [0, 0.5, 1, 1e-20, 0.1, 0.25, 0.4999, 0.5001, 0.75, 0.9, 1 - 1e-16]
+KS = [-1, -0.99, -0.5, 0, 0.5, 0.99, 1]
 
 class TestCurves(unittest.TestCase):
     def test_ntsig(self):
@@ -60,5 +73,95 @@ class TestCurves(unittest.TestCase):
         with self.assertRaises(ValueError): biased_curve(0, 0, 1, -0.1)
         with self.assertRaises(ValueError): biased_curve(0, 0, 1, 1.1)
 
+    def test_many_matches_scalar(self):
+        for k in KS:
+            self.assertEqual(list(ntsig_many(k, XS)), [ntsig(k, x) for x in XS])
+            self.assertEqual(list(nthsig_many(k, XS)), [nthsig(k, x) for x in XS])
+            self.assertEqual(list(biased_curve_many(k, 10, -5, XS)), [biased_curve(k, 10, -5, x) for x in XS])
+
+    def test_many_input_types(self):
+        expected = [ntsig(0.5, x) for x in XS]
+        self.assertEqual(ntsig_many(0.5, array('d', XS)), array('d', expected))
+        self.assertEqual(list(ntsig_many(0.5, memoryview(array('d', XS)))), expected)
+        self.assertEqual(list(ntsig_many(0.5, tuple(XS))), expected)
+        self.assertEqual(list(ntsig_many(0.5, iter(XS))), expected)
+        self.assertEqual(list(ntsig_many(0.5, [])), [])
+
+    def test_many_out(self):
+        out = array('d', [0.0] * len(XS))
+        self.assertIs(nthsig_many(0.5, XS, out=out), out)
+        self.assertEqual(list(out), [nthsig(0.5, x) for x in XS])
+        out = [None] * len(XS)
+        self.assertIs(biased_curve_many(0.5, 1, 2, XS, out), out)
+        self.assertEqual(out, [biased_curve(0.5, 1, 2, x) for x in XS])
+        with self.assertRaises(ValueError): ntsig_many(0.5, XS, out=array('d', [0.0]))
+
+    def test_many_invalid(self):
+        with self.assertRaises(ValueError): ntsig_many(1.1, XS)
+        with self.assertRaises(ValueError): nthsig_many(-1.1, XS)
+        with self.assertRaises(ValueError): biased_curve_many(float('nan'), 0, 1, XS)
+        with self.assertRaisesRegex(ValueError, "index 2"): ntsig_many(0.5, [0.1, 0.2, 1.1])
+        with self.assertRaisesRegex(ValueError, "index 1"): nthsig_many(0.5, [0.1, float('nan'), 0.3])
+        with self.assertRaisesRegex(ValueError, "index 0"): biased_curve_many(0.5, 0, 1, [-0.1])
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_many_numpy(self):
+        xs = numpy.array(XS)
+        for k in KS:
+            self.assertEqual(ntsig_many(k, xs).tolist(), [ntsig(k, x) for x in XS])
+            self.assertEqual(nthsig_many(k, xs).tolist(), [nthsig(k, x) for x in XS])
+            self.assertEqual(biased_curve_many(k, 10, -5, xs).tolist(), [biased_curve(k, 10, -5, x) for x in XS])
+        out = numpy.empty(len(XS))
+        self.assertIs(ntsig_many(0.5, xs, out=out), out)
+        with self.assertRaisesRegex(ValueError, "index 1"): nthsig_many(0.5, numpy.array([0.1, 2.0]))
+
+    def test_compiled_curves_match_scalar(self):
+        for k in KS:
+            curve, half, biased = Curve(k), HalfCurve(k), BiasedCurve(k, 10, -5)
+            for x in XS:
+                self.assertEqual(curve(x), ntsig(k, x))
+                self.assertEqual(curve.unchecked(x), ntsig(k, x))
+                self.assertEqual(half(x), nthsig(k, x))
+                self.assertEqual(half.unchecked(x), nthsig(k, x))
+                self.assertEqual(biased(x), biased_curve(k, 10, -5, x))
+            self.assertEqual(list(curve.many(XS)), [ntsig(k, x) for x in XS])
+            self.assertEqual(list(half.many(XS, check=False)), [nthsig(k, x) for x in XS])
+
+    def test_compiled_curves_invalid(self):
+        with self.assertRaises(ValueError): Curve(1.1)
+        with self.assertRaises(ValueError): HalfCurve(-1.1)
+        with self.assertRaises(ValueError): BiasedCurve(2, 0, 1)
+        with self.assertRaises(ValueError): Curve(0.5)(1.1)
+        with self.assertRaises(ValueError): HalfCurve(0.5)(float('nan'))
+        with self.assertRaises(ValueError): BiasedCurve(0.5, 0, 1).many([0.5, -0.1])
+        with self.assertRaises(AttributeError): Curve(0.5).extra = 1
+
+    def test_inverses(self):
+        for k in [-0.99, -0.5, 0, 0.3, 0.99]:
+            for x in XS:
+                self.assertAlmostEqual(ntsig_inv(k, ntsig(k, x)), x, delta=1e-9)
+                self.assertAlmostEqual(nthsig_inv(k, nthsig(k, x)), x, delta=1e-9)
+                self.assertAlmostEqual(biased_curve_inv(k, 10, -5, biased_curve(k, 10, -5, x)), x, delta=1e-9)
+        # Degenerate curves invert to their mirror images
+        self.assertEqual(ntsig_inv(1, 0.3), 0.5)
+        self.assertEqual(nthsig_inv(1, 0.3), 0)
+        self.assertEqual(nthsig_inv(-1, 0.3), 1)
+
+    def test_inverses_many(self):
+        ys = [0, 0.2, 0.5, 0.7, 1]
+        for k in KS:
+            self.assertEqual(list(ntsig_inv_many(k, ys)), [ntsig_inv(k, y) for y in ys])
+            self.assertEqual(list(nthsig_inv_many(k, ys)), [nthsig_inv(k, y) for y in ys])
+            self.assertEqual(list(biased_curve_inv_many(k, 2, 1, [1, 1.5, 2])), [biased_curve_inv(k, 2, 1, y) for y in [1, 1.5, 2]])
+
+    def test_inverses_invalid(self):
+        with self.assertRaises(ValueError): ntsig_inv(1.1, 0.5)
+        with self.assertRaises(ValueError): nthsig_inv(0.5, 1.1)
+        with self.assertRaises(ValueError): biased_curve_inv(0.5, 1, 1, 1)
+        with self.assertRaises(ValueError): biased_curve_inv(0.5, 0, 1, 2)
+        with self.assertRaisesRegex(ValueError, "'ys'.*index 1"): ntsig_inv_many(0.5, [0.5, 2])
+        with self.assertRaisesRegex(ValueError, "index 0"): biased_curve_inv_many(0.5, 1, 2, [0.5])
+        with self.assertRaises(ValueError): biased_curve_inv_many(0.5, 1, 1, [1])
+
 if __name__ == '__main__':
     unittest.main()
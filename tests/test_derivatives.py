@@ -0,0 +1,114 @@
+import unittest
+from random import Random
+
+from probkit import curves
+from probkit.derivatives import (
+    biased_curve_grad, biased_curve_grad_many, modified_probability_grad, modified_probability_grad_many,
+    nthsig_grad, nthsig_grad_many, ntsig_grad, ntsig_grad_many,
+)
+from probkit.probability import modified_probability
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INF = float('inf')
+H = 1e-6
+
+def central(f, k, x):
+    """Central differences of f in k and x."""
+    return (f(k + H, x) - f(k - H, x)) / (2 * H), (f(k, x + H) - f(k, x - H)) / (2 * H)
+
+class TestDerivatives(unittest.TestCase):
+    def test_curves_match_finite_differences(self):
+        r = Random(1)
+        cases = [
+            (ntsig_grad, curves.ntsig),
+            (nthsig_grad, curves.nthsig),
+            (lambda k, x: biased_curve_grad(k, 0.2, -3, x), lambda k, x: curves.biased_curve(k, 0.2, -3, x)),
+        ]
+        for _ in range(500):
+            k, x = r.uniform(-0.95, 0.95), r.uniform(0.01, 0.99)
+            for grad, f in cases:
+                y, dk, dx = grad(k, x)
+                self.assertEqual(y, f(k, x))
+                fk, fx = central(f, k, x)
+                self.assertAlmostEqual(dk, fk, delta=1e-7 * (1 + abs(fk)))
+                self.assertAlmostEqual(dx, fx, delta=1e-7 * (1 + abs(fx)))
+
+    def test_modified_probability_matches_finite_differences(self):
+        r = Random(2)
+        for _ in range(500):
+            k, x = r.uniform(0.01, 0.99), r.uniform(0.01, 5)
+            y, dk, dx = modified_probability_grad(k, x)
+            self.assertEqual(y, modified_probability(k, x))
+            fk, fx = central(modified_probability, k, x)
+            self.assertAlmostEqual(dk, fk, delta=1e-7)
+            self.assertAlmostEqual(dx, fx, delta=1e-7)
+        self.assertEqual(modified_probability_grad(0.5, 3, 4), modified_probability_grad(0.5, 0.75))
+
+    def test_edges(self):
+        for k in [-1, 0, 1]:
+            xs = [0, 1e-9, 0.1, 0.25, 0.3, 0.5, 0.75, 1 - 1e-9, 1]
+            for x in xs:
+                self.assertEqual(ntsig_grad(k, x).y, curves.ntsig(k, x))
+                self.assertEqual(nthsig_grad(k, x).y, curves.nthsig(k, x))
+                self.assertEqual(biased_curve_grad(k, 2, 5, x).y, curves.biased_curve(k, 2, 5, x))
+            self.assertEqual(list(ntsig_grad_many(k, xs).y), list(curves.ntsig_many(k, xs)))
+            self.assertEqual(list(nthsig_grad_many(k, xs).y), list(curves.nthsig_many(k, xs)))
+            self.assertEqual(list(biased_curve_grad_many(k, 2, 5, xs).y), list(curves.biased_curve_many(k, 2, 5, xs)))
+        # Steps at k=±1: infinite slope in x, flat in k.
+        self.assertEqual(nthsig_grad(-1, 1), (1, 0, INF))
+        self.assertEqual(nthsig_grad(1, 0), (0, 0, INF))
+        self.assertEqual(ntsig_grad(1, 0.5), (0.5, 0, INF))
+        self.assertEqual(nthsig_grad(1, 0.5).dx, 0)
+        self.assertEqual(nthsig_grad(0, 0.5), (0.5, 0.5, 1))
+        self.assertEqual(biased_curve_grad(0.3, 2, 2, 0.4), (2, 0, 0))
+        self.assertEqual(modified_probability_grad(0.3, INF), (1, 0, 0))
+        self.assertEqual(modified_probability_grad(1, 0), (0, 0, INF))
+        self.assertEqual(modified_probability_grad(0.5, 0), (0, 0, 1))
+        self.assertEqual(modified_probability_grad(0.5, 1, 0), (1, 0, 0))
+
+    def test_many_matches_scalar(self):
+        xs = [i / 20 for i in range(21)]
+        for k in [-1, -0.6, 0, 0.3, 1]:
+            for many, scalar in [
+                (ntsig_grad_many(k, xs), lambda x: ntsig_grad(k, x)),
+                (nthsig_grad_many(k, iter(xs)), lambda x: nthsig_grad(k, x)),
+                (biased_curve_grad_many(k, 5, 1, xs), lambda x: biased_curve_grad(k, 5, 1, x)),
+            ]:
+                self.assertEqual(list(zip(*many)), [scalar(x) for x in xs])
+        ks, ratios = [0, 0.3, 1, 0.5], [0, 2, 0.5, INF]
+        self.assertEqual(list(zip(*modified_probability_grad_many(ks, ratios))), [modified_probability_grad(k, x) for k, x in zip(ks, ratios)])
+        self.assertEqual(list(zip(*modified_probability_grad_many(0.4, [1, 3], 2))), [modified_probability_grad(0.4, x, 2) for x in [1, 3]])
+        self.assertEqual(tuple(map(list, nthsig_grad_many(0.5, []))), ([], [], []))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "'k'"): nthsig_grad(1.5, 0.5)
+        with self.assertRaisesRegex(ValueError, "'x'"): ntsig_grad(0.5, -0.1)
+        with self.assertRaisesRegex(ValueError, "index 1"): biased_curve_grad_many(0.5, 0, 1, [0.5, 2])
+        with self.assertRaisesRegex(ValueError, "negative"): modified_probability_grad(0.5, -1)
+        with self.assertRaisesRegex(ValueError, "index 2"): modified_probability_grad_many([0.1, 0.2, 1.5], 1)
+        with self.assertRaisesRegex(ValueError, "index 1"): modified_probability_grad_many(0.5, [1, -1])
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_numpy(self):
+        xs = numpy.concatenate([numpy.linspace(0, 1, 41), [1e-9, 0.1, 0.3]])
+        for k in [-1, -0.6, 0, 0.3, 1]:
+            for f, args in [(ntsig_grad_many, ()), (nthsig_grad_many, ()), (biased_curve_grad_many, (0.2, -3)), (biased_curve_grad_many, (2, 2))]:
+                got = f(k, *args, xs)
+                self.assertEqual([g.tolist() for g in got], [list(g) for g in f(k, *args, xs.tolist())])
+            self.assertEqual(nthsig_grad_many(k, xs).y.tolist(), curves.nthsig_many(k, xs).tolist())
+            self.assertEqual(ntsig_grad_many(k, xs).y.tolist(), curves.ntsig_many(k, xs).tolist())
+        ks = numpy.array([[0.0], [0.3], [1.0]])
+        ratios = numpy.array([0, 0.5, 1, 3, INF])
+        got = modified_probability_grad_many(ks, ratios)
+        self.assertEqual(got.y.shape, (3, 5))
+        for i, k in enumerate([0.0, 0.3, 1.0]):
+            for j, x in enumerate(ratios.tolist()):
+                self.assertEqual(tuple(g[i, j] for g in got), modified_probability_grad(k, x))
+        with self.assertRaisesRegex(ValueError, "index 1"): nthsig_grad_many(0.5, numpy.array([0.5, 2]))
+
+if __name__ == '__main__':
+    unittest.main()
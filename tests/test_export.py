@@ -0,0 +1,138 @@
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from probkit.__main__ import main
+from probkit.export import SampleFile, generate_chunk, write_samples
+from probkit.parallel import child_seed
+from probkit.probability import modified_probability
+from probkit.sampling import CounterRNG, ProbkitRNG
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_matches_sampler_chunk_by_chunk(self):
+        path = self.path("b.pk")
+        header = write_samples(path, "biased_curve", (0.3, 0.1, 0.9), 25, seed=42, chunk_size=10)
+        self.assertEqual(header["count"], 25)
+        with SampleFile(path) as f:
+            self.assertEqual((f.format, f.dtype, len(f)), ("probkit", "f8", 25))
+            self.assertEqual(f.header, header)
+            for c in range(3):
+                r = ProbkitRNG(child_seed(42, c))
+                expected = [r.biased_curve(0.3, 0.1, 0.9) for _ in range(min(10, 25 - 10 * c))]
+                self.assertEqual(f.chunk(c).tolist(), expected)
+                self.assertEqual(f.regenerate(c).tolist(), expected)
+            with self.assertRaises(IndexError):
+                f.chunk(3)
+
+    def test_formats_and_dtypes(self):
+        for fmt in ["probkit", "npy", "raw"]:
+            for dtype, width in [("f8", 8), ("f4", 4)]:
+                path = self.path(f"x.{fmt}.{dtype}")
+                header = write_samples(path, "ntsig", (0.5,), 100, seed="s", format=fmt, dtype=dtype, chunk_size=32)
+                with SampleFile(path, dtype) as f:
+                    self.assertEqual((f.format, f.dtype, len(f)), (fmt, dtype, 100))
+                    self.assertEqual(f.values.tolist(), [x for c in range(4) for x in generate_chunk(header, c)])
+                if fmt == "raw":
+                    self.assertEqual(os.path.getsize(path), 100 * width)
+                else:
+                    self.assertEqual((os.path.getsize(path) - 100 * width) % 64, 0)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_npy_loads_with_numpy(self):
+        path = self.path("x.npy")
+        write_samples(path, "nthsig", (-0.4,), 1000, seed=1, format="npy", dtype="f4", chunk_size=100)
+        loaded = numpy.load(path, mmap_mode="r")
+        self.assertEqual((loaded.dtype, loaded.shape), (numpy.dtype("<f4"), (1000,)))
+        with SampleFile(path) as f:
+            self.assertEqual(loaded.tolist(), f.values.tolist())
+
+    def test_first_chunk_and_counter_rng(self):
+        whole = write_samples(io.BytesIO(), "ntsig", (0.2,), 30, seed=5, format="raw", chunk_size=10, rng_type="CounterRNG")
+        part = dict(whole, first_chunk=2, count=10)
+        self.assertEqual(generate_chunk(part, 0).tolist(), generate_chunk(whole, 2).tolist())
+        r = CounterRNG(child_seed(5, 2))
+        self.assertEqual(generate_chunk(whole, 2)[0], r.ntsig(0.2))
+
+    def test_modified_probability(self):
+        out = io.BytesIO()
+        header = write_samples(out, "modified_probability", (3, 2), 5, seed=9, format="raw")
+        r = ProbkitRNG(child_seed(9, 0))
+        expected = [modified_probability(r.random(), 3, 2) for _ in range(5)]
+        self.assertEqual(list(struct.unpack("<5d", out.getvalue())), expected)
+        self.assertEqual(header["args"], [3.0, 2.0])
+        out = io.BytesIO()
+        write_samples(out, "modified_probability", (1e-20,), 5, seed=9, format="raw")
+        r = ProbkitRNG(child_seed(9, 0))
+        self.assertEqual(list(struct.unpack("<5d", out.getvalue())), [modified_probability(r.random(), 1e-20) for _ in range(5)])
+
+    def test_errors(self):
+        out = io.BytesIO()
+        with self.assertRaisesRegex(ValueError, "Argument 'k'"):
+            write_samples(out, "ntsig", (2,), 10, seed=1)
+        with self.assertRaisesRegex(ValueError, "kind"):
+            write_samples(out, "gauss", (0,), 10, seed=1)
+        with self.assertRaisesRegex(ValueError, "takes arguments"):
+            write_samples(out, "biased_curve", (0.1,), 10, seed=1)
+        with self.assertRaisesRegex(ValueError, "format"):
+            write_samples(out, "ntsig", (0.1,), 10, seed=1, format="csv")
+        with self.assertRaisesRegex(ValueError, "dtype"):
+            write_samples(out, "ntsig", (0.1,), 10, seed=1, dtype="f2")
+        with self.assertRaises(TypeError):
+            write_samples(out, "ntsig", (0.1,), 10, seed=b"bytes")
+        self.assertEqual(out.getvalue(), b"")
+        path = self.path("raw")
+        write_samples(path, "ntsig", (0.1,), 10, seed=1, format="raw")
+        with SampleFile(path) as f:
+            with self.assertRaisesRegex(ValueError, "no seed header"):
+                f.regenerate(0)
+
+    def test_empty_and_truncated(self):
+        path = self.path("empty.pk")
+        write_samples(path, "ntsig", (0.1,), 0, seed=1)
+        with SampleFile(path) as f:
+            self.assertEqual(len(f), 0)
+        write_samples(path, "ntsig", (0.1,), 10, seed=1)
+        with open(path, "r+b") as file:
+            file.truncate(os.path.getsize(path) - 8)
+        maps = []
+        def mapped(*args, **kwargs):
+            maps.append(real_mmap(*args, **kwargs))
+            return maps[-1]
+        real_mmap = mmap.mmap
+        with mock.patch("mmap.mmap", mapped):
+            with self.assertRaisesRegex(ValueError, "truncated"):
+                SampleFile(path)
+        # The mapping is closed right away, not left for the garbage collector.
+        self.assertEqual([m.closed for m in maps], [True])
+
+    def test_cli(self):
+        path = self.path("cli.pk")
+        self.assertEqual(main(["sample", "biased_curve", "0.2", "10", "100", "-n", "50", "--seed", "7", "--chunk-size", "16", "-o", path]), 0)
+        with SampleFile(path) as f:
+            self.assertEqual(f.header["seed"], 7)
+            self.assertEqual(f.chunk(1).tolist(), f.regenerate(1).tolist())
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            main(["info", path])
+        self.assertEqual(json.loads(stdout.getvalue())["samples"], 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from probkit.curves import ntsig, nthsig, biased_curve
+from probkit.fit import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+KS = [-1, -0.999, -0.7, -0.3, -0.05, 0, 0.02, 0.3, 0.7, 0.999, 1]
+XS = [0.001, 0.1, 0.25, 0.4, 0.6, 0.75, 0.9, 0.999]
+
+def integral(f, n=20000):
+    """Midpoint rule over [0,1]."""
+    return sum(f((i + 0.5) / n) for i in range(n)) / n
+
+class TestFitPoints(unittest.TestCase):
+    def test_recovers_k(self):
+        """Test point fits recover the k that produced the point"""
+        for k in KS[1:-1]:
+            for x in XS:
+                fit = fit_nthsig(x, nthsig(k, x))
+                self.assertAlmostEqual(fit.k, k, delta=1e-6)
+                self.assertAlmostEqual(fit.residual, 0, places=14)
+                self.assertEqual(fit.residual, nthsig(fit.k, x) - nthsig(k, x))
+                self.assertAlmostEqual(fit_ntsig(x, ntsig(k, x)).k, k, delta=1e-6)
+                self.assertAlmostEqual(fit_biased_curve(2, -3, x, biased_curve(k, 2, -3, x)).k, k, delta=1e-6)
+
+    def test_edges(self):
+        """Test saturated and degenerate targets"""
+        self.assertEqual(fit_nthsig(0.3, 0).k, -1)
+        self.assertEqual(fit_nthsig(0.3, 1).k, 1)
+        self.assertEqual(fit_nthsig(0.3, 0.3), (0, 0))
+        self.assertEqual(fit_nthsig(1, 1), (0, 0))
+        self.assertEqual(fit_ntsig(0.5, 0.5), (0, 0))
+        self.assertEqual(fit_ntsig(0.2, 0.5).k, -1)
+        self.assertEqual(fit_ntsig(0.8, 1).k, 1)
+
+    def test_unreachable(self):
+        """Test targets no k can reach raise ValueError"""
+        with self.assertRaises(ValueError): fit_nthsig(0, 0.5)
+        with self.assertRaises(ValueError): fit_ntsig(0.2, 0.7)
+        with self.assertRaises(ValueError): fit_ntsig(0.5, 0.6)
+        with self.assertRaises(ValueError): fit_biased_curve(2, 5, 0.3, 6)
+        with self.assertRaises(ValueError): fit_biased_curve(2, 2, 0.3, 2)
+        with self.assertRaises(ValueError): fit_nthsig(1.5, 0.5)
+
+    def test_many(self):
+        """Test batch point fits match the scalar fits and broadcast scalars"""
+        ys = [nthsig(0.4, x) for x in XS]
+        ks, residuals = fit_nthsig_many(XS, ys)
+        self.assertEqual(list(ks), [fit_nthsig(x, y).k for x, y in zip(XS, ys)])
+        self.assertEqual(list(residuals), [fit_nthsig(x, y).residual for x, y in zip(XS, ys)])
+        self.assertEqual(list(fit_ntsig_many(0.2, [0.1, 0.3]).k), [fit_ntsig(0.2, 0.1).k, fit_ntsig(0.2, 0.3).k])
+        self.assertEqual(list(fit_biased_curve_many(2, 5, [0.2, 0.6], 3).k), [fit_biased_curve(2, 5, 0.2, 3).k, fit_biased_curve(2, 5, 0.6, 3).k])
+        with self.assertRaisesRegex(ValueError, "index 1"): fit_ntsig_many([0.2, 0.2], [0.1, 0.7])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_many_numpy(self):
+        """Test numpy point fits agree with the scalar fits"""
+        xs = numpy.array(XS + [0, 0.5, 1])
+        for fit_many, fit, f in [(fit_nthsig_many, fit_nthsig, nthsig), (fit_ntsig_many, fit_ntsig, ntsig)]:
+            ys = numpy.array([f(0.4, x) for x in xs])
+            ks, residuals = fit_many(xs, ys)
+            expected = [fit(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+            numpy.testing.assert_allclose(ks, [e.k for e in expected], atol=1e-12)
+            numpy.testing.assert_allclose(residuals, 0, atol=1e-15)
+        with self.assertRaisesRegex(ValueError, "index 1"): fit_ntsig_many(numpy.array([0.2, 0.2]), numpy.array([0.1, 0.7]))
+        with self.assertRaisesRegex(ValueError, "index 0"): fit_ntsig_many(numpy.array([1.0]), numpy.array([0.9]))
+
+class TestFitMeans(unittest.TestCase):
+    def test_nthsig_mean(self):
+        """Test mean fits hit the target mean of the curve and of the variate"""
+        for target in [0.001, 0.999]:
+            self.assertLess(abs(fit_nthsig_mean(target).residual), 1e-14)
+            self.assertLess(abs(fit_nthsig_mean(target, variate=True).residual), 1e-14)
+        for target in [0.05, 0.1, 0.3, 0.49, 0.5, 0.52, 0.8, 0.95]:
+            k, residual = fit_nthsig_mean(target)
+            self.assertLess(abs(residual), 1e-14)
+            self.assertAlmostEqual(integral(lambda x: nthsig(k, x)), target, places=7)
+            k, residual = fit_nthsig_mean(target, variate=True)
+            self.assertLess(abs(residual), 1e-14)
+            # The variate's mean is the area above its CDF.
+            self.assertAlmostEqual(integral(lambda x: 1 - nthsig(k, x)), target, places=7)
+        self.assertEqual(fit_nthsig_mean(0).k, -1)
+        self.assertEqual(fit_nthsig_mean(1).k, 1)
+        self.assertEqual(fit_nthsig_mean(0.5).k, 0)
+
+    def test_biased_curve_mean(self):
+        """Test biased_curve mean fits for the curve and for the variate with endpoint masses"""
+        k, residual = fit_biased_curve_mean(2, 7, 3)
+        self.assertAlmostEqual(integral(lambda x: biased_curve(k, 2, 7, x)), 3, places=6)
+        k, residual = fit_biased_curve_mean(0.1, 0.8, 0.3, variate=True)
+        self.assertAlmostEqual(integral(lambda x: 1 - biased_curve(k, 0.1, 0.8, x)), 0.3, places=7)
+        with self.assertRaises(ValueError): fit_biased_curve_mean(2, 7, 8)
+        with self.assertRaises(ValueError): fit_biased_curve_mean(2, 7, 3, variate=True)
+        with self.assertRaises(ValueError): fit_biased_curve_mean(0.2, 0.2, 0.2)
+
+    def test_many(self):
+        """Test batch mean fits match the scalar fits"""
+        targets = [0.05, 0.3, 0.5, 0.51, 0.9]
+        ks, residuals = fit_nthsig_mean_many(targets)
+        self.assertEqual(list(ks), [fit_nthsig_mean(t).k for t in targets])
+        ks, residuals = fit_nthsig_mean_many(targets, variate=True)
+        self.assertEqual(list(ks), [fit_nthsig_mean(t, variate=True).k for t in targets])
+        ks, residuals = fit_biased_curve_mean_many(2, 7, [3, 4, 6])
+        self.assertEqual(list(ks), [fit_biased_curve_mean(2, 7, t).k for t in [3, 4, 6]])
+        with self.assertRaisesRegex(ValueError, "index 2"): fit_nthsig_mean_many([0.5, 0.5, 1.5])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_many_numpy(self):
+        """Test vectorized Newton solves agree with the scalar solver"""
+        targets = numpy.linspace(0, 1, 101)
+        for variate in [False, True]:
+            ks, residuals = fit_nthsig_mean_many(targets, variate)
+            expected = [fit_nthsig_mean(t, variate).k for t in targets.tolist()]
+            numpy.testing.assert_allclose(ks, expected, atol=1e-12)
+            self.assertLess(numpy.abs(residuals).max(), 1e-14)
+        with self.assertRaisesRegex(ValueError, "index 1"): fit_nthsig_mean_many(numpy.array([0.5, -0.1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import probkit
+from probkit import curves, instrument, probability
+from probkit.sampling import ProbkitRNG
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.originals = (curves.ntsig, probability.modified_probability, probkit.ntsig, ProbkitRNG.ntsig)
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_enable_disable_swaps_functions(self):
+        self.assertFalse(instrument.is_enabled())
+        instrument.enable()
+        instrument.enable()  # idempotent
+        self.assertTrue(instrument.is_enabled())
+        self.assertIsNot(curves.ntsig, self.originals[0])
+        self.assertIs(probkit.ntsig, curves.ntsig)
+        instrument.disable()
+        self.assertFalse(instrument.is_enabled())
+        self.assertEqual((curves.ntsig, probability.modified_probability, probkit.ntsig, ProbkitRNG.ntsig), self.originals)
+
+    def test_results_unchanged(self):
+        cases = [(k, x) for k in [-1, -0.5, 0, 0.5, 1] for x in [0, 0.2, 0.5, 0.9, 1]]
+        expected = [(curves.ntsig(k, x), curves.nthsig(k, x), curves.biased_curve(k, 2, 5, x)) for k, x in cases]
+        mp_expected = [probability.modified_probability(k / 2 + 0.5, x * 3) for k, x in cases]
+        instrument.enable()
+        self.assertEqual([(curves.ntsig(k, x), curves.nthsig(k, x), curves.biased_curve(k, 2, 5, x)) for k, x in cases], expected)
+        self.assertEqual([probability.modified_probability(k / 2 + 0.5, x * 3) for k, x in cases], mp_expected)
+        self.assertEqual(probkit.ntsig(k=0.5, x=0.3), self.originals[2](0.5, 0.3))
+        with self.assertRaisesRegex(ValueError, "'x' must be in range"): curves.ntsig(0.5, 2)
+        with self.assertRaisesRegex(ValueError, "Ratio may not be negative"): probability.modified_probability(0.5, -1)
+
+    def test_counters(self):
+        instrument.enable()
+        for x in [0, 0.3, 0.5, 0.7, 1]:
+            curves.ntsig(0.5, x)
+        curves.ntsig(0, 0.3)
+        with self.assertRaises(ValueError): curves.nthsig(2, 0.5)
+        probability.modified_probability(0.3, 3, 2)
+        curves.nthsig_many(0.25, [0.1, 0.2, 0.3])
+        ProbkitRNG(1).ntsig_many(1, 10)
+        stats = instrument.snapshot()
+
+        ntsig = stats["curves.ntsig"]
+        self.assertEqual((ntsig["calls"], ntsig["elements"], ntsig["edge"], ntsig["full"]), (6, 6, 4, 2))
+        self.assertEqual(ntsig["k_histogram"], {0.0: 1, 0.5: 5})
+        self.assertGreater(ntsig["validation_s"], 0)
+        self.assertGreater(ntsig["compute_s"], 0)
+        self.assertEqual(stats["curves.nthsig"]["errors"], 1)
+        self.assertEqual(stats["probability.modified_probability"]["full"], 1)
+        self.assertEqual(stats["curves.nthsig_many"]["elements"], 3)
+        rng_stats = stats["sampling.ProbkitRNG.ntsig_many"]
+        self.assertEqual((rng_stats["calls"], rng_stats["elements"], rng_stats["edge"]), (1, 10, 10))
+
+    def test_nested_calls_counted_once(self):
+        instrument.enable()
+        rng = ProbkitRNG(1)
+        rng.ntsig(0.5)
+        rng.biased_curve_variate(0.2, 0.1, 0.9)
+        self.assertEqual(curves.ntsig_inv(0.3, 0.4), curves.ntsig(-0.3, 0.4))
+        stats = instrument.snapshot()
+        self.assertEqual(stats["curves.ntsig"]["calls"], 1)
+        self.assertEqual(stats["curves.ntsig"]["k_histogram"], {-0.3: 1})
+        self.assertEqual(stats["curves.ntsig_inv"]["k_histogram"], {0.3: 1})
+        self.assertEqual(stats["sampling.ProbkitRNG.ntsig"]["calls"], 1)
+        self.assertEqual(stats["sampling.ProbkitRNG.biased_curve_variate"]["calls"], 1)
+        self.assertNotIn("curves.biased_curve_inv", stats)
+        self.assertNotIn("curves.nthsig_inv", stats)
+        self.assertNotIn("curves.nthsig", stats)
+        with self.assertRaises(ValueError): curves.nthsig_inv(2, 0.5)
+        curves.nthsig(0.5, 0.5)
+        self.assertEqual(instrument.snapshot()["curves.nthsig_inv"]["errors"], 1)
+        self.assertEqual(instrument.snapshot()["curves.nthsig"]["calls"], 1)
+
+    def test_reset_and_disabled_counts_nothing(self):
+        instrument.enable()
+        curves.ntsig(0.5, 0.3)
+        self.assertIn("curves.ntsig", instrument.snapshot())
+        instrument.reset()
+        self.assertEqual(instrument.snapshot(), {})
+        instrument.disable()
+        curves.ntsig(0.5, 0.3)
+        self.assertEqual(instrument.snapshot(), {})
+
+if __name__ == '__main__':
+    unittest.main()
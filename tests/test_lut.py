@@ -0,0 +1,84 @@
+import unittest
+from array import array
+from random import Random
+from probkit import curves
+from probkit.curves import ntsig, nthsig, biased_curve
+from probkit.lut import CurveLUT
+
+XS = [0, 0.5, 1] + [Random(1).random() for _ in range(2000)]
+
+class TestCurveLUT(unittest.TestCase):
+    def assertWithin(self, lut, f, max_error):
+        err = max(abs(lut(x) - f(x)) for x in XS)
+        self.assertLessEqual(err, max_error)
+
+    def test_error_bound(self):
+        for method in ["linear", "cubic"]:
+            for k in [-0.9, -0.5, 0, 0.3, 0.9]:
+                lut = CurveLUT.from_ntsig(k, 1e-5, method)
+                self.assertWithin(lut, lambda x: ntsig(k, x), 1e-5)
+                self.assertLessEqual(lut.max_error, 1e-5)
+                lut = CurveLUT.from_nthsig(k, 1e-5, method)
+                self.assertWithin(lut, lambda x: nthsig(k, x), 1e-5)
+                lut = CurveLUT.from_biased_curve(k, 10, 20, 1e-4, method)
+                self.assertWithin(lut, lambda x: biased_curve(k, 10, 20, x), 1e-4)
+
+    def test_endpoints(self):
+        for method in ["linear", "cubic"]:
+            lut = CurveLUT.from_ntsig(0.7, 1e-4, method)
+            self.assertEqual(lut(0), 0)
+            self.assertEqual(lut(1), 1)
+            self.assertAlmostEqual(lut(0.5), 0.5)
+
+    def test_points_grow_with_precision(self):
+        coarse = CurveLUT.from_nthsig(0.5, 1e-3)
+        fine = CurveLUT.from_nthsig(0.5, 1e-6)
+        self.assertLess(coarse.n, fine.n)
+        self.assertLess(coarse.nbytes, fine.nbytes)
+        self.assertEqual(fine.nbytes, len(fine.table) * 8)
+        # Cubic needs fewer points for the same error
+        self.assertLess(CurveLUT.from_nthsig(0.5, 1e-6, "cubic").n, fine.n)
+
+    def test_table_roundtrip(self):
+        for method in ["linear", "cubic"]:
+            lut = CurveLUT.from_ntsig(0.4, 1e-5, method)
+            self.assertIsInstance(lut.table, array)
+            self.assertEqual(lut.table.typecode, 'd')
+            copy = CurveLUT.from_table(array('d', lut.table.tobytes()), method)
+            self.assertEqual(copy.n, lut.n)
+            self.assertEqual([copy(x) for x in XS], [lut(x) for x in XS])
+
+    def test_many(self):
+        lut = CurveLUT.from_ntsig(0.4, 1e-5)
+        self.assertEqual(list(lut.many(XS)), [lut(x) for x in XS])
+        out = array('d', [0.0] * len(XS))
+        self.assertIs(lut.many(XS, out), out)
+
+    def test_build(self):
+        lut = CurveLUT.build(lambda x: x * x, 1e-6)
+        self.assertWithin(lut, lambda x: x * x, 1e-6)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError): CurveLUT.from_ntsig(1)
+        with self.assertRaises(ValueError): CurveLUT.from_nthsig(-1)
+        with self.assertRaises(ValueError): CurveLUT.from_ntsig(1.5)
+        with self.assertRaises(ValueError): CurveLUT.from_ntsig(0.5, method="quadratic")
+        with self.assertRaises(ValueError): CurveLUT.from_ntsig(0.5, max_error=0)
+        with self.assertRaises(ValueError): CurveLUT.from_ntsig(0.99, max_error=1e-9, max_points=64)
+        with self.assertRaises(ValueError): CurveLUT.from_table([0.0], "cubic")
+        with self.assertRaises(TypeError): CurveLUT(array("d", [0.0, 1.0, 1.0]), 1, "linear")
+
+    def test_rejects_oversized_tables_early(self):
+        # k=0.999 at 1e-6 needs over a million points; the size estimate passes max_points long before that many are sampled.
+        f = curves._ntsig_kernel(0.999)
+        calls = 0
+        def counted(x):
+            nonlocal calls
+            calls += 1
+            return f(x)
+        with self.assertRaisesRegex(ValueError, "max_points=262144"):
+            CurveLUT.build(counted, 1e-6)
+        self.assertLess(calls, 262144)
+
+if __name__ == '__main__':
+    unittest.main()
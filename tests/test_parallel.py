@@ -0,0 +1,59 @@
+import operator
+import unittest
+from array import array
+from probkit.parallel import child_seed, spawn_rngs, run
+from probkit.sampling import ProbkitRNG
+
+def draw(rng, n):
+    return rng.ntsig_many(0.5, n)
+
+def draw_list(rng, n):
+    return [rng.random() for _ in range(n)]
+
+def chunk_sum(rng, n):
+    return sum(rng.random_many(n))
+
+class TestParallel(unittest.TestCase):
+    def test_child_seed(self):
+        self.assertEqual(child_seed(42, 0), child_seed(42, 0))
+        self.assertNotEqual(child_seed(42, 0), child_seed(42, 1))
+        self.assertNotEqual(child_seed(42, 0), child_seed(43, 0))
+        self.assertNotEqual(child_seed(42, 1, 0), child_seed(42, 10))
+        self.assertNotEqual(child_seed(42, "1"), child_seed(42, 1))
+        self.assertEqual(child_seed("run", b"x", 3), child_seed("run", b"x", 3))
+        # Stable across releases: changing the derivation breaks everyone's saved experiments
+        self.assertEqual(child_seed(0, 1), 211939490115908512973797924203743175012)
+        with self.assertRaises(TypeError): child_seed(1.5)
+        with self.assertRaises(TypeError): child_seed(1, True)
+
+    def test_spawn_rngs(self):
+        rngs = spawn_rngs(7, 3)
+        self.assertEqual([r.random() for r in rngs], [ProbkitRNG(child_seed(7, i)).random() for i in range(3)])
+
+    def test_run_is_independent_of_workers(self):
+        serial = run(draw, 1000, seed=5, chunk_size=128, workers=1)
+        parallel = run(draw, 1000, seed=5, chunk_size=128, workers=3)
+        self.assertIsInstance(serial, array)
+        self.assertEqual(len(serial), 1000)
+        self.assertEqual(serial, parallel)
+        self.assertNotEqual(serial, run(draw, 1000, seed=6, chunk_size=128, workers=1))
+
+    def test_run_chunks(self):
+        expected = []
+        for i, size in enumerate([300, 300, 100]):
+            expected += draw_list(ProbkitRNG(child_seed("s", i)), size)
+        self.assertEqual(run(draw_list, 700, seed="s", chunk_size=300, workers=2), expected)
+
+    def test_run_reduce(self):
+        total = run(chunk_sum, 1000, seed=1, chunk_size=100, workers=2, reduce=operator.add)
+        self.assertEqual(total, run(chunk_sum, 1000, seed=1, chunk_size=100, workers=1, reduce=operator.add))
+        self.assertAlmostEqual(total / 1000, 0.5, delta=0.05)
+
+    def test_run_invalid(self):
+        with self.assertRaises(ValueError): run(draw, -1, seed=1)
+        with self.assertRaises(ValueError): run(draw, 10, seed=1, chunk_size=0)
+        with self.assertRaises(ValueError): run(draw, 0, seed=1, reduce=operator.add)
+        self.assertEqual(run(draw, 0, seed=1), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from array import array
+from probkit import Pipeline
+from probkit.curves import ntsig, nthsig, biased_curve
+from probkit.probability import modified_probability
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+XS = [0, 0.001, 0.1, 0.25, 0.4, 0.5, 0.6, 0.75, 0.9, 0.999, 1]
+
+class TestPipeline(unittest.TestCase):
+    def test_unmerged_chain_is_exact(self):
+        """Test a chain with nothing to fold matches the step-by-step calls bit for bit"""
+        p = Pipeline().ntsig(0.4).biased_curve(0.3, 0.1, 0.9).modified_probability(1.5)
+        for x in XS:
+            self.assertEqual(p(x), modified_probability(biased_curve(0.3, 0.1, 0.9, ntsig(0.4, x)), 1.5))
+        self.assertEqual(list(p.many(XS)), [p(x) for x in XS])
+        for k in [-1, -0.5, 0.5, 1]:
+            self.assertEqual([Pipeline().ntsig(k)(x) for x in XS], [ntsig(k, x) for x in XS])
+            self.assertEqual([Pipeline().nthsig(k)(x) for x in XS], [nthsig(k, x) for x in XS])
+            self.assertEqual([Pipeline().biased_curve(k, 2, 5)(x) for x in XS], [biased_curve(k, 2, 5, x) for x in XS])
+
+    def test_folded_chain_is_close(self):
+        """Test merged stages agree with the step-by-step calls to within rounding"""
+        p = Pipeline().nthsig(0.5).modified_probability(2, 3).nthsig(-0.2).modified_probability(4)
+        self.assertEqual(p.ops, (("odds", 3 * 2 / 3 * (0.8 / 1.2) * 4),))
+        q = Pipeline().transform_range((0, 10)).transform_range((0, 1), (2, 4)).transform_range((2, 4))
+        for x in XS:
+            expected = modified_probability(nthsig(-0.2, modified_probability(nthsig(0.5, x), 2, 3)), 4)
+            self.assertAlmostEqual(p(x), expected, places=14)
+            self.assertAlmostEqual(q(10 * x), x, places=14)
+        self.assertEqual((p(0), p(1)), (0, 1))
+
+    def test_identity_stages_removed(self):
+        """Test k=0, ratio 1 and unit-range stages disappear"""
+        p = Pipeline().ntsig(0).nthsig(0).biased_curve(0, 0, 1).modified_probability(1).modified_probability(3, 3)
+        self.assertEqual(p.ops, ())
+        self.assertEqual(len(p.stages), 5)
+        self.assertEqual(p(0.3), 0.3)
+        self.assertEqual(Pipeline().modified_probability(2).modified_probability(0.5).ops, ())
+        self.assertEqual(Pipeline().biased_curve(0, 0.2, 0.6).ops, (("affine", 0.2, 0.6 - 0.2),))
+
+    def test_constant_folding(self):
+        """Test stages with a fixed output turn the rest of the chain into a constant"""
+        p = Pipeline().ntsig(0.3).modified_probability(0).biased_curve(0.5, 0.2, 0.8)
+        self.assertEqual(p.ops, (("const", 0.2),))
+        self.assertEqual(p.many([0, 0.5, 1]), array('d', [0.2] * 3))
+        self.assertEqual(Pipeline().nthsig(0.3).modified_probability(1, 0).ops, (("const", 1.0),))
+        self.assertEqual(Pipeline().clamp(0, 0.2).clamp(0.5, 1).ops, (("const", 0.5),))
+        self.assertEqual(Pipeline().clamp(0, 0.6).clamp(0.5, 1).ops, (("clamp", 0.5, 0.6),))
+
+    def test_range_checks(self):
+        """Test stage ranges are checked at build time and the input at call time"""
+        with self.assertRaisesRegex(ValueError, r"Stage 1 \(ntsig\) needs input in \[0,1\], but stage 0 \(biased_curve\) outputs \[0.0,2.0\]"):
+            Pipeline().biased_curve(0.2, 0, 2).ntsig(0.3)
+        with self.assertRaises(ValueError): Pipeline().transform_range((0, 10)).ntsig(0.3)
+        p = Pipeline().transform_range((0, 10)).clamp(0, 1).ntsig(0.5)
+        self.assertEqual(p.domain, (-float('inf'), float('inf')))
+        self.assertEqual(list(p.many([-5, 0, 5, 10, 20])), [0, 0, 0.5, 1, 1])
+        self.assertEqual(Pipeline().biased_curve(0.2, 0.1, 0.4).ntsig(0.3).range, (ntsig(0.3, 0.1), ntsig(0.3, 0.4)))
+        with self.assertRaisesRegex(ValueError, "'x' must be in range"): Pipeline().ntsig(0.3)(1.5)
+        with self.assertRaisesRegex(ValueError, "at index 1"): Pipeline().ntsig(0.3).many([0.5, -1])
+        self.assertEqual(len(Pipeline().ntsig(0.3).many([0.5, -1], check=False)), 2)
+
+    def test_odds_stage_endpoints(self):
+        """Test an odds stage keeps its output in [0,1] for small and extreme ratios"""
+        for r in [0.1, 1e-20, 1e20]:
+            p = Pipeline().modified_probability(r)
+            self.assertEqual(p.range, (0, 1))
+            for x in XS:
+                self.assertEqual(p(x), modified_probability(x, r))
+            q = p.ntsig(0.5)
+            self.assertEqual([q(x) for x in XS], [ntsig(0.5, modified_probability(x, r)) for x in XS])
+            q = p.nthsig(-0.3)
+            for x in XS:
+                self.assertAlmostEqual(q(x), nthsig(-0.3, modified_probability(x, r)), places=15)
+        # Merged nthsig factors make the same kind of stage.
+        p = Pipeline().nthsig(0.9).modified_probability(0.01).nthsig(-0.5).ntsig(0.2)
+        self.assertEqual(p.range, (0, 1))
+        self.assertEqual((p(0), p(1)), (0, 1))
+
+    def test_argument_errors(self):
+        """Test builder arguments are validated like the underlying functions"""
+        with self.assertRaises(ValueError): Pipeline().ntsig(1.5)
+        with self.assertRaises(ValueError): Pipeline().biased_curve(-2, 0, 1)
+        with self.assertRaises(ValueError): Pipeline().modified_probability(-1)
+        with self.assertRaises(ValueError): Pipeline().transform_range((1, 1))
+        with self.assertRaises(ValueError): Pipeline().clamp(1, 0)
+
+    def test_immutable_and_repr(self):
+        """Test builders return new pipelines and repr round-trips"""
+        base = Pipeline().ntsig(0.4)
+        longer = base.modified_probability(2, 3)
+        self.assertEqual(len(base.stages), 1)
+        self.assertEqual(repr(longer), "Pipeline().ntsig(0.4).modified_probability(2, 3)")
+        self.assertEqual(eval(repr(longer)).ops, longer.ops)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        """Test numpy input is evaluated with numpy and matches the scalar path"""
+        p = Pipeline().ntsig(0.4).biased_curve(0.3, 0.1, 0.9).modified_probability(1.5).clamp(0.2, 0.8)
+        ys = p.many(numpy.array(XS))
+        self.assertIsInstance(ys, numpy.ndarray)
+        self.assertEqual(ys.tolist(), [p(x) for x in XS])
+        with self.assertRaisesRegex(ValueError, "at index 2"): p.many(numpy.array([0, 1, 2.0]))
+        for r in [0.1, 1e-20]:
+            p = Pipeline().modified_probability(r).ntsig(0.5)
+            self.assertEqual(p.many(numpy.array(XS)).tolist(), [p(x) for x in XS])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,14 @@
+import math
 import unittest
-from probkit.probability import modified_probability
+from array import array
+from probkit.probability import OddsModifier, modified_probability, modified_probability_many
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INF = float('inf')
 
 class TestProbability(unittest.TestCase):
     def test_modified_probability_basic(self):
@@ -29,5 +38,116 @@ class TestProbability(unittest.TestCase):
         with self.assertRaises(ValueError): modified_probability(1.5, 1)
         with self.assertRaises(ValueError): modified_probability(0.5, -1)
 
+    def test_many_matches_scalar(self):
+        ks = [0, 0.1, 0.42, 0.9, 1]
+        ratios = [0, 0.5, 1, 1.1, 3, 1e300, INF]
+        for k in ks:
+            self.assertEqual(list(modified_probability_many(k, ratios)), [modified_probability(k, x) for x in ratios])
+        for x in ratios:
+            self.assertEqual(list(modified_probability_many(ks, x)), [modified_probability(k, x) for k in ks])
+        self.assertEqual(list(modified_probability_many(ks, ratios[:5])), [modified_probability(k, x) for k, x in zip(ks, ratios)])
+        pairs = [(k, x) for k in ks + [1 - 2 ** -53] for x in ratios + [1e-20]]
+        self.assertEqual(list(modified_probability_many(*zip(*pairs))), [modified_probability(k, x) for k, x in pairs])
+        self.assertEqual(list(modified_probability_many(ks, 1e-20)), [modified_probability(k, 1e-20) for k in ks])
+
+    def test_many_fraction(self):
+        a = [0, 2, 2, 3, 1, 1000, 0.0001]
+        b = [5, 3, 2, 2, 0, 0, 0]
+        self.assertEqual(list(modified_probability_many(0.42, a, b)), [modified_probability(0.42, x, y) for x, y in zip(a, b)])
+        self.assertEqual(list(modified_probability_many(0.42, 3, b)), [modified_probability(0.42, 3, y) for y in b])
+        self.assertEqual(list(modified_probability_many([0.1, 0.5], 3, 2)), [modified_probability(k, 3, 2) for k in [0.1, 0.5]])
+
+    def test_many_out(self):
+        out = array('d', [0.0] * 3)
+        self.assertIs(modified_probability_many(0.5, [1, 2, 3], out=out), out)
+        self.assertEqual(list(out), [modified_probability(0.5, x) for x in [1, 2, 3]])
+
+    def test_many_errors(self):
+        with self.assertRaisesRegex(ValueError, "index 2"): modified_probability_many([0.1, 0.2, 1.5], 1)
+        with self.assertRaisesRegex(ValueError, "index 1"): modified_probability_many(0.5, [1, -1])
+        with self.assertRaisesRegex(ValueError, "index 1"): modified_probability_many(0.5, [1, -1], [1, 0])
+        with self.assertRaises(ValueError): modified_probability_many(-0.5, [1, 2])
+        with self.assertRaises(ValueError): modified_probability_many([0.1, 0.2], [1, 2, 3])
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_many_numpy(self):
+        ks = numpy.array([[0.0], [0.42], [1.0]])
+        ratios = numpy.array([0, 0.5, 1, 3, INF])
+        result = modified_probability_many(ks, ratios)
+        self.assertEqual(result.shape, (3, 5))
+        self.assertEqual(result.tolist(), [[modified_probability(k, x) for x in ratios.tolist()] for k in [0.0, 0.42, 1.0]])
+        self.assertEqual(modified_probability_many(0.42, numpy.array([1, 0.0001]), 0).tolist(), [1, 1])
+        with self.assertRaisesRegex(ValueError, "index 1"): modified_probability_many(numpy.array([0.5, 2]), 1)
+
+class TestOddsModifier(unittest.TestCase):
+    def test_matches_repeated_application(self):
+        stacks = [[1.5, 2, 0.25], [3], [], [0.1] * 20, [1e5, 1e-5, 7]]
+        for ratios in stacks:
+            m = OddsModifier(ratios)
+            self.assertEqual(len(m), len(ratios))
+            for k in [0, 0.01, 0.3, 0.5, 0.99, 1]:
+                self.assertAlmostEqual(m.resolve(k), modified_probability(k, math.prod(ratios)), places=14)
+                # Chained calls round after every step, the folded offset only once.
+                chained = k
+                for x in ratios:
+                    chained = modified_probability(chained, x)
+                self.assertAlmostEqual(m.resolve(k), chained, places=10)
+        self.assertEqual(OddsModifier([3]).resolve(0.4), modified_probability(0.4, 3))
+
+    def test_add_remove_and_fractions(self):
+        m = OddsModifier().add(3, 4).add(2).add(5, 0)
+        self.assertEqual(m.infs, 1)
+        self.assertEqual(m.resolve(0.2), 1)
+        m.remove(5, 0).remove(2)
+        self.assertAlmostEqual(m.resolve(0.2), modified_probability(0.2, 3, 4), places=15)
+        self.assertAlmostEqual(m.ratio, 0.75, places=15)
+        m.remove(3, 4)
+        self.assertEqual((len(m), m.resolve(0.2)), (0, 0.2))
+
+    def test_saturation(self):
+        for k in [0, 0.3, 1]:
+            self.assertEqual(OddsModifier([2, 0]).resolve(k), modified_probability(k, 0))
+            self.assertEqual(OddsModifier([0.5, INF]).resolve(k), modified_probability(k, INF))
+        m = OddsModifier([0, INF])
+        self.assertTrue(math.isnan(m.ratio))
+        with self.assertRaisesRegex(ValueError, "undefined"): m.resolve(0.5)
+        self.assertEqual(m.remove(0).resolve(0.5), 1)
+        huge = OddsModifier([1e200] * 3 + [1e-200] * 2)
+        self.assertAlmostEqual(huge.resolve(1e-210), modified_probability(1e-210, 1e200), places=13)
+        self.assertEqual(OddsModifier([1e200] * 3).resolve_many([0, 1e-300, 1]).tolist(), [0, 1, 1])
+
+    def test_resolve_many(self):
+        m = OddsModifier([1.5, 0.3])
+        ks = [0, 0.2, 0.5, 1]
+        self.assertEqual(m.resolve_many(ks).tolist(), [m.resolve(k) for k in ks])
+        out = array('d', [0.0] * 4)
+        self.assertIs(m.resolve_many(iter(ks), out=out), out)
+        with self.assertRaisesRegex(ValueError, "index 1"): m.resolve_many([0.5, 1.5])
+
+    def test_errors(self):
+        m = OddsModifier([2])
+        with self.assertRaisesRegex(ValueError, "negative"): m.add(-1)
+        with self.assertRaisesRegex(ValueError, "negative"): m.add(-1, 0)
+        with self.assertRaisesRegex(ValueError, "index 1"): m.update([1, -2])
+        with self.assertRaisesRegex(ValueError, "NaN"): m.add(math.nan)
+        with self.assertRaisesRegex(ValueError, "none was added"): m.remove(0)
+        with self.assertRaisesRegex(ValueError, "no finite ratio"): OddsModifier().remove(2)
+        with self.assertRaisesRegex(ValueError, "no finite ratio"): OddsModifier([0, INF]).remove(2)
+        empty = OddsModifier()
+        with self.assertRaises(ValueError): empty.remove(2)
+        self.assertEqual((len(empty), empty.log_odds, empty.resolve(0.3)), (0, 0.0, 0.3))
+        with self.assertRaises(ValueError): m.resolve(1.5)
+        self.assertEqual((len(m), m.log_odds), (1, math.log(2)))
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_resolve_many_numpy(self):
+        ks = numpy.array([[0.0, 0.2], [0.7, 1.0]])
+        for ratios in [[1.5, 0.3], [1e200] * 3, [0, 2], [INF]]:
+            m = OddsModifier(numpy.array(ratios))
+            result = m.resolve_many(ks)
+            self.assertEqual(result.shape, (2, 2))
+            for got, k in zip(result.flat, ks.flat):
+                self.assertAlmostEqual(got, m.resolve(float(k)), places=15)
+
 if __name__ == '__main__':
     unittest.main()
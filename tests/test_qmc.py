@@ -0,0 +1,125 @@
+import math
+import unittest
+
+from probkit import stats
+from probkit.curves import nthsig
+from probkit.qmc import AntitheticRNG, HaltonRNG, SobolRNG, StratifiedRNG
+from probkit.sampling import ProbkitRNG
+
+SOURCES = [
+    lambda seed: SobolRNG(seed, dims=3),
+    lambda seed: HaltonRNG(seed, dims=3),
+    lambda seed: StratifiedRNG(seed, strata=16),
+    lambda seed: AntitheticRNG(seed),
+]
+
+class TestQMC(unittest.TestCase):
+    def test_unscrambled_sobol(self):
+        # Matches scipy.stats.qmc.Sobol(d=3, scramble=False).random(8).
+        expected = [
+            (0, 0, 0), (0.5, 0.5, 0.5), (0.75, 0.25, 0.25), (0.25, 0.75, 0.75),
+            (0.375, 0.375, 0.625), (0.875, 0.875, 0.125), (0.625, 0.125, 0.875), (0.125, 0.625, 0.375),
+        ]
+        r = SobolRNG(1, dims=3, scramble=False)
+        self.assertEqual([tuple(r.random() for _ in range(3)) for _ in range(8)], expected)
+        self.assertEqual(list(SobolRNG(2, dims=3, scramble=False).random_many(24)), [x for p in expected for x in p])
+
+    def test_unscrambled_halton(self):
+        r = HaltonRNG(1, dims=2, scramble=False)
+        points = [(r.random(), r.random()) for _ in range(4)]
+        for (x, y), (ex, ey) in zip(points, [(0, 0), (1 / 2, 1 / 3), (1 / 4, 2 / 3), (3 / 4, 1 / 9)]):
+            self.assertAlmostEqual(x, ex, places=15)
+            self.assertAlmostEqual(y, ey, places=15)
+
+    def test_sobol_keeps_net_structure_when_scrambled(self):
+        for seed in range(3):
+            r = SobolRNG(seed, dims=4)
+            points = [[r.random() for _ in range(4)] for _ in range(1024)]
+            for d in range(4):
+                self.assertEqual(sorted(int(p[d] * 1024) for p in points), list(range(1024)))
+            self.assertEqual(len({(int(p[0] * 32), int(p[1] * 32)) for p in points}), 1024)
+
+    def test_halton_stratifies_each_dimension(self):
+        r = HaltonRNG(4, dims=2)
+        points = [(r.random(), r.random()) for _ in range(3 ** 5)]
+        self.assertEqual(sorted(int(y * 3 ** 5) for _, y in points), list(range(3 ** 5)))
+        self.assertEqual(sorted(int(x * 128) for x, _ in points[:128]), list(range(128)))
+
+    def test_stratified_and_antithetic(self):
+        r = StratifiedRNG(9, strata=10)
+        for _ in range(3):
+            self.assertEqual(sorted(int(r.random() * 10) for _ in range(10)), list(range(10)))
+        r = AntitheticRNG(9)
+        for _ in range(100):
+            u, v = r.random(), r.random()
+            self.assertEqual(u + v, 1.0)
+            self.assertTrue(0 < u < 1)
+
+    def test_reproducible_random_access(self):
+        for make in SOURCES:
+            a, b = make(5), make(5)
+            values = [a.random() for _ in range(60)]
+            self.assertEqual(values, list(b.random_many(60)))
+            self.assertNotEqual(values, [make(6).random() for _ in range(60)])
+            self.assertEqual([b.at(i) for i in (59, 3, 17)], [values[59], values[3], values[17]])
+            c = make(5)
+            c.jump(40)
+            self.assertEqual((c.position, list(c.random_many(20))), (40, values[40:]))
+            for v in values:
+                self.assertTrue(0 <= v < 1)
+
+    def test_state_fork_snapshot_spawn(self):
+        for make in SOURCES:
+            r = make(3)
+            r.random_many(7)
+            r.gauss()
+            for copy in (r.fork, lambda: type(r).from_snapshot(r.snapshot())):
+                clone = copy()
+                self.assertEqual(clone.getstate(), r.getstate())
+                self.assertEqual([clone.gauss(), clone.random()], [r.gauss(), r.random()])
+            self.assertEqual(len(r.snapshot()), 44)
+            spawned = r.spawn(11)
+            self.assertEqual((type(spawned), spawned.position), (type(r), 0))
+            self.assertEqual(spawned.getstate()[1], r.getstate()[1])
+            with self.assertRaises(ValueError):
+                r.setstate(ProbkitRNG(1).getstate())
+        with self.assertRaisesRegex(ValueError, "not from a SobolRNG"):
+            SobolRNG(1).restore(HaltonRNG(1).snapshot())
+
+    def test_samplers_run_on_sequences(self):
+        r = SobolRNG(2)
+        u = SobolRNG(2).random_many(4)
+        self.assertEqual(list(r.nthsig_many(0.3, 4)), [nthsig(0.3, x) for x in u])
+        self.assertTrue(0 <= r.biased_curve_variate(0.2, 0.1, 0.9) <= 1)
+        self.assertIn(r.choice("abc"), "abc")
+
+    def test_estimates_converge_faster_than_monte_carlo(self):
+        k, n, runs = -0.6, 1024, 8
+        exact = stats.nthsig_mean(k)
+        def rmse(make):
+            return math.sqrt(sum((math.fsum(make(seed).nthsig_many(k, n)) / n - exact) ** 2 for seed in range(runs)) / runs)
+        mc = rmse(ProbkitRNG)
+        self.assertLess(rmse(SobolRNG), mc / 100)
+        self.assertLess(rmse(HaltonRNG), mc / 10)
+        self.assertLess(rmse(lambda seed: StratifiedRNG(seed, strata=n)), mc / 100)
+        self.assertLess(rmse(AntitheticRNG), mc)
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "dims"):
+            SobolRNG(1, dims=22)
+        with self.assertRaisesRegex(ValueError, "dims"):
+            HaltonRNG(1, dims=0)
+        with self.assertRaisesRegex(ValueError, "strata"):
+            StratifiedRNG(1, strata=0)
+        with self.assertRaisesRegex(ValueError, "2\\*\\*53 points"):
+            SobolRNG(1).at(1 << 53)
+        with self.assertRaises(ValueError):
+            SobolRNG(1).at(-1)
+        r = SobolRNG(1)
+        r.jump((1 << 53) - 2)
+        with self.assertRaisesRegex(ValueError, "2\\*\\*53 points"):
+            r.random_many(5)
+        self.assertEqual(r.position, (1 << 53) - 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,13 @@
 import unittest
-from probkit.sampling import rng
+from array import array
+from itertools import islice
+from probkit.curves import ntsig, nthsig, biased_curve
+import pickle
+import unittest.mock
+import asyncio
+import threading
+from probkit.parallel import child_seed
+from probkit.sampling import CounterRNG, ProbkitRNG, ThreadLocalRNG, rng
 
 class TestSampling(unittest.TestCase):
     def test_rng_has_random_methods(self):
@@ -175,5 +183,342 @@ class TestSampling(unittest.TestCase):
         
         self.assertEqual(main_before, main_after)
 
+    def test_batch_matches_scalar_sequence(self):
+        """Test batch helpers reproduce the scalar sequence for the same seed"""
+        for k in [-1, -0.5, 0, 0.5, 1]:
+            rng.seed(7)
+            expected = [rng.ntsig(k) for _ in range(50)]
+            rng.seed(7)
+            self.assertEqual(list(rng.ntsig_many(k, 50)), expected)
+
+            rng.seed(7)
+            expected = [rng.nthsig(k) for _ in range(50)]
+            rng.seed(7)
+            self.assertEqual(list(rng.nthsig_many(k, 50)), expected)
+
+            rng.seed(7)
+            expected = [rng.biased_curve(k, 2, 5) for _ in range(50)]
+            rng.seed(7)
+            self.assertEqual(list(rng.biased_curve_many(k, 2, 5, 50)), expected)
+
+        rng.seed(7)
+        expected = [rng.random() for _ in range(50)]
+        rng.seed(7)
+        self.assertEqual(list(rng.random_many(50)), expected)
+
+    def test_batch_output(self):
+        """Test batch helpers return array('d') or fill a supplied buffer"""
+        samples = rng.ntsig_many(0.5, 10)
+        self.assertIsInstance(samples, array)
+        self.assertEqual(samples.typecode, 'd')
+        self.assertEqual(len(rng.nthsig_many(0.5, 0)), 0)
+
+        out = array('d', [0.0] * 10)
+        self.assertIs(rng.biased_curve_many(0.5, 0.2, 0.8, 10, out=out), out)
+        self.assertTrue(all(0.2 <= v <= 0.8 for v in out))
+
+    def test_batch_errors(self):
+        """Test batch helpers validate k and n"""
+        with self.assertRaises(ValueError): rng.ntsig_many(1.5, 10)
+        with self.assertRaises(ValueError): rng.nthsig_many(-1.5, 10)
+        with self.assertRaises(ValueError): rng.biased_curve_many(2, 0, 1, 10)
+        with self.assertRaises(ValueError): rng.random_many(-1)
+        with self.assertRaises(ValueError): rng.ntsig_many(0.5, 10, out=array('d', [0.0]))
+
+    def test_variates_follow_curve_cdf(self):
+        """Test inverse-transform samplers have the curve as their CDF"""
+        n = 20000
+        with rng.spawned(11) as r:
+            for k in [-0.6, 0.6]:
+                for sample, cdf in [(r.ntsig_variate, ntsig), (r.nthsig_variate, nthsig)]:
+                    values = [sample(k) for _ in range(n)]
+                    for x in [0.1, 0.3, 0.5, 0.8]:
+                        self.assertAlmostEqual(sum(v <= x for v in values) / n, cdf(k, x), delta=0.02)
+                values = [r.biased_curve_variate(k, 0.1, 0.9) for _ in range(n)]
+                self.assertAlmostEqual(values.count(0.0) / n, 0.1, delta=0.02)
+                self.assertAlmostEqual(values.count(1.0) / n, 0.1, delta=0.02)
+                for x in [0.3, 0.5, 0.8]:
+                    self.assertAlmostEqual(sum(v <= x for v in values) / n, biased_curve(k, 0.1, 0.9, x), delta=0.02)
+
+    def test_variate_errors(self):
+        """Test inverse-transform samplers validate their arguments"""
+        with self.assertRaises(ValueError): rng.ntsig_variate(1.5)
+        with self.assertRaises(ValueError): rng.biased_curve_variate(0, 0.5, 0.2)
+        with self.assertRaises(ValueError): rng.biased_curve_variate(0, -0.1, 1)
+
+    def test_streams_match_scalar_sequence(self):
+        """Test buffered streams yield the scalar sequence across refills"""
+        for k in [-1, -0.5, 0, 0.5, 1]:
+            r = ProbkitRNG(3)
+            expected = [r.ntsig(k) for _ in range(25)]
+            self.assertEqual(list(islice(ProbkitRNG(3).iter_ntsig(k, chunk_size=7), 25)), expected)
+            r = ProbkitRNG(3)
+            expected = [r.nthsig(k) for _ in range(25)]
+            self.assertEqual(list(islice(ProbkitRNG(3).iter_nthsig(k, chunk_size=7), 25)), expected)
+            r = ProbkitRNG(3)
+            expected = [r.biased_curve(k, 1, 3) for _ in range(25)]
+            self.assertEqual(list(islice(ProbkitRNG(3).iter_biased_curve(k, 1, 3, chunk_size=7), 25)), expected)
+
+    def test_streams_are_lazy(self):
+        """Test streams only draw from the RNG in chunks, as values are consumed"""
+        r = ProbkitRNG(3)
+        stream = r.iter_ntsig(0.5, chunk_size=10)
+        state = r.getstate()
+        self.assertEqual(r.getstate(), state)  # nothing drawn until the first value is requested
+        next(stream)
+        r2 = ProbkitRNG(3)
+        r2.random_many(10)
+        self.assertEqual(r.getstate(), r2.getstate())  # exactly one chunk drawn
+        for _ in range(9): next(stream)
+        self.assertEqual(r.getstate(), r2.getstate())
+
+    def test_stream_errors(self):
+        """Test streams validate their arguments up front"""
+        with self.assertRaises(ValueError): rng.iter_ntsig(1.5)
+        with self.assertRaises(ValueError): rng.iter_biased_curve(-2, 0, 1)
+        with self.assertRaises(ValueError): rng.iter_nthsig(0.5, chunk_size=0)
+
+    def test_fork_skips_seeding(self):
+        r = ProbkitRNG(5)
+        r.gauss()
+        with unittest.mock.patch.object(ProbkitRNG, "seed", autospec=True, side_effect=ProbkitRNG.seed) as seed:
+            clone = r.fork()
+            spawned = r.spawn(9)
+        self.assertEqual([c.args[1:] for c in seed.call_args_list], [(9,)])
+        self.assertEqual(clone.getstate(), r.getstate())
+        self.assertEqual([clone.gauss() for _ in range(3)], [r.gauss() for _ in range(3)])
+        self.assertEqual(spawned.random(), ProbkitRNG(9).random())
+        self.assertIs(type(CounterRNG(1).fork()), CounterRNG)
+
+    def test_snapshot_restore(self):
+        r = ProbkitRNG("checkpoint")
+        r.random()
+        for carry in (False, True):
+            r.gauss()
+            if carry != (r.gauss_next is not None):
+                r.gauss()
+            self.assertEqual(r.gauss_next is not None, carry)
+            data = r.snapshot()
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(len(data), 2512)
+            self.assertLess(len(data), len(pickle.dumps(r.getstate())))
+            restored = ProbkitRNG.from_snapshot(data)
+            self.assertEqual(restored.getstate(), r.getstate())
+            expected = [r.gauss() for _ in range(3)] + [r.random()]
+            self.assertEqual([restored.gauss() for _ in range(3)] + [restored.random()], expected)
+            other = ProbkitRNG(1)
+            other.restore(data)
+            self.assertEqual(other.random(), ProbkitRNG.from_snapshot(data).random())
+        with self.assertRaisesRegex(ValueError, "not from a ProbkitRNG"):
+            r.restore(data[:-4])
+        with self.assertRaisesRegex(ValueError, "not from a ProbkitRNG"):
+            r.restore(CounterRNG(1).snapshot())
+
+class TestCounterRNG(unittest.TestCase):
+    def test_splitmix64_reference(self):
+        """Test the stream is SplitMix64 seeded with the derived key"""
+        r = CounterRNG(0)
+        mask = (1 << 64) - 1
+        state, expected = r._key, []
+        for _ in range(5):
+            state = (state + 0x9E3779B97F4A7C15) & mask
+            z = state
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+            expected.append(((z ^ (z >> 31)) >> 11) * 2.0 ** -53)
+        self.assertEqual([r.random() for _ in range(5)], expected)
+
+    def test_seed_reproducibility(self):
+        """Test equal seeds give equal streams and different seeds different ones"""
+        for seed in [0, 42, 2**100, -5, 1.5, "run-7", b"run-7"]:
+            self.assertEqual(CounterRNG(seed).random_many(10), CounterRNG(seed).random_many(10))
+        self.assertNotEqual(CounterRNG(1).random_many(10), CounterRNG(2).random_many(10))
+        self.assertNotEqual(CounterRNG("1").random_many(10), CounterRNG(1).random_many(10))
+        self.assertNotEqual(CounterRNG().random_many(10), CounterRNG().random_many(10))
+        with self.assertRaises(TypeError): CounterRNG([1])
+
+    def test_jump_and_at(self):
+        """Test jump() and at() agree with drawing the stream in order"""
+        stream = CounterRNG(7).random_many(1000)
+        r = CounterRNG(7)
+        self.assertEqual([r.at(i) for i in range(1000)], list(stream))
+        self.assertEqual(r.position, 0)  # at() does not move
+        r.jump(500)
+        self.assertEqual(r.position, 500)
+        self.assertEqual(r.random(), stream[500])
+        self.assertEqual(r.at_many(990, 10), stream[990:])
+        self.assertEqual(r.at(10**30), CounterRNG(7).at(10**30))
+        with self.assertRaises(ValueError): r.jump(-1)
+        with self.assertRaises(ValueError): r.at(-1)
+
+    def test_split_stream(self):
+        """Test forked and jumped RNGs reproduce consecutive blocks of one stream"""
+        stream = CounterRNG(3).random_many(300)
+        base = CounterRNG(3)
+        parts = []
+        for w in range(3):
+            worker = base.fork()
+            worker.jump(w * 100)
+            parts.extend(worker.random_many(100))
+        self.assertEqual(parts, list(stream))
+
+    def test_rejected_call_keeps_position(self):
+        """Test a batch call that fails validation does not consume counters"""
+        r = CounterRNG(4)
+        r.random()
+        for call in [
+            lambda: r.random_many(5, out=array('d', bytes(8 * 3))),
+            lambda: r.ntsig_many(0.5, 5, out=[0.0] * 4),
+            lambda: r.random_many(-1),
+        ]:
+            with self.assertRaises(ValueError): call()
+            self.assertEqual(r.position, 1)
+        expected = CounterRNG(4).random_many(6)[1:]
+        self.assertEqual(r.random_many(5, out=array('d', bytes(8 * 5))), expected)
+        self.assertEqual(r.position, 6)
+
+    def test_helpers_and_random_methods(self):
+        """Test probkit helpers and random.Random methods run on the counter stream"""
+        r = CounterRNG(11)
+        us = CounterRNG(11).random_many(20)
+        self.assertEqual([r.ntsig(0.5) for _ in range(10)], [ntsig(0.5, u) for u in us[:10]])
+        self.assertEqual(list(r.nthsig_many(-0.3, 10)), [nthsig(-0.3, u) for u in us[10:]])
+        self.assertEqual(r.position, 20)
+        self.assertIn(r.randrange(10), range(10))
+        self.assertEqual(r.getrandbits(0), 0)
+        self.assertLess(r.getrandbits(70), 2**70)
+        self.assertEqual(len(r.randbytes(9)), 9)
+        items = list(range(20))
+        r.shuffle(items)
+        self.assertEqual(sorted(items), list(range(20)))
+        r.gauss()
+        self.assertIsNotNone(r.gauss_next)
+
+    def test_state_fork_and_pickle(self):
+        """Test getstate/setstate, fork and pickling preserve position and Gaussian carry"""
+        r = CounterRNG(5)
+        r.gauss()
+        state = r.getstate()
+        expected = [r.gauss() for _ in range(3)]
+        r.setstate(state)
+        self.assertEqual([r.gauss() for _ in range(3)], expected)
+        r.setstate(state)
+        for clone in [r.fork(), pickle.loads(pickle.dumps(r))]:
+            self.assertIsInstance(clone, CounterRNG)
+            self.assertEqual([clone.gauss() for _ in range(3)], expected)
+        with self.assertRaises(ValueError): r.setstate(ProbkitRNG(1).getstate())
+
+    def test_snapshot_restore(self):
+        r = CounterRNG(3)
+        r.jump(1 << 70)
+        r.gauss()
+        data = r.snapshot()
+        self.assertEqual(len(data), 36)
+        restored = CounterRNG.from_snapshot(data)
+        self.assertEqual((restored.position, restored.getstate()), (r.position, r.getstate()))
+        self.assertEqual([restored.gauss(), restored.random()], [r.gauss(), r.random()])
+        with self.assertRaisesRegex(ValueError, "not from a CounterRNG"):
+            r.restore(ProbkitRNG(1).snapshot())
+        r.jump(1 << 128)
+        with self.assertRaises(OverflowError):
+            r.snapshot()
+
+class TestThreadLocalRNG(unittest.TestCase):
+    def draw_in_threads(self, local, names):
+        results = {}
+        def work():
+            results[threading.current_thread().name] = [local.random() for _ in range(5)]
+        threads = [threading.Thread(target=work, name=name) for name in names]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_threads_get_independent_reproducible_streams(self):
+        names = [f"worker-{i}" for i in range(4)]
+        first = self.draw_in_threads(ThreadLocalRNG(7), names)
+        second = self.draw_in_threads(ThreadLocalRNG(7), reversed(names))
+        self.assertEqual(first, second)
+        self.assertEqual(len({tuple(v) for v in first.values()}), 4)
+        expected = ProbkitRNG(child_seed(7, "thread", "worker-0"))
+        self.assertEqual(first["worker-0"], [expected.random() for _ in range(5)])
+        self.assertNotEqual(first, self.draw_in_threads(ThreadLocalRNG(8), names))
+
+    def test_live_threads_may_not_share_a_name(self):
+        local = ThreadLocalRNG(7)
+        started, done = threading.Event(), threading.Event()
+        def hold():
+            local.random()
+            started.set()
+            done.wait()
+        errors = []
+        def clash():
+            try:
+                local.random()
+            except RuntimeError as e:
+                errors.append(e)
+        holder = threading.Thread(target=hold, name="worker")
+        holder.start()
+        started.wait()
+        other = threading.Thread(target=clash, name="worker")
+        other.start()
+        other.join()
+        done.set()
+        holder.join()
+        self.assertRegex(str(errors[0]), "'worker'")
+        # Once the first thread has exited, its name (and stream) may be reused.
+        self.assertEqual(self.draw_in_threads(local, ["worker"])["worker"][0], ProbkitRNG(child_seed(7, "thread", "worker")).random())
+
+    def test_same_thread_keeps_its_stream(self):
+        local = ThreadLocalRNG("root")
+        r = local.current()
+        self.assertIs(local.current(), r)
+        values = [local.random(), local.ntsig(0.3), local.biased_curve(0.2, 10, 100)]
+        reference = ProbkitRNG(child_seed("root", "thread", threading.current_thread().name))
+        self.assertEqual(values, [reference.random(), reference.ntsig(0.3), reference.biased_curve(0.2, 10, 100)])
+        self.assertEqual(list(local.ntsig_many(0.3, 3)), list(reference.ntsig_many(0.3, 3)))
+
+    def test_bind_is_context_local(self):
+        local = ThreadLocalRNG(3)
+        thread_rng = local.current()
+        with local.bind("job") as r:
+            self.assertIs(local.current(), r)
+            with local.bind(5) as inner:
+                self.assertIs(local.current(), inner)
+            self.assertIs(local.current(), r)
+        self.assertIs(local.current(), thread_rng)
+        self.assertEqual(local.stream("job").random(), ProbkitRNG(child_seed(3, "task", "job")).random())
+
+    def test_asyncio_tasks(self):
+        local = ThreadLocalRNG(11)
+        async def task(key):
+            with local.bind(key):
+                values = []
+                for _ in range(3):
+                    values.append(local.random())
+                    await asyncio.sleep(0)
+                return values
+        async def main():
+            return await asyncio.gather(*(task(i) for i in range(3)))
+        results = asyncio.run(main())
+        for key, values in enumerate(results):
+            r = local.stream(key)
+            self.assertEqual(values, [r.random() for _ in range(3)])
+
+    def test_rng_local_and_seed(self):
+        rng.seed(42)
+        a = rng.local()
+        rng.seed(42)
+        b = rng.local()
+        self.assertEqual(a.random(), b.random())
+        self.assertIsInstance(CounterRNG(1).local(5).current(), CounterRNG)
+        before = a.current()
+        a.seed(99)
+        self.assertIsNot(a.current(), before)
+        self.assertEqual(a.random(), ThreadLocalRNG(99).random())
+        with self.assertRaises(AttributeError):
+            a.no_such_method
+
 if __name__ == '__main__':
     unittest.main()
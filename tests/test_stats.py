@@ -0,0 +1,141 @@
+import unittest
+from math import fsum
+from probkit.curves import ntsig, nthsig, biased_curve
+from probkit.sampling import ProbkitRNG
+from probkit.stats import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+KS = [-1, -0.999, -0.7, -0.26, -0.24, -0.05, 0, 0.05, 0.24, 0.26, 0.7, 0.999, 1]
+PS = [0, 0.001, 0.25, 0.5, 0.75, 0.999, 1]
+
+def integral(f, n=20000):
+    """Midpoint rule over [0,1]."""
+    return fsum(f((i + 0.5) / n) for i in range(n)) / n
+
+class TestMoments(unittest.TestCase):
+    def test_match_integrals(self):
+        """Test means and variances match numerical integration of the curves"""
+        for k in [-0.9, -0.5, -0.26, -0.24, -0.1, 0, 0.1, 0.24, 0.26, 0.5, 0.9]:
+            m = integral(lambda x: nthsig(k, x))
+            self.assertAlmostEqual(nthsig_mean(k), m, places=8)
+            self.assertAlmostEqual(nthsig_variance(k), integral(lambda x: nthsig(k, x) ** 2) - m * m, places=8)
+            self.assertEqual(ntsig_mean(k), 0.5)
+            self.assertAlmostEqual(ntsig_variance(k), integral(lambda x: ntsig(k, x) ** 2) - 0.25, places=8)
+            self.assertAlmostEqual(biased_curve_mean(k, 2, -3), integral(lambda x: biased_curve(k, 2, -3, x)), places=7)
+            self.assertAlmostEqual(biased_curve_variance(k, 2, -3), 25 * nthsig_variance(k), places=12)
+
+    def test_edges(self):
+        """Test the discrete samplers at k=±1 and the uniform at k=0"""
+        self.assertEqual((nthsig_mean(-1), nthsig_mean(1), nthsig_variance(1), nthsig_variance(-1)), (0, 1, 0, 0))
+        self.assertEqual((ntsig_variance(1), ntsig_variance(-1)), (0.25, 0))
+        self.assertEqual(nthsig_mean(0), 0.5)
+        self.assertAlmostEqual(nthsig_variance(0), 1 / 12, places=15)
+        self.assertAlmostEqual(ntsig_variance(0), 1 / 12, places=15)
+
+    def test_symmetry_and_continuity(self):
+        """Test variance is even in k, means are complementary, and the series/closed-form switch is seamless"""
+        for k in KS:
+            self.assertEqual(nthsig_variance(k), nthsig_variance(-k))
+            self.assertAlmostEqual(nthsig_mean(k) + nthsig_mean(-k), 1, places=15)
+        for f in [nthsig_mean, nthsig_variance, ntsig_variance]:
+            self.assertAlmostEqual(f(0.25 - 1e-12), f(0.25 + 1e-12), places=11)
+        self.assertGreater(nthsig_variance(0.9999999), 0)
+
+    def test_against_sampling(self):
+        """Test the moments against a large sample"""
+        r = ProbkitRNG(5)
+        n = 100_000
+        for k in [-0.6, 0.3]:
+            ys = r.nthsig_many(k, n)
+            mean = fsum(ys) / n
+            self.assertAlmostEqual(mean, nthsig_mean(k), delta=0.005)
+            self.assertAlmostEqual(fsum((y - mean) ** 2 for y in ys) / n, nthsig_variance(k), delta=0.005)
+
+class TestQuantilesAndCdfs(unittest.TestCase):
+    def test_quantile_is_curve(self):
+        """Test quantiles equal the curves themselves away from k=±1"""
+        for k in KS[1:-1]:
+            for p in PS:
+                self.assertEqual(nthsig_quantile(k, p), nthsig(k, p))
+                self.assertEqual(ntsig_quantile(k, p), ntsig(k, p))
+                self.assertEqual(biased_curve_quantile(k, 2, 7, p), biased_curve(k, 2, 7, p))
+                self.assertEqual(biased_curve_quantile(k, 7, 2, p), biased_curve(k, 7, 2, 1 - p))
+
+    def test_cdf_inverts_quantile(self):
+        """Test cdf(quantile(p)) == p for the continuous samplers"""
+        for k in KS[1:-1]:
+            for p in [0.1, 0.4, 0.6, 0.9]:
+                self.assertAlmostEqual(nthsig_cdf(k, nthsig_quantile(k, p)), p, delta=1e-9)
+                self.assertAlmostEqual(ntsig_cdf(k, ntsig_quantile(k, p)), p, delta=1e-9)
+                self.assertAlmostEqual(biased_curve_cdf(k, 2, 7, biased_curve_quantile(k, 2, 7, p)), p, delta=1e-9)
+                self.assertAlmostEqual(biased_curve_cdf(k, 7, 2, biased_curve_quantile(k, 7, 2, p)), p, delta=1e-9)
+
+    def test_discrete_cases(self):
+        """Test quantiles and CDFs of the constant and coin-flip samplers"""
+        self.assertEqual([nthsig_quantile(-1, p) for p in PS], [0] * len(PS))
+        self.assertEqual([nthsig_quantile(1, p) for p in PS], [1] * len(PS))
+        self.assertEqual([ntsig_quantile(-1, p) for p in PS], [0.5] * len(PS))
+        self.assertEqual([ntsig_quantile(1, p) for p in PS], [0, 0, 0, 0, 1, 1, 1])
+        self.assertEqual([nthsig_cdf(-1, y) for y in [-0.1, 0, 0.5, 1]], [0, 1, 1, 1])
+        self.assertEqual([nthsig_cdf(1, y) for y in [0, 0.5, 0.999, 1]], [0, 0, 0, 1])
+        self.assertEqual([ntsig_cdf(1, y) for y in [-0.1, 0, 0.5, 1]], [0, 0.5, 0.5, 1])
+        self.assertEqual([ntsig_cdf(-1, y) for y in [0, 0.49, 0.5, 1]], [0, 0, 1, 1])
+        self.assertEqual([biased_curve_cdf(1, 7, 2, y) for y in [1, 2, 7]], [0, 1, 1])
+        self.assertEqual([biased_curve_cdf(0.3, 4, 4, y) for y in [3, 4]], [0, 1])
+        self.assertEqual((nthsig_cdf(0.3, -5), nthsig_cdf(0.3, 5)), (0, 1))
+
+    def test_errors(self):
+        """Test k and p are validated"""
+        with self.assertRaises(ValueError): nthsig_mean(1.5)
+        with self.assertRaises(ValueError): ntsig_variance(-2)
+        with self.assertRaises(ValueError): nthsig_quantile(0.5, 1.5)
+        with self.assertRaises(ValueError): biased_curve_cdf(2, 0, 1, 0.5)
+
+class TestMany(unittest.TestCase):
+    def test_many_match_scalar(self):
+        """Test the batch versions match the scalar functions and broadcast scalars"""
+        self.assertEqual(list(nthsig_mean_many(KS)), [nthsig_mean(k) for k in KS])
+        self.assertEqual(list(nthsig_variance_many(KS)), [nthsig_variance(k) for k in KS])
+        self.assertEqual(list(ntsig_variance_many(KS)), [ntsig_variance(k) for k in KS])
+        self.assertEqual(list(ntsig_mean_many(KS)), [0.5] * len(KS))
+        self.assertEqual(list(nthsig_quantile_many(KS, 0.3)), [nthsig_quantile(k, 0.3) for k in KS])
+        self.assertEqual(list(ntsig_quantile_many(0.4, PS)), [ntsig_quantile(0.4, p) for p in PS])
+        self.assertEqual(list(ntsig_cdf_many(KS, 0.3)), [ntsig_cdf(k, 0.3) for k in KS])
+        self.assertEqual(list(nthsig_cdf_many(KS, 0.3)), [nthsig_cdf(k, 0.3) for k in KS])
+        self.assertEqual(list(biased_curve_mean_many(KS, 2, [7] * len(KS))), [biased_curve_mean(k, 2, 7) for k in KS])
+        self.assertEqual(list(biased_curve_variance_many(KS, 2, 7)), [biased_curve_variance(k, 2, 7) for k in KS])
+        self.assertEqual(list(biased_curve_quantile_many(KS, 7, 2, 0.3)), [biased_curve_quantile(k, 7, 2, 0.3) for k in KS])
+        self.assertEqual(list(biased_curve_cdf_many(KS, 7, 2, 3)), [biased_curve_cdf(k, 7, 2, 3) for k in KS])
+
+    def test_many_errors(self):
+        """Test batch validation names the first bad index"""
+        with self.assertRaisesRegex(ValueError, "'ks'.*index 1"): nthsig_mean_many([0, 2])
+        with self.assertRaisesRegex(ValueError, "'ps'.*index 2"): nthsig_quantile_many(0.5, [0, 1, 1.5])
+        with self.assertRaises(ValueError): nthsig_quantile_many([0.5, 0.5], [0.5, 0.5, 0.5])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        """Test numpy evaluation agrees with the scalar functions"""
+        ks = numpy.array(KS)
+        for many, scalar in [(nthsig_mean_many, nthsig_mean), (nthsig_variance_many, nthsig_variance), (ntsig_variance_many, ntsig_variance)]:
+            numpy.testing.assert_allclose(many(ks), [scalar(k) for k in KS], rtol=1e-13, atol=1e-16)
+        grid_k, grid_p = numpy.meshgrid(ks, numpy.array(PS + [0.3, 0.6]))
+        for many, scalar in [
+            (nthsig_quantile_many, nthsig_quantile), (ntsig_quantile_many, ntsig_quantile),
+            (nthsig_cdf_many, nthsig_cdf), (ntsig_cdf_many, ntsig_cdf),
+        ]:
+            expected = [[scalar(k, p) for k, p in zip(rk, rp)] for rk, rp in zip(grid_k.tolist(), grid_p.tolist())]
+            numpy.testing.assert_array_equal(many(grid_k, grid_p), expected)
+        for a, b in [(2, 7), (7, 2), (3, 3)]:
+            ys = numpy.array([1, 2, 3, 5, 7, 8.0])
+            for k in KS:
+                numpy.testing.assert_allclose(biased_curve_cdf_many(k, a, b, ys), [biased_curve_cdf(k, a, b, y) for y in ys.tolist()], atol=1e-15)
+                numpy.testing.assert_allclose(biased_curve_quantile_many(k, a, b, numpy.array(PS)), [biased_curve_quantile(k, a, b, p) for p in PS], atol=1e-15)
+        with self.assertRaisesRegex(ValueError, "index 1"): nthsig_mean_many(numpy.array([0, 2.0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from collections import Counter
+from random import Random
+from probkit.probability import modified_probability
+from probkit.sampling import ProbkitRNG
+from probkit.weighted import WeightedTable
+
+class TestWeightedTable(unittest.TestCase):
+    def setUp(self):
+        r = Random(5)
+        self.bases = [r.random() for _ in range(50)]
+        self.ratios = [r.random() * 3 for _ in range(50)]
+        self.table = WeightedTable(range(50), self.bases, self.ratios)
+
+    def assertFrequencies(self, table, weights, n=100000):
+        counts = Counter(table.sample_indices(n, ProbkitRNG(3)))
+        total = sum(weights)
+        for i, w in enumerate(weights):
+            self.assertAlmostEqual(counts[i] / n, w / total, delta=0.01)
+
+    def test_weights(self):
+        for i, (b, r) in enumerate(zip(self.bases, self.ratios)):
+            self.assertEqual(self.table.weight(i), modified_probability(b, r))
+        self.assertAlmostEqual(sum(self.table.probability(i) for i in range(50)), 1)
+        self.assertEqual(len(self.table), 50)
+
+    def test_sampling_frequencies(self):
+        self.assertFrequencies(self.table, [self.table.weight(i) for i in range(50)])
+
+    def test_update(self):
+        self.table.update(7, ratio=40)
+        self.table.update(8, base=0)
+        self.table.update(49, base=0.9, ratio=2)
+        self.assertEqual(self.table.weight(7), modified_probability(self.bases[7], 40))
+        self.assertEqual(self.table.weight(8), 0)
+        rebuilt = WeightedTable(range(50), [self.table._bases[i] for i in range(50)], [self.table._ratios[i] for i in range(50)])
+        for i in range(50):
+            self.assertAlmostEqual(self.table.probability(i), rebuilt.probability(i))
+        weights = [self.table.weight(i) for i in range(50)]
+        self.assertFrequencies(self.table, weights)
+        self.assertNotIn(8, set(self.table.sample_indices(10000, ProbkitRNG(4))))
+
+    def test_update_negative_index(self):
+        self.table.update(48, base=0.9, ratio=3)
+        self.table.update(-2, base=0)
+        self.assertEqual(self.table.weight(48), 0)
+        self.assertNotIn(48, set(self.table.sample_indices(20000, ProbkitRNG(4))))
+        self.assertFrequencies(self.table, [self.table.weight(i) for i in range(50)])
+        with self.assertRaises(IndexError): self.table.update(50, base=0.5)
+        with self.assertRaises(IndexError): self.table.update(-51, base=0.5)
+
+    def test_sample_many_matches_sequential(self):
+        r1, r2 = ProbkitRNG(9), ProbkitRNG(9)
+        self.assertEqual(self.table.sample_many(200, r1), [self.table.sample(r2) for _ in range(200)])
+        self.assertIn(self.table.sample(), range(50))
+
+    def test_zero_weights(self):
+        table = WeightedTable("abc", [0, 0.5, 0])
+        self.assertEqual(set(table.sample_many(1000, ProbkitRNG(1))), {"b"})
+        table.update(1, ratio=0)
+        with self.assertRaises(ValueError): table.sample(ProbkitRNG(1))
+        table.update(2, base=0.1)
+        self.assertEqual(table.sample(ProbkitRNG(1)), "c")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError): WeightedTable("ab", [0.5])
+        with self.assertRaises(ValueError): WeightedTable([], [])
+        with self.assertRaises(ValueError): WeightedTable("ab", [0.5, 1.5])
+        with self.assertRaises(ValueError): WeightedTable("ab", [0.5, 0.5], [1, -1])
+        with self.assertRaises(ValueError): self.table.update(0, ratio=-1)
+        self.assertEqual(self.table.weight(0), modified_probability(self.bases[0], self.ratios[0]))
+
+if __name__ == '__main__':
+    unittest.main()